@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Adaptive vs. static port scan over a slow, lossy link.
+
+Scans a simulated remote host (standins.SimulatedHost) once with fixed
+timeouts and concurrency and once with RTT-based timeouts and AIMD
+concurrency, reporting elapsed time and how many ports each run got
+wrong. The simulated host lives on a TUN device, so the benchmark needs
+root; it re-executes itself under ``unshare -n`` to get a private
+network namespace.
+
+    sudo python3 benchmarks/bench_adaptive.py --ports 2000 --delay 0.05 --loss 0.01
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import ConnectScanner  # noqa: E402
+from standins import SimulatedHost  # noqa: E402
+
+
+def run(host, ports, expected, adaptive, args):
+    scanner = ConnectScanner(timeout=args.timeout, max_inflight=args.max_inflight,
+                             adaptive=adaptive)
+    states = {}
+    syns, dropped = host.syns, host.dropped
+    start = time.perf_counter()
+    stats = scanner.scan(((host.address, port) for port in ports),
+                         lambda ip, port, state: states.__setitem__(port, state))
+    elapsed = time.perf_counter() - start
+    wrong = sum(1 for port in ports if states.get(port) != expected[port])
+    name = 'adaptive' if adaptive else 'static'
+    print(f"{name:9} {elapsed:8.2f}s {wrong:7} wrong  {host.syns - syns:7} SYNs "
+          f"{host.dropped - dropped:6} dropped  window {stats['window']:5}  "
+          f"timeout {stats['rto'] * 1000:5.0f}ms")
+    return elapsed, wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark adaptive port scanning over a lossy link')
+    parser.add_argument('--ports', type=int, default=2000, help='Number of ports to sweep')
+    parser.add_argument('--open', type=int, default=20, help='Open ports among them')
+    parser.add_argument('--filtered', type=int, default=100, help='Filtered ports among them')
+    parser.add_argument('--delay', type=float, default=0.05, help='Round-trip delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Extra random delay in seconds')
+    parser.add_argument('--loss', type=float, default=0.01, help='Random packet loss probability')
+    parser.add_argument('--bandwidth', type=int, default=2000, help='Link packets per second')
+    parser.add_argument('--queue', type=int, default=64, help='Link queue in packets')
+    parser.add_argument('--max-inflight', type=int, default=1000, help='Concurrent connects')
+    parser.add_argument('--timeout', type=float, default=3, help='Connect timeout')
+    args = parser.parse_args()
+
+    if os.environ.get('RECON_BENCH_NETNS') != '1':
+        os.environ['RECON_BENCH_NETNS'] = '1'
+        os.execvp('unshare', ['unshare', '-n', sys.executable] + sys.argv)
+
+    ports = list(range(1, args.ports + 1))
+    rng = random.Random(1)
+    open_ports = set(rng.sample(ports, args.open))
+    filtered = set(rng.sample([p for p in ports if p not in open_ports], args.filtered))
+    expected = {port: ConnectScanner.OPEN if port in open_ports
+                else ConnectScanner.FILTERED if port in filtered
+                else ConnectScanner.CLOSED for port in ports}
+
+    print(f"{len(ports)} ports ({len(open_ports)} open, {len(filtered)} filtered), "
+          f"RTT {args.delay * 1000:.0f}ms, loss {args.loss:.1%}, "
+          f"link {args.bandwidth} pkt/s with a {args.queue} packet queue\n")
+    with SimulatedHost(open_ports, filtered, delay=args.delay, jitter=args.jitter,
+                       loss=args.loss, bandwidth=args.bandwidth, queue=args.queue) as host:
+        static = run(host, ports, expected, False, args)
+        adaptive = run(host, ports, expected, True, args)
+    print(f"\nspeedup: {static[0] / adaptive[0]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Certificate harvesting benchmark.
+
+A stub zone holds ``--names`` subdomains; TLS stand-ins on ``--ports``
+ports present two certificates (picked by SNI) whose SANs list them.
+Finds the names once by wordlist brute force and once by harvesting
+certificates from the open ports, and reports DNS queries, handshakes,
+certificates parsed and time for each.
+
+    python3 benchmarks/bench_certs.py --words 20000 --names 60 --ports 8
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import Metrics, ReconTool, ResolutionCache  # noqa: E402
+from standins import StubDNSServer, StubTLSServer  # noqa: E402
+
+DOMAIN = 'bench.test'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TLS certificate harvesting')
+    parser.add_argument('--words', type=int, default=20000, help='Wordlist size')
+    parser.add_argument('--names', type=int, default=60, help='Subdomains listed in certificates')
+    parser.add_argument('--ports', type=int, default=8, help='TLS ports on the target')
+    args = parser.parse_args()
+
+    step = args.words // args.names
+    names = [f"w{i * step}.{DOMAIN}" for i in range(args.names)]
+    zone = {name: {'A': ['127.0.0.1']} for name in names}
+    half = len(names) // 2
+    certificates = {'': [DOMAIN] + names[:half], DOMAIN: [DOMAIN] + names[:half],
+                    f"alt.{DOMAIN}": names[half:]}
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            StubDNSServer(zone) as dns, \
+            StubTLSServer(certificates, count=args.ports) as tls:
+        wordlist = os.path.join(tmp, 'words.txt')
+        with open(wordlist, 'w') as f:
+            f.writelines(f"w{i}\n" for i in range(args.words))
+
+        print(f"{args.names} subdomains in {len(certificates) - 1} certificates, "
+              f"{args.ports} TLS ports, {args.words}-word wordlist\n")
+        print(f"{'method':14} {'seconds':>8} {'DNS queries':>12} {'handshakes':>11} "
+              f"{'parsed':>7} {'found':>6}")
+        for method in ('wordlist', 'certificates'):
+            metrics = Metrics()
+            cache = ResolutionCache()
+            cache.put(DOMAIN, 'A', ['127.0.0.1'], 3600)
+            queries, handshakes = dns.queries, tls.handshakes
+            # The stand-ins listen on ephemeral ports, which no probe marks as TLS
+            recon = ReconTool(DOMAIN, ports=tls.ports, wordlist=wordlist, timeout=2,
+                              resolvers=[dns.address], cache=cache, metrics=metrics,
+                              certs_all_ports=True)
+            if method == 'certificates':
+                # One alternative name is also a host of its own, presenting the other certificate
+                recon.results['host_ports'] = {
+                    name: [{'ip': '127.0.0.1', 'port': port, 'service': 'unknown'}
+                           for port in tls.ports]
+                    for name in (DOMAIN, f"alt.{DOMAIN}")}
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if method == 'wordlist':
+                    recon.subdomain_enumeration()
+                else:
+                    recon.certificate_harvest()
+            elapsed = time.perf_counter() - start
+            counters = metrics.snapshot()['counters']
+            found = len(set(recon.results['subdomains']) & set(names))
+            print(f"{method:14} {elapsed:8.2f} {dns.queries - queries:12} "
+                  f"{tls.handshakes - handshakes:11} "
+                  f"{counters.get('tls_certificates_parsed_total', 0):7} {found:6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Daemon mode benchmark.
+
+Runs the same small scan (HTTP headers and technology detection of a
+stub page) ``--oneshot`` times as separate ``recon.py`` processes, then
+``--jobs`` times through a ScanDaemon's job API, and reports scans per
+second and per-scan latency for both. The gap is what every one-shot
+scan pays for interpreter startup, imports, signature compilation and
+cold connections.
+
+    python3 benchmarks/bench_daemon.py --oneshot 20 --jobs 500 --slots 8
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from recon import ScanDaemon  # noqa: E402
+from standins import StubHTTPServer  # noqa: E402
+
+STAGES = {'enable_dns': False, 'enable_subdomains': False, 'enable_ports': False,
+          'enable_banners': False, 'enable_certs': False, 'enable_whois': False}
+
+
+def oneshot(target, cwd):
+    """Scan in a fresh process (reports land in ``cwd``); returns seconds taken"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, 'recon.py'), '-u', target, '--no-dns',
+                    '--no-subdomains', '--no-ports', '--no-banners', '--no-certs', '--no-whois'],
+                   cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def submit(base, target):
+    """Submit a job and follow its findings to the end; returns seconds taken"""
+    start = time.perf_counter()
+    request = urllib.request.Request(f"{base}/jobs", data=json.dumps({'target': target}).encode())
+    with urllib.request.urlopen(request) as response:
+        job = json.load(response)
+    with urllib.request.urlopen(f"{base}/jobs/{job['id']}/events") as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def report(label, latencies, elapsed):
+    latencies = sorted(latencies)
+    print(f"{label:10} {len(latencies):6} {elapsed:8.2f} {len(latencies) / elapsed:9.1f} "
+          f"{statistics.median(latencies) * 1000:8.1f} "
+          f"{latencies[int(len(latencies) * 0.9)] * 1000:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark daemon mode against one-shot runs')
+    parser.add_argument('--oneshot', type=int, default=20, help='One-shot process runs')
+    parser.add_argument('--jobs', type=int, default=500, help='Jobs submitted to the daemon')
+    parser.add_argument('--slots', type=int, default=8, help='Jobs run at once (and clients)')
+    args = parser.parse_args()
+
+    headers = {'Server': 'nginx/1.25.3', 'Content-Type': 'text/html'}
+    page = (headers, b'<html><head><link href="/wp-content/style.css"></head></html>')
+    with tempfile.TemporaryDirectory() as tmp, StubHTTPServer({'/': page}) as web:
+        print(f"{'mode':10} {'scans':>6} {'seconds':>8} {'scans/s':>9} {'p50 ms':>8} {'p90 ms':>8}")
+        with ThreadPoolExecutor(args.slots) as pool:
+            start = time.perf_counter()
+            latencies = list(pool.map(lambda target: oneshot(target, tmp),
+                                      [web.address] * args.oneshot))
+            report('one-shot', latencies, time.perf_counter() - start)
+
+            daemon = ScanDaemon('0', jobs=args.slots, stage_options=STAGES,
+                                log=io.StringIO()).start()
+            base = f"http://{daemon.address}"
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    latencies = list(pool.map(lambda target: submit(base, target),
+                                              [web.address] * args.jobs))
+                    elapsed = time.perf_counter() - start
+            finally:
+                daemon.stop()
+            report('daemon', latencies, elapsed)
+
+
+if __name__ == '__main__':
+    main()
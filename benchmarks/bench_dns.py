@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Subdomain brute-force throughput benchmark.
+
+Serves a synthetic zone from a local stub DNS server, brute-forces it
+with ReconTool.subdomain_enumeration and reports queries/second plus
+accuracy (every zone name found, nothing else).
+
+    python3 benchmarks/bench_dns.py --words 20000 --hits 500
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import ReconTool  # noqa: E402
+from standins import StubDNSServer  # noqa: E402
+
+DOMAIN = 'bench.test'
+
+
+class FirstHitClock(io.StringIO):
+    """Swallows output and records when the first hit is printed"""
+
+    def __init__(self):
+        super().__init__()
+        self.first_hit = None
+
+    def write(self, text):
+        if self.first_hit is None and '[+] Found:' in text:
+            self.first_hit = time.perf_counter()
+        return len(text)
+
+
+def build_zone(words, hits):
+    zone = {}
+    for i in range(hits):
+        label = f"w{i * (words // hits)}"
+        records = {'A': [f"10.0.{i // 256 % 256}.{i % 256}"]}
+        if i % 3 == 0:
+            records['AAAA'] = [f"fd00::{i:x}"]
+        if i % 5 == 0:
+            records['CNAME'] = [f"lb{i % 7}.{DOMAIN}."]
+        zone[f"{label}.{DOMAIN}"] = records
+    return zone
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark subdomain brute force against a stub DNS server')
+    parser.add_argument('--words', type=int, default=20000, help='Wordlist size')
+    parser.add_argument('--hits', type=int, default=500, help='Names that exist in the zone')
+    parser.add_argument('--dns-inflight', type=int, default=500, help='Concurrent lookups')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Write the wordlist this many times (exercises de-duplication)')
+    args = parser.parse_args()
+
+    zone = build_zone(args.words, args.hits)
+    truncate = list(zone)[:10]
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        for _ in range(args.repeat):
+            for i in range(args.words):
+                f.write(f"w{i}\n")
+        wordlist = f.name
+
+    try:
+        with StubDNSServer(zone, truncate=truncate) as server:
+            recon = ReconTool(DOMAIN, wordlist=wordlist, timeout=2,
+                              resolvers=[server.address], dns_inflight=args.dns_inflight)
+            clock = FirstHitClock()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(clock):
+                recon.subdomain_enumeration()
+            elapsed = time.perf_counter() - start
+            udp, tcp = server.queries, server.tcp_queries
+    finally:
+        os.unlink(wordlist)
+
+    found = set(recon.results['subdomains'])
+    expected = set(zone)
+    records = recon.results['subdomain_records']
+    aaaa = sum(1 for r in records.values() if r['AAAA'])
+    cname = sum(1 for r in records.values() if r['CNAME'])
+    first_hit = (clock.first_hit - start) * 1000 if clock.first_hit else float('nan')
+    print(f"names tried:    {args.words} ({args.words * args.repeat} wordlist lines)")
+    print(f"elapsed:        {elapsed:.3f}s")
+    print(f"first hit:      {first_hit:.1f}ms")
+    print(f"peak RSS:       {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    print(f"throughput:     {udp / elapsed:,.0f} queries/s ({udp} UDP, {tcp} TCP)")
+    print(f"hits:           {len(found & expected)}/{len(expected)} "
+          f"({aaaa} with AAAA, {cname} with CNAME)")
+    print(f"false hits:     {len(found - expected)}")
+    if found != expected:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Subdomain permutation benchmark.
+
+First drains ``--candidates`` names from a PermutationGenerator seeded
+with ``--seeds`` names (tens of millions of candidates at the defaults)
+and reports the rate and peak memory, next to the same stream
+de-duplicated with an exact set. Then runs the permutation stage
+against a stub zone holding variants of the seeds (``api12`` from
+``api10``, ``api10-dev``, ``eu.api10`` and, two steps away,
+``eu.api10-dev``) at depths 1 and 2 and reports the queries sent and
+the variants found.
+
+    python3 benchmarks/bench_permutations.py --seeds 2000 --candidates 2000000
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import PermutationGenerator, ReconTool, ResolutionCache  # noqa: E402
+from standins import StubDNSServer  # noqa: E402
+
+DOMAIN = 'bench.test'
+
+
+class SetFilter(set):
+    """Exact de-duplication, in the BloomFilter ``add`` interface"""
+
+    def add(self, item):
+        if item in self:
+            return False
+        super().add(item)
+        return True
+
+
+def seed_names(count):
+    """Names whose labels are all distinct words, e.g. ``bcd-node7``"""
+    def word(i):
+        letters = ''
+        for _ in range(3):
+            i, r = divmod(i, 26)
+            letters += chr(ord('a') + r)
+        return letters
+    return [f"{word(i)}-node{i % 10}.{DOMAIN}" for i in range(count)]
+
+
+def drain(args, dedupe, trace=False):
+    """Consume candidates; returns (seconds, peak MiB or None, candidate space)"""
+    seeds = seed_names(args.seeds)
+    if trace:
+        tracemalloc.start()
+    generator = PermutationGenerator(DOMAIN, capacity=args.candidates)
+    if dedupe == 'set':
+        generator.seen = SetFilter()
+    for name in seeds:
+        generator.learn(name)
+    # Numbered variants plus seven per word and seed
+    space = len(seeds) * (PermutationGenerator.NUMBERS * 2 + len(generator.words) * 7)
+    start = time.perf_counter()
+    for _ in itertools.islice(generator.candidates(seeds), args.candidates):
+        pass
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return elapsed, peak, space
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark subdomain permutations')
+    parser.add_argument('--seeds', type=int, default=2000, help='Seed subdomains')
+    parser.add_argument('--candidates', type=int, default=2000000, help='Candidates drained')
+    parser.add_argument('--hits', type=int, default=50, help='Seeds with variants in the zone')
+    args = parser.parse_args()
+
+    print(f"{args.seeds} seeds, {args.candidates} candidates drained\n")
+    print(f"{'dedupe':8} {'seconds':>8} {'names/s':>10} {'peak MiB':>9}")
+    for dedupe in ('bloom', 'set'):
+        elapsed, _, space = drain(args, dedupe)
+        peak = drain(args, dedupe, trace=True)[1]
+        print(f"{dedupe:8} {elapsed:8.2f} {args.candidates / elapsed:10.0f} {peak:9.1f}")
+    print(f"(candidate space {space:,} names)\n")
+
+    seeds = [f"api{i * 10}.{DOMAIN}" for i in range(args.hits)]
+    zone = {name: {'A': ['127.0.0.1']} for name in seeds}
+    variants = set()
+    for i in range(args.hits):
+        variants.update({f"api{i * 10 + 2}.{DOMAIN}", f"api{i * 10}-dev.{DOMAIN}",
+                         f"eu.api{i * 10}.{DOMAIN}", f"eu.api{i * 10}-dev.{DOMAIN}"})
+    zone.update((name, {'A': ['127.0.0.2']}) for name in variants)
+    # Two steps from a seed: only reachable from a variant found in round one
+    deeper = {name for name in variants if name.startswith('eu.') and '-dev.' in name}
+    with tempfile.TemporaryDirectory() as tmp, StubDNSServer(zone) as dns:
+        wordlist = os.path.join(tmp, 'words.txt')
+        with open(wordlist, 'w') as f:
+            f.writelines(f"api{i * 10}\n" for i in range(args.hits))
+        print(f"{'depth':6} {'seconds':>8} {'queries':>8} {'variants found':>15} "
+              f"{'second round':>13}")
+        for depth in (1, 2):
+            cache = ResolutionCache()
+            cache.put(DOMAIN, 'A', ['127.0.0.1'], 3600)
+            queries = dns.queries
+            recon = ReconTool(DOMAIN, wordlist=wordlist, timeout=2, resolvers=[dns.address],
+                              cache=cache, permute_depth=depth)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                recon.execute(enable_dns=False, enable_ports=False, enable_banners=False,
+                              enable_certs=False, enable_http=False, enable_tech=False,
+                              enable_whois=False)
+            elapsed = time.perf_counter() - start
+            found = set(recon.results['subdomains'])
+            print(f"{depth:6} {elapsed:8.2f} {dns.queries - queries:8} "
+                  f"{len(found & variants):>7}/{len(variants):<7} "
+                  f"{len(found & deeper):>6}/{len(deeper):<6}")
+
+
+if __name__ == '__main__':
+    main()
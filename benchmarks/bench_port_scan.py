@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Port scan throughput benchmark.
+
+Opens a fleet of localhost listeners and sweeps a port range that covers
+them with ReconTool.port_scan, reporting ports/second and verifying that
+every listener is reported open.
+
+    python3 benchmarks/bench_port_scan.py --listeners 50 --range 20000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import ReconTool  # noqa: E402
+from standins import TCPListenerFleet  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ReconTool.port_scan against localhost')
+    parser.add_argument('--listeners', type=int, default=50, help='Number of listening ports')
+    parser.add_argument('--range', type=int, default=20000, help='Number of ports to sweep')
+    parser.add_argument('--max-inflight', type=int, default=1000, help='Concurrent connects')
+    parser.add_argument('--timeout', type=float, default=1, help='Connect timeout')
+    args = parser.parse_args()
+
+    with TCPListenerFleet(args.listeners) as fleet:
+        low = max(1, min(fleet.ports) - args.range // 2)
+        ports = list(range(low, min(65536, low + args.range)))
+        expected = set(fleet.ports) & set(ports)
+
+        recon = ReconTool('127.0.0.1', ports=ports, timeout=args.timeout,
+                          max_inflight=args.max_inflight)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            recon.port_scan()
+        elapsed = time.perf_counter() - start
+
+    found = {p['port'] for p in recon.results['open_ports']}
+    missing = expected - found
+    print(f"ports swept:    {len(ports)}")
+    print(f"elapsed:        {elapsed:.3f}s")
+    print(f"throughput:     {len(ports) / elapsed:,.0f} ports/s")
+    print(f"listeners seen: {len(expected & found)}/{len(expected)}")
+    if missing:
+        print(f"MISSING:        {sorted(missing)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Report rendering benchmark.
+
+Writes a synthetic findings stream with ResultSink, then renders it as
+text, JSON and HTML with ReportRenderer, reporting time per format and
+peak RSS (which should not grow with the number of findings).
+
+    python3 benchmarks/bench_report.py --subdomains 1000000
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import ReportRenderer, ResultSink  # noqa: E402
+
+DOMAIN = 'bench.test'
+
+
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark report rendering')
+    parser.add_argument('--subdomains', type=int, default=1000000, help='Subdomains in the stream')
+    parser.add_argument('--ports', type=int, default=1000, help='Open ports in the stream')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        events = os.path.join(tmp, 'events.ndjson')
+        start = time.perf_counter()
+        sink = ResultSink(events)
+        sink.emit('scan', target=DOMAIN, timestamp='1970-01-01T00:00:00')
+        sink.emit('dns', type='A', values=['192.0.2.1'])
+        for i in range(args.subdomains):
+            sink.emit('subdomain', name=f"host{i}.{DOMAIN}",
+                      records={'A': [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"],
+                               'AAAA': [], 'CNAME': []})
+        for port in range(1, args.ports + 1):
+            sink.emit('port', port=port, service='unknown')
+        sink.emit('summary', stage_timings={'total': 1.0}, cache_stats={})
+        sink.close()
+        size = os.path.getsize(events) / (1024 * 1024)
+        print(f"stream:         {sink.count} events, {size:.1f} MB "
+              f"written in {time.perf_counter() - start:.2f}s")
+        print(f"peak RSS:       {peak_rss():.1f} MB after writing")
+
+        for report_format in ('text', 'json', 'html'):
+            output = os.path.join(tmp, f"report.{report_format}")
+            start = time.perf_counter()
+            ReportRenderer(events).render(output, report_format)
+            elapsed = time.perf_counter() - start
+            print(f"{report_format + ':':<15} {elapsed:.2f}s "
+                  f"({size / elapsed:.1f} MB/s of events, "
+                  f"{os.path.getsize(output) / (1024 * 1024):.1f} MB report), "
+                  f"peak RSS {peak_rss():.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Incremental re-scan benchmark.
+
+Scans a local estate (stub DNS zone, TCP listeners, an HTTP page with an
+ETag) once in full, then again with the first run as the baseline: with
+the full sweep, and with --recheck-only. Reports the work each run did
+(DNS queries, TCP connects, HTTP body bytes) and its wall-clock time.
+Finally the estate is changed (a subdomain removed, a listener closed,
+the page replaced) and a recheck-only run shows the diff it reports.
+
+    python3 benchmarks/bench_rescan.py --words 20000 --hits 200 --range 5000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import Metrics, ReconTool, ResolutionCache, diff_lines  # noqa: E402
+from standins import StubDNSServer, StubHTTPServer, TCPListenerFleet  # noqa: E402
+
+DOMAIN = 'bench.test'
+
+
+def page(version, marker):
+    headers = {'Server': 'nginx/1.25.3', 'ETag': f'"{version}"', 'Content-Type': 'text/html'}
+    filler = '<p>' + 'lorem ipsum dolor sit amet ' * 40 + '</p>\n'
+    return headers, f"<html><body>{filler * 50}{marker}</body></html>".encode()
+
+
+def scan(args, dns, http, wordlist, ports, baseline=None, recheck_only=False):
+    """Scan the estate; returns (results, seconds, DNS queries, connects, HTTP body bytes)"""
+    metrics = Metrics()
+    cache = ResolutionCache()
+    cache.put(DOMAIN, 'A', ['127.0.0.1'], 3600)
+    body_bytes = http.body_bytes
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Subdomains and ports on the domain; the page is served on a bare address
+        recon = ReconTool(DOMAIN, ports=ports, wordlist=wordlist, resolvers=[dns.address],
+                          cache=cache, metrics=metrics, timeout=2,
+                          baseline=baseline and baseline['scan'], recheck_only=recheck_only)
+        results = recon.execute(enable_dns=False, enable_banners=False, enable_http=False,
+                                enable_tech=False, enable_whois=False)
+        web = ReconTool(http.address, metrics=metrics, timeout=2,
+                        baseline=baseline and baseline['web'], recheck_only=recheck_only)
+        web_results = web.execute(enable_dns=False, enable_subdomains=False, enable_ports=False,
+                                  enable_banners=False, enable_whois=False)
+        web.http.close()
+    elapsed = time.perf_counter() - start
+    counters = metrics.snapshot()['counters']
+    queries = counters.get('dns_queries_total', 0)
+    connects = sum(value for series, value in counters.items() if series.startswith('ports_total'))
+    # Round-trip through JSON, as a saved report would
+    results = json.loads(json.dumps({'scan': results, 'web': web_results}, default=str))
+    return results, elapsed, queries, connects, http.body_bytes - body_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark incremental re-scans')
+    parser.add_argument('--words', type=int, default=20000, help='Wordlist size')
+    parser.add_argument('--hits', type=int, default=200, help='Subdomains in the zone')
+    parser.add_argument('--range', type=int, default=5000, help='Ports swept')
+    parser.add_argument('--listeners', type=int, default=20, help='Open ports among them')
+    args = parser.parse_args()
+
+    zone = {f"w{i * (args.words // args.hits)}.{DOMAIN}": {'A': ['127.0.0.1']}
+            for i in range(args.hits)}
+    with tempfile.TemporaryDirectory() as tmp, \
+            StubDNSServer(zone) as dns, \
+            TCPListenerFleet(args.listeners - 1) as fleet, \
+            TCPListenerFleet(1) as leaving, \
+            StubHTTPServer({'/': page('v1', 'wp-content')}) as http:
+        wordlist = os.path.join(tmp, 'words.txt')
+        with open(wordlist, 'w') as f:
+            f.writelines(f"w{i}\n" for i in range(args.words))
+        open_ports = fleet.ports + leaving.ports
+        low = max(1, min(open_ports) - args.range // 2)
+        ports = sorted(set(range(low, min(65536, low + args.range))) | set(open_ports))
+
+        print(f"{args.words} words ({args.hits} subdomains), {len(ports)} ports "
+              f"({len(open_ports)} open), one page\n")
+        print(f"{'run':24} {'seconds':>8} {'DNS queries':>12} {'connects':>9} {'HTTP bytes':>11}")
+        baseline, *row = scan(args, dns, http, wordlist, ports)
+        print(f"{'full':24} {row[0]:8.2f} {row[1]:12} {row[2]:9} {row[3]:11}")
+        _, *row = scan(args, dns, http, wordlist, ports, baseline)
+        print(f"{'baseline + full sweep':24} {row[0]:8.2f} {row[1]:12} {row[2]:9} {row[3]:11}")
+        _, *row = scan(args, dns, http, wordlist, ports, baseline, recheck_only=True)
+        print(f"{'recheck only':24} {row[0]:8.2f} {row[1]:12} {row[2]:9} {row[3]:11}")
+
+        # Change the estate: one subdomain gone, one port closed, a new page
+        removed = next(iter(dns.zone))
+        del dns.zone[removed]
+        leaving.stop()
+        http.pages['/'] = page('v2', '<script src="/js/jquery-3.7.1.min.js"></script>')
+        results, *row = scan(args, dns, http, wordlist, ports, baseline, recheck_only=True)
+        print(f"{'recheck after a change':24} {row[0]:8.2f} {row[1]:12} {row[2]:9} {row[3]:11}\n")
+        for part in ('scan', 'web'):
+            for line in diff_lines(results[part]['diff']):
+                print(f"  {line}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Result model benchmark.
+
+Builds the in-memory results of a large scan (``--subdomains`` names,
+each with ``--ports`` open ports) twice: with plain dicts and lists, as
+results used to be held, and with the slotted records and ``PortSet``.
+Reports the memory each takes (tracemalloc), then streams the findings
+into a ``ResultDatabase`` and times an indexed query against it.
+
+    python3 benchmarks/bench_results.py --subdomains 100000 --ports 4
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import AddressRecords, EndpointRecord, PortSet, ResultDatabase  # noqa: E402
+
+DOMAIN = 'bench.test'
+
+
+def build(args, compact):
+    """Results of a synthetic scan, with dicts or with records"""
+    ports = [443 + i for i in range(args.ports)]
+    results = {'target': DOMAIN, 'timestamp': '1970-01-01T00:00:00', 'dns_records': {},
+               'subdomains': [], 'subdomain_records': {}, 'open_ports': [], 'host_ports': {},
+               'banners': {}, 'http_headers': {}, 'subdomain_http': {}, 'technologies': [],
+               'whois_info': {}, 'stage_timings': {}, 'cache_stats': {}}
+    # The port list a full-range scan holds on to
+    results['ports'] = PortSet(range(1, 65536)) if compact else list(range(1, 65536))
+    shared = {}
+    for i in range(args.subdomains):
+        name = f"w{i}.{DOMAIN}"
+        ip = f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+        results['subdomains'].append(name)
+        if compact:
+            results['subdomain_records'][name] = AddressRecords(A=(ip,))
+            results['host_ports'][name] = [
+                shared.setdefault((ip, port), EndpointRecord(ip, port, 'https'))
+                for port in ports]
+        else:
+            results['subdomain_records'][name] = {'A': [ip]}
+            results['host_ports'][name] = [{'ip': ip, 'port': port, 'service': 'https'}
+                                           for port in ports]
+    return results
+
+
+def measure(args, compact):
+    tracemalloc.start()
+    results = build(args, compact)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return results, size / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the result model')
+    parser.add_argument('--subdomains', type=int, default=100000, help='Subdomains in the results')
+    parser.add_argument('--ports', type=int, default=4, help='Open ports per subdomain')
+    args = parser.parse_args()
+
+    print(f"{args.subdomains} subdomains, {args.ports} open ports each, 65535 ports scanned\n")
+    print(f"{'model':10} {'MiB':>8}")
+    _, size = measure(args, compact=False)
+    print(f"{'dicts':10} {size:8.1f}")
+    results, size = measure(args, compact=True)
+    print(f"{'records':10} {size:8.1f}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.db')
+        database = ResultDatabase(path)
+        start = time.perf_counter()
+        database.add_results(results)
+        database.close()
+        elapsed = time.perf_counter() - start
+        print(f"database write  {elapsed:8.2f}s")
+
+        start = time.perf_counter()
+        with sqlite3.connect(path) as db:
+            rows = db.execute("SELECT COUNT(*) FROM host_ports WHERE port = ?",
+                              (443,)).fetchone()[0]
+        elapsed = time.perf_counter() - start
+        print(f"indexed query   {elapsed * 1000:8.2f}ms ({rows} hosts with 443 open)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+WHOIS stage benchmark.
+
+Looks up ``--domains`` registrable domains, each reached through
+``--subdomains`` different target names, with ``--scans`` lookups in
+flight, against one stub WHOIS server per top-level domain that answers
+after ``--delay`` seconds and refuses queries beyond ``--limit`` per
+second. Compares a fresh, unthrottled client per scan (one query per
+target, as the stage used to work) with a single shared WhoisClient,
+then repeats the shared run on a new client over the same cache file.
+Reports queries sent, refusals, failed lookups and wall-clock time.
+
+    python3 benchmarks/bench_whois.py --domains 40 --subdomains 10 --scans 32
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import ResolutionCache, WhoisClient  # noqa: E402
+from standins import StubWhoisServer  # noqa: E402
+
+TLDS = ('com', 'net', 'org', 'io')
+
+
+def run(label, targets, servers, scans, client=None, rate=None):
+    """Look up every target; ``client`` is shared, else each lookup gets its own"""
+    queries = sum(server.queries for server in servers)
+    refused = sum(server.refused for server in servers)
+    overrides = {tld: server.address for tld, server in zip(TLDS, servers)}
+
+    def lookup(target):
+        whois = client or WhoisClient(rate=rate, servers=overrides)
+        try:
+            whois.lookup(target)
+            return True
+        except (LookupError, OSError):
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(scans) as pool:
+        failed = list(pool.map(lookup, targets)).count(False)
+    elapsed = time.perf_counter() - start
+    print(f"{label:18} {len(targets):8} {sum(s.queries for s in servers) - queries:8} "
+          f"{sum(s.refused for s in servers) - refused:8} {failed:7} {elapsed:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the WHOIS stage')
+    parser.add_argument('--domains', type=int, default=40, help='Registrable domains')
+    parser.add_argument('--subdomains', type=int, default=10, help='Target names per domain')
+    parser.add_argument('--scans', type=int, default=32, help='Lookups in flight')
+    parser.add_argument('--delay', type=float, default=0.05, help='Server response time')
+    parser.add_argument('--limit', type=int, default=10, help='Queries per second a server serves')
+    parser.add_argument('--rate', type=float, default=8.0,
+                        help='Client queries per second per server')
+    args = parser.parse_args()
+
+    domains = [f"site{i}.{TLDS[i % len(TLDS)]}" for i in range(args.domains)]
+    targets = [f"host{j}.{domain}" for domain in domains for j in range(args.subdomains)]
+    random.Random(1).shuffle(targets)
+
+    servers = [StubWhoisServer([d for d in domains if d.endswith('.' + tld)], delay=args.delay,
+                               limit=args.limit).start() for tld in TLDS]
+    overrides = {tld: server.address for tld, server in zip(TLDS, servers)}
+    try:
+        print(f"{len(targets)} targets, {args.domains} domains, {len(TLDS)} servers "
+              f"({args.limit} queries/s each)\n")
+        print(f"{'client':18} {'lookups':>8} {'queries':>8} {'refused':>8} {'failed':>7} "
+              f"{'seconds':>8}")
+        run('per scan', targets, servers, args.scans, rate=1e9)
+        # Let the servers' one-second windows drain
+        time.sleep(1)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.db')
+            cache = ResolutionCache(path)
+            run('shared', targets, servers, args.scans,
+                client=WhoisClient(cache, rate=args.rate, servers=overrides))
+            cache.close()
+            cache = ResolutionCache(path)
+            run('shared, next run', targets, servers, args.scans,
+                client=WhoisClient(cache, rate=args.rate, servers=overrides))
+            cache.close()
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
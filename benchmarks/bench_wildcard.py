@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Wildcard DNS benchmark.
+
+Brute-forces a stub zone with a wildcard record (``*.bench.test``) and a
+set of real subdomains, once without wildcard filtering (every wordlist
+entry resolves) and once through subdomain enumeration, which probes for
+the wildcard first. Reports queries sent, names reported and how many of
+them are real, plus the same pair on a zone without a wildcard to show
+what the probes cost there.
+
+    python3 benchmarks/bench_wildcard.py --words 20000 --hits 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recon import AsyncResolver, ReconTool  # noqa: E402
+from standins import StubDNSServer  # noqa: E402
+
+DOMAIN = 'bench.test'
+
+
+def unfiltered(dns, wordlist):
+    """Sweep without wildcard detection; returns (names reported, queries, seconds)"""
+    with open(wordlist) as f:
+        names = [f"{line.strip()}.{DOMAIN}" for line in f]
+    found = []
+    resolver = AsyncResolver(nameservers=[dns.address], timeout=2)
+    start = time.perf_counter()
+    stats = resolver.brute_force(names, lambda name, records: found.append(name))
+    return found, stats['queries'], time.perf_counter() - start
+
+
+def filtered(dns, wordlist):
+    """Sweep through subdomain enumeration; returns (names reported, queries, seconds)"""
+    queries = dns.queries
+    recon = ReconTool(DOMAIN, wordlist=wordlist, timeout=2, resolvers=[dns.address])
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        recon.subdomain_enumeration()
+    return recon.results['subdomains'], dns.queries - queries, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wildcard DNS filtering')
+    parser.add_argument('--words', type=int, default=20000, help='Wordlist size')
+    parser.add_argument('--hits', type=int, default=200, help='Real subdomains in the zone')
+    args = parser.parse_args()
+
+    step = args.words // args.hits
+    real = {f"w{i * step}.{DOMAIN}": {'A': [f"127.0.{i // 250}.{i % 250 + 1}"]}
+            for i in range(args.hits)}
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = os.path.join(tmp, 'words.txt')
+        with open(wordlist, 'w') as f:
+            f.writelines(f"w{i}\n" for i in range(args.words))
+
+        print(f"{args.words} words, {args.hits} real subdomains\n")
+        print(f"{'zone':12} {'run':11} {'seconds':>8} {'queries':>8} {'reported':>9} "
+              f"{'real':>6} {'false':>6}")
+        for label, zone in (('wildcard', {**real, f"*.{DOMAIN}": {'A': ['10.9.9.9']}}),
+                            ('no wildcard', real)):
+            with StubDNSServer(zone) as dns:
+                for run, sweep in (('unfiltered', unfiltered), ('filtered', filtered)):
+                    found, queries, elapsed = sweep(dns, wordlist)
+                    hits = len(set(found) & set(real))
+                    print(f"{label:12} {run:11} {elapsed:8.2f} {queries:8} {len(found):9} "
+                          f"{hits:6} {len(found) - hits:6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the scan modules.
+
+Starts local stand-ins (a stub DNS server with a synthetic zone, TCP
+listener fleets with and without banners, an HTTP server with fixture
+pages), then runs each module of ReconTool against them in its own
+subprocess and records throughput, per-operation latency percentiles and
+the subprocess's peak RSS. Nothing leaves localhost.
+
+The ``startup`` module times ``import recon`` in fresh interpreters and
+fails if it exceeds IMPORT_BUDGET_MS or loads any of the DEFERRED modules,
+which are only meant to be imported by the stages that use them.
+
+    python3 benchmarks/run.py                          # all modules, print a table
+    python3 benchmarks/run.py --save baseline.json     # also write the results
+    python3 benchmarks/run.py --compare baseline.json  # flag regressions (exit 1)
+    python3 benchmarks/run.py --modules ports,banners --quick
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+DOMAIN = 'bench.test'
+MODULES = ['dns', 'ports', 'banners', 'http', 'startup']
+
+# Modules that `import recon` must not load, and its time budget (median)
+DEFERRED = ['asyncio', 'ssl', 'sqlite3', 'dns', 'requests', 'urllib3', 'whois']
+IMPORT_BUDGET_MS = 50
+
+# Workload per run: wordlist size and zone hits, swept port range and listeners,
+# ports with banners, fixture pages, fresh interpreters importing recon
+SIZES = {
+    'full': {'words': 20000, 'hits': 500, 'range': 20000, 'listeners': 50,
+             'banners': 200, 'pages': 200, 'starts': 20},
+    'quick': {'words': 2000, 'hits': 50, 'range': 2000, 'listeners': 10,
+              'banners': 20, 'pages': 20, 'starts': 5},
+}
+
+# Metric -> direction that counts as better, for --compare
+METRICS = {'throughput': 'higher', 'p50_ms': 'lower', 'p99_ms': 'lower', 'peak_rss_mb': 'lower'}
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def timed(owner, name, samples):
+    """Replace ``owner.name`` with a wrapper that appends each call's duration to ``samples``"""
+    original = getattr(owner, name)
+    if asyncio.iscoroutinefunction(original):
+        @functools.wraps(original)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+    else:
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+    setattr(owner, name, wrapper)
+
+
+def build_zone(words, hits):
+    zone = {}
+    for i in range(hits):
+        records = {'A': [f"10.0.{i // 256 % 256}.{i % 256}"]}
+        if i % 3 == 0:
+            records['AAAA'] = [f"fd00::{i:x}"]
+        zone[f"w{i * (words // hits)}.{DOMAIN}"] = records
+    return zone
+
+
+def fixture_pages(count):
+    """Fixture pages carrying header, cookie, script and body markers"""
+    markers = [
+        ({'Server': 'nginx/1.25.3', 'X-Powered-By': 'PHP/8.2.1'},
+         '<link rel="stylesheet" href="/wp-content/themes/x/style.css">'
+         '<meta name="generator" content="WordPress 6.4">'),
+        ({'Server': 'Apache/2.4.58', 'Set-Cookie': 'laravel_session=abc; Path=/'},
+         '<script src="/js/jquery-3.7.1.min.js"></script>'),
+        ({'Server': 'cloudflare', 'Set-Cookie': 'JSESSIONID=1; Path=/'},
+         '<div id="__next"></div><script src="/_next/static/chunks/main.js"></script>'),
+        ({'X-AspNet-Version': '4.0.30319', 'X-Powered-By': 'ASP.NET'},
+         '<input type="hidden" name="__VIEWSTATE" value="x">'),
+    ]
+    filler = '<p>' + 'lorem ipsum dolor sit amet ' * 40 + '</p>\n'
+    pages = {}
+    for i in range(count):
+        headers, marker = markers[i % len(markers)]
+        body = (f"<html><head><title>page {i}</title></head>"
+                f"<body>{filler * 20}{marker}</body></html>")
+        pages[f"/p{i}"] = (dict(headers, **{'Content-Type': 'text/html'}), body.encode())
+    return pages
+
+
+# -- child side: run one module and print its measurements as JSON --
+
+def measure_imports(starts):
+    """
+    Time ``import recon`` in ``starts`` fresh interpreters; returns
+    (samples, deferred modules loaded)
+    """
+    import compileall
+
+    root = os.path.dirname(BENCH_DIR)
+    # Byte-compile first so the runs measure importing, not compiling
+    compileall.compile_file(os.path.join(root, 'recon.py'), quiet=1)
+    code = (f"import sys, time\n"
+            f"sys.path.insert(0, {root!r})\n"
+            f"start = time.perf_counter()\n"
+            f"import recon\n"
+            f"elapsed = time.perf_counter() - start\n"
+            f"print(elapsed, *sorted(m for m in {DEFERRED!r} if m in sys.modules))\n")
+    samples = []
+    loaded = set()
+    for _ in range(starts):
+        fields = subprocess.run([sys.executable, '-c', code], check=True,
+                                capture_output=True, text=True).stdout.split()
+        samples.append(float(fields[0]))
+        loaded.update(fields[1:])
+    return samples, sorted(loaded)
+
+
+def run_module(config):
+    module = config['module']
+    samples = []
+    out = io.StringIO()
+    extra = {}
+    if module != 'startup':
+        # The startup module must not have recon imported in this process
+        from recon import AsyncResolver, BannerGrabber, ConnectScanner, ReconTool, service_name
+
+    if module == 'startup':
+        samples, loaded = measure_imports(config['starts'])
+        elapsed = sum(samples)
+        items, unit = len(samples), 'imports/s'
+        extra['deferred_loaded'] = loaded
+        correct = not loaded and percentile(sorted(samples), 0.50) * 1000 <= IMPORT_BUDGET_MS
+
+    elif module == 'dns':
+        timed(AsyncResolver, 'resolve_records', samples)
+        recon = ReconTool(DOMAIN, wordlist=config['wordlist'], timeout=2,
+                          resolvers=[config['dns']])
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            recon.subdomain_enumeration()
+        elapsed = time.perf_counter() - start
+        items, unit = config['words'], 'names/s'
+        correct = len(recon.results['subdomains']) == config['hits']
+
+    elif module == 'ports':
+        timed(ConnectScanner, 'probe', samples)
+        ports = list(range(config['low'], config['low'] + config['range']))
+        recon = ReconTool('127.0.0.1', ports=ports, timeout=1)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            recon.port_scan()
+        elapsed = time.perf_counter() - start
+        items, unit = len(ports), 'ports/s'
+        found = {p['port'] for p in recon.results['open_ports']}
+        correct = set(config['open']) <= found
+
+    elif module == 'banners':
+        timed(BannerGrabber, 'probe', samples)
+        recon = ReconTool('127.0.0.1', timeout=2)
+        recon.results['open_ports'] = [{'port': port, 'service': service_name(port)}
+                                       for port in config['open']]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            recon.banner_grabbing()
+        elapsed = time.perf_counter() - start
+        items, unit = len(config['open']), 'banners/s'
+        correct = len(recon.results['banners']) == len(config['open'])
+
+    elif module == 'http':
+        # One ReconTool per fixture page: fetch headers, then detect technologies
+        correct = True
+        start = time.perf_counter()
+        for path in config['pages']:
+            recon = ReconTool(f"{config['http']}{path}", timeout=2)
+            page_start = time.perf_counter()
+            with contextlib.redirect_stdout(out):
+                recon.http_headers()
+                recon.technology_detection()
+            samples.append(time.perf_counter() - page_start)
+            correct = correct and bool(recon.results['technologies'])
+            recon.http.close()
+        elapsed = time.perf_counter() - start
+        items, unit = len(config['pages']), 'pages/s'
+
+    else:
+        raise ValueError(f"unknown module: {module}")
+
+    samples.sort()
+    return {
+        'items': items,
+        'unit': unit,
+        'elapsed': round(elapsed, 4),
+        'throughput': round(items / elapsed, 1) if elapsed > 0 else 0.0,
+        'operations': len(samples),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 3),
+        'p90_ms': round(percentile(samples, 0.90) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'max_ms': round(samples[-1] * 1000, 3) if samples else 0.0,
+        'correct': correct,
+        **extra,
+    }
+
+
+# -- parent side: stand-ins, subprocesses, baselines --
+
+def measure(config):
+    """Run one module in a fresh interpreter; returns its results plus peak RSS"""
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child',
+                             json.dumps(config)], stdout=subprocess.PIPE)
+    output = proc.stdout.read()
+    proc.stdout.close()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"module {config['module']} exited with {proc.returncode}")
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    result['peak_rss_mb'] = round(usage.ru_maxrss / 1024, 1)  # ru_maxrss is in KiB on Linux
+    return result
+
+
+def run_suite(modules, size):
+    from standins import StubDNSServer, StubHTTPServer, TCPListenerFleet
+
+    results = {}
+    with contextlib.ExitStack() as stack:
+        tmp = stack.enter_context(tempfile.TemporaryDirectory())
+        for module in modules:
+            config = {'module': module}
+            if module == 'dns':
+                zone = build_zone(size['words'], size['hits'])
+                server = stack.enter_context(StubDNSServer(zone))
+                wordlist = os.path.join(tmp, 'words.txt')
+                with open(wordlist, 'w') as f:
+                    f.writelines(f"w{i}\n" for i in range(size['words']))
+                config.update(dns=server.address, wordlist=wordlist,
+                              words=size['words'], hits=size['hits'])
+            elif module == 'ports':
+                fleet = stack.enter_context(TCPListenerFleet(size['listeners']))
+                low = max(1, min(fleet.ports) - size['range'] // 2)
+                config.update(low=low, range=min(size['range'], 65536 - low),
+                              open=[p for p in fleet.ports if low <= p < low + size['range']])
+            elif module == 'banners':
+                fleet = stack.enter_context(TCPListenerFleet(
+                    size['banners'], banner=b'SSH-2.0-OpenSSH_9.6 bench\r\n', delay=0.05))
+                config.update(open=fleet.ports)
+            elif module == 'http':
+                server = stack.enter_context(StubHTTPServer(fixture_pages(size['pages'])))
+                config.update(http=server.address, pages=list(server.pages))
+            elif module == 'startup':
+                config.update(starts=size['starts'])
+            print(f"[*] {module}...", file=sys.stderr)
+            results[module] = measure(config)
+    return results
+
+
+def print_table(results):
+    header = (f"{'module':8} {'throughput':>20} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+              f"{'RSS MB':>8}  ok")
+    print(header)
+    print('-' * len(header))
+    for module, r in results.items():
+        print(f"{module:8} {r['throughput']:>10,.1f} {r['unit']:<9} {r['p50_ms']:>9.2f} "
+              f"{r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['peak_rss_mb']:>8.1f}  "
+              f"{'yes' if r['correct'] else 'NO'}")
+
+
+def compare(results, baseline, tolerance):
+    """Print per-metric changes against ``baseline``; returns the regressions found"""
+    regressions = []
+    print(f"\n{'module':8} {'metric':12} {'baseline':>12} {'current':>12} {'change':>8}")
+    for module, current in results.items():
+        before = baseline['modules'].get(module)
+        if before is None:
+            continue
+        for metric, better in METRICS.items():
+            old, new = before.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -tolerance if better == 'higher' else change > tolerance
+            flag = '  REGRESSION' if worse else ''
+            print(f"{module:8} {metric:12} {old:>12,.2f} {new:>12,.2f} {change:>+8.1%}{flag}")
+            if worse:
+                regressions.append((module, metric, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline benchmark suite')
+    parser.add_argument('--modules', default=','.join(MODULES),
+                        help=f"Comma-separated modules to run (default: {','.join(MODULES)})")
+    parser.add_argument('--quick', action='store_true', help='Smaller workloads for a fast check')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Relative change tolerated before a metric counts as a regression '
+                             '(default: 0.15)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_module(json.loads(args.child))))
+        return
+
+    modules = [m.strip() for m in args.modules.split(',') if m.strip()]
+    unknown = set(modules) - set(MODULES)
+    if unknown:
+        parser.error(f"unknown modules: {', '.join(sorted(unknown))}")
+    size = SIZES['quick' if args.quick else 'full']
+
+    results = run_suite(modules, size)
+    print_table(results)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'size': 'quick' if args.quick else 'full',
+        },
+        'modules': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[+] Results written to {args.save}")
+
+    failed = [module for module, r in results.items() if not r['correct']]
+    if failed:
+        print(f"\n[!] Wrong results from: {', '.join(failed)}")
+    startup = results.get('startup')
+    if startup is not None and not startup['correct']:
+        print(f"[!] import recon: p50 {startup['p50_ms']:.1f}ms (budget {IMPORT_BUDGET_MS}ms), "
+              f"deferred modules loaded: {', '.join(startup['deferred_loaded']) or 'none'}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('size') != report['meta']['size']:
+            print(f"\n[!] Baseline was recorded with size '{baseline['meta'].get('size')}'")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n[!] {len(regressions)} regressions beyond {args.tolerance:.0%}")
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,760 @@
+"""
+Local network stand-ins used by the benchmarks.
+
+Everything here binds to 127.0.0.1 or lives in a private network
+namespace, so benchmarks never touch the network.
+"""
+
+import fcntl
+import heapq
+import os
+import random
+import select
+import socket
+import struct
+import subprocess
+import threading
+import time
+
+
+class TCPListenerFleet:
+    """
+    A set of localhost TCP listeners.
+
+    By default every connection is accepted and closed at once. With a
+    ``banner`` each connection is sent the banner ``delay`` seconds after
+    it is accepted (like an SSH or SMTP greeting) and then closed.
+    """
+
+    def __init__(self, count, host='127.0.0.1', banner=None, delay=0.0):
+        """
+        Args:
+            count (int): Number of listening sockets to open
+            host (str): Address to bind on
+            banner (bytes): Greeting sent on every connection (optional)
+            delay (float): Seconds between accepting and sending the banner
+        """
+        self.host = host
+        self.count = count
+        self.banner = banner
+        self.delay = delay
+        self.sockets = []
+        self.ports = []
+        self.accepted = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        for _ in range(self.count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, 0))
+            sock.listen(1024)
+            sock.setblocking(False)
+            self.sockets.append(sock)
+            self.ports.append(sock.getsockname()[1])
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        import selectors
+        selector = selectors.DefaultSelector()
+        for sock in self.sockets:
+            selector.register(sock, selectors.EVENT_READ)
+        pending = []  # (due, sequence, connection) waiting for their banner
+        while not self._stop.is_set():
+            timeout = 0.1
+            if pending:
+                timeout = min(timeout, max(0.0, pending[0][0] - time.monotonic()))
+            for key, _ in selector.select(timeout=timeout):
+                try:
+                    conn, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                self.accepted += 1
+                if self.banner is None:
+                    conn.close()
+                else:
+                    heapq.heappush(pending, (time.monotonic() + self.delay, self.accepted, conn))
+            now = time.monotonic()
+            while pending and pending[0][0] <= now:
+                _, _, conn = heapq.heappop(pending)
+                try:
+                    conn.sendall(self.banner)
+                except OSError:
+                    pass
+                conn.close()
+        for _, _, conn in pending:
+            conn.close()
+        selector.close()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        for sock in self.sockets:
+            sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubDNSServer:
+    """
+    Minimal authoritative DNS server for a synthetic zone.
+
+    Answers A/AAAA queries for names in ``zone`` and NXDOMAIN for
+    everything else, over UDP and TCP. A ``*.`` name is a wildcard for
+    names below it that are not in the zone (RFC 4592). Names listed in
+    ``truncate`` get a truncated UDP reply so clients must retry over TCP.
+    """
+
+    def __init__(self, zone, truncate=(), host='127.0.0.1', ttl=300):
+        """
+        Args:
+            zone (dict): name -> {'A': [...], 'AAAA': [...], 'CNAME': [...]}
+            truncate (iterable): Names whose UDP answers set the TC bit
+            host (str): Address to bind on
+            ttl (int): TTL for every answer
+        """
+        self.zone = {self._key(name): records for name, records in zone.items()}
+        self.truncate = {self._key(name) for name in truncate}
+        self.host = host
+        self.ttl = ttl
+        self.queries = 0
+        self.tcp_queries = 0
+        self.port = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    @staticmethod
+    def _key(name):
+        return name.lower().rstrip('.') + '.'
+
+    def answer(self, wire, tcp=False):
+        fast = self._fast_answer(wire, tcp)
+        if fast is not None:
+            return fast
+        return self._full_answer(wire, tcp)
+
+    def _fast_answer(self, wire, tcp):
+        """
+        Build simple replies (NXDOMAIN, plain A/AAAA) straight from the wire
+        format so the stub is not the bottleneck of a throughput benchmark.
+        Returns None when the full dnspython path is needed.
+        """
+        if len(wire) < 17 or wire[4:6] != b'\x00\x01':
+            return None
+        labels = []
+        pos = 12
+        while True:
+            length = wire[pos]
+            if length == 0:
+                break
+            if length > 63:
+                return None
+            labels.append(wire[pos + 1:pos + 1 + length].decode('ascii', 'replace').lower())
+            pos += 1 + length
+        question_end = pos + 5
+        qtype = int.from_bytes(wire[pos + 1:pos + 3], 'big')
+        name = '.'.join(labels) + '.'
+        records = self.lookup(name)
+        rd = wire[2] & 0x01
+        header = wire[:2]
+        question = wire[12:question_end]
+        if records is None:
+            flags = bytes([0x84 | rd, 0x03])
+            return header + flags + b'\x00\x01\x00\x00\x00\x00\x00\x00' + question
+        if records.get('CNAME') or (name in self.truncate and not tcp) or qtype not in (1, 28):
+            return None
+        family = socket.AF_INET if qtype == 1 else socket.AF_INET6
+        values = records.get('A' if qtype == 1 else 'AAAA', [])
+        answers = b''.join(
+            b'\xc0\x0c' + qtype.to_bytes(2, 'big') + b'\x00\x01' + self.ttl.to_bytes(4, 'big')
+            + (4 if qtype == 1 else 16).to_bytes(2, 'big') + socket.inet_pton(family, value)
+            for value in values)
+        flags = bytes([0x84 | rd, 0x00])
+        counts = b'\x00\x01' + len(values).to_bytes(2, 'big') + b'\x00\x00\x00\x00'
+        return header + flags + counts + question + answers
+
+    def _full_answer(self, wire, tcp):
+        import dns.flags
+        import dns.message
+        import dns.name
+        import dns.rcode
+        import dns.rdatatype
+        import dns.rrset
+
+        query = dns.message.from_wire(wire)
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        question = query.question[0]
+        name = question.name.to_text().lower()
+        records = self.lookup(name)
+        if records is None:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+            return response.to_wire()
+        if name in self.truncate and not tcp:
+            response.flags |= dns.flags.TC
+            return response.to_wire()
+        owner = question.name
+        for target in records.get('CNAME', []):
+            response.answer.append(dns.rrset.from_text(owner, self.ttl, 'IN', 'CNAME', target))
+            owner = dns.name.from_text(target)
+        rdtype = dns.rdatatype.to_text(question.rdtype)
+        values = records.get(rdtype, [])
+        if values:
+            response.answer.append(dns.rrset.from_text(owner, self.ttl, 'IN', rdtype, *values))
+        return response.to_wire()
+
+    def lookup(self, name):
+        """Return the record dict for ``name`` or None for NXDOMAIN"""
+        records = self.zone.get(name)
+        if records is not None:
+            return records
+        # The closest existing ancestor's wildcard, if it has one, answers
+        parent = name.partition('.')[2]
+        while parent:
+            wildcard = self.zone.get('*.' + parent)
+            if wildcard is not None or parent in self.zone:
+                return wildcard
+            parent = parent.partition('.')[2]
+        return None
+
+    def start(self):
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.udp.bind((self.host, 0))
+        self.port = self.udp.getsockname()[1]
+        self.udp.settimeout(0.1)
+        self.tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp.bind((self.host, self.port))
+        self.tcp.listen(128)
+        self.tcp.settimeout(0.1)
+        for target in (self._serve_udp, self._serve_tcp):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _serve_udp(self):
+        while not self._stop.is_set():
+            try:
+                wire, addr = self.udp.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.queries += 1
+            try:
+                self.udp.sendto(self.answer(wire), addr)
+            except Exception:
+                pass
+
+    def _serve_tcp(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self.tcp.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._handle_tcp, args=(conn,), daemon=True).start()
+
+    def _handle_tcp(self, conn):
+        conn.settimeout(2)
+        try:
+            while True:
+                header = self._recv_exact(conn, 2)
+                if not header:
+                    break
+                wire = self._recv_exact(conn, int.from_bytes(header, 'big'))
+                if len(wire) < 12:
+                    # Not DNS (e.g. a port scan probing this listener)
+                    break
+                self.tcp_queries += 1
+                reply = self.answer(wire, tcp=True)
+                conn.sendall(len(reply).to_bytes(2, 'big') + reply)
+        except (OSError, ValueError):
+            pass
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b''
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                return b''
+            data += chunk
+        return data
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self.udp.close()
+        self.tcp.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubHTTPServer:
+    """
+    Threaded HTTP server for fixture pages.
+
+    ``pages`` maps a path to ``(headers, body)``; other paths get a 404.
+    A page with an ``ETag`` header answers a matching If-None-Match with
+    a 304. Every response is delayed by ``delay`` seconds.
+    """
+
+    def __init__(self, pages, host='127.0.0.1', delay=0.0):
+        """
+        Args:
+            pages (dict): path -> (dict of headers, body bytes)
+            host (str): Address to bind on
+            delay (float): Seconds to wait before answering
+        """
+        self.pages = pages
+        self.host = host
+        self.delay = delay
+        self.requests = 0
+        self.not_modified = 0
+        self.body_bytes = 0
+        self.port = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub.requests += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                headers, body = stub.pages.get(self.path, ({}, b'not found'))
+                etag = headers.get('ETag')
+                if etag is not None and self.headers.get('If-None-Match') == etag:
+                    stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200 if self.path in stub.pages else 404)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                stub.body_bytes += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class SimulatedHost:
+    """
+    A remote host behind a slow, lossy link, simulated on a TUN device.
+
+    Packets routed to ``address`` are read from the TUN device and SYNs are
+    answered after ``delay`` seconds (plus up to ``jitter``): SYN-ACK for
+    ports in ``open_ports``, RST for the rest and nothing at all for ports
+    in ``filtered_ports``. The link forwards at most ``bandwidth`` packets
+    per second through a queue of ``queue`` packets; anything arriving at a
+    full queue is dropped, and every packet is also dropped with probability
+    ``loss``. Overdriving the link therefore looks like congestion loss.
+
+    Needs root and a private network namespace (``unshare -n``), since it
+    creates the TUN device and routes ``network`` to it.
+    """
+
+    TUNSETIFF = 0x400454ca
+    IFF_TUN = 0x0001
+    IFF_NO_PI = 0x1000
+
+    def __init__(self, open_ports=(), filtered_ports=(), delay=0.05, jitter=0.01, loss=0.0,
+                 bandwidth=2000, queue=64, network='10.99.0.0/24', name='tun0', seed=0):
+        """
+        Args:
+            open_ports (iterable): Ports answered with SYN-ACK
+            filtered_ports (iterable): Ports that never answer
+            delay (float): One-way-and-back delay in seconds
+            jitter (float): Extra random delay, uniform in [0, jitter]
+            loss (float): Probability that a packet is dropped
+            bandwidth (int): Packets per second the link forwards
+            queue (int): Packets the link buffers before dropping
+            network (str): /24 routed to the device; the host is its .2 address
+            name (str): TUN device name
+            seed (int): Seed for loss and jitter
+        """
+        self.open_ports = set(open_ports)
+        self.filtered_ports = set(filtered_ports)
+        self.delay = delay
+        self.jitter = jitter
+        self.loss = loss
+        self.bandwidth = bandwidth
+        self.queue = queue
+        self.network = network
+        self.local = network.rsplit('.', 1)[0] + '.1'
+        self.address = network.rsplit('.', 1)[0] + '.2'
+        self.name = name
+        self.random = random.Random(seed)
+        self.syns = 0
+        self.dropped = 0
+        self._fd = None
+        self._stop = threading.Event()
+        self._threads = []
+        self._pending = []
+        self._link_free = 0.0
+        self._lock = threading.Condition()
+
+    def start(self):
+        self._fd = os.open('/dev/net/tun', os.O_RDWR)
+        fcntl.ioctl(self._fd, self.TUNSETIFF,
+                    struct.pack('16sH', self.name.encode(), self.IFF_TUN | self.IFF_NO_PI))
+        for command in (['ip', 'link', 'set', 'lo', 'up'],
+                        ['ip', 'addr', 'add', f"{self.local}/24", 'dev', self.name],
+                        ['ip', 'link', 'set', self.name, 'up']):
+            subprocess.run(command, check=True)
+        for target in (self._read, self._deliver):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _read(self):
+        while not self._stop.is_set():
+            if not select.select([self._fd], [], [], 0.1)[0]:
+                continue
+            packet = os.read(self._fd, 65535)
+            reply = self.reply(packet)
+            if reply is None:
+                continue
+            with self._lock:
+                now = time.monotonic()
+                # Packets wait for the link; a full queue or random loss drops them
+                backlog = (self._link_free - now) * self.bandwidth
+                if backlog >= self.queue or self.random.random() < self.loss:
+                    self.dropped += 1
+                    continue
+                self._link_free = max(now, self._link_free) + 1 / self.bandwidth
+                due = self._link_free + self.delay + self.random.uniform(0, self.jitter)
+                heapq.heappush(self._pending, (due, self.syns, reply))
+                self._lock.notify()
+
+    def _deliver(self):
+        while not self._stop.is_set():
+            with self._lock:
+                if not self._pending:
+                    self._lock.wait(0.1)
+                    continue
+                wait = self._pending[0][0] - time.monotonic()
+                if wait > 0:
+                    self._lock.wait(wait)
+                    continue
+                _, _, reply = heapq.heappop(self._pending)
+            try:
+                os.write(self._fd, reply)
+            except OSError:
+                pass
+
+    def reply(self, packet):
+        """Build the reply to one IPv4 packet, or None if it gets none"""
+
+        if len(packet) < 40 or packet[0] >> 4 != 4 or packet[9] != socket.IPPROTO_TCP:
+            return None
+        header = (packet[0] & 0x0F) * 4
+        src, dst = packet[12:16], packet[16:20]
+        sport, dport, seq = struct.unpack('!HHI', packet[header:header + 8])
+        flags = packet[header + 13]
+        if not flags & 0x02 or flags & 0x10:  # only bare SYNs are answered
+            return None
+        self.syns += 1
+        if dport in self.filtered_ports:
+            return None
+        if dport in self.open_ports:
+            reply_flags, ack_seq = 0x12, self.random.getrandbits(32)
+        else:
+            reply_flags, ack_seq = 0x14, 0
+        tcp = struct.pack('!HHIIBBHHH', dport, sport, ack_seq, (seq + 1) & 0xFFFFFFFF,
+                          5 << 4, reply_flags, 65535, 0, 0)
+        pseudo = dst + src + struct.pack('!BBH', 0, socket.IPPROTO_TCP, len(tcp))
+        tcp = tcp[:16] + struct.pack('!H', self._checksum(pseudo + tcp)) + tcp[18:]
+        ip = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(tcp), 0, 0x4000, 64,
+                         socket.IPPROTO_TCP, 0, dst, src)
+        ip = ip[:10] + struct.pack('!H', self._checksum(ip)) + ip[12:]
+        return ip + tcp
+
+    @staticmethod
+    def _checksum(data):
+        if len(data) % 2:
+            data += b'\x00'
+        total = sum(int.from_bytes(data[i:i + 2], 'big') for i in range(0, len(data), 2))
+        while total >> 16:
+            total = (total & 0xFFFF) + (total >> 16)
+        return ~total & 0xFFFF
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        if self._fd is not None:
+            os.close(self._fd)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubTLSServer:
+    """
+    Localhost TLS listeners presenting generated certificates.
+
+    ``certificates`` maps a server name (SNI) to the DNS names listed in
+    the certificate presented for it; the '' entry is presented when the
+    client sends no SNI or an unknown one. Every leaf is issued by one
+    generated CA and sent with it, so clients receive a two-certificate
+    chain. Connections are closed right after the handshake.
+    """
+
+    def __init__(self, certificates, count=1, host='127.0.0.1'):
+        """
+        Args:
+            certificates (dict): Server name -> list of DNS names for its certificate
+            count (int): Number of listening ports, all serving the same certificates
+            host (str): Address to bind on
+        """
+        self.certificates = certificates
+        self.count = count
+        self.host = host
+        self.sockets = []
+        self.ports = []
+        self.handshakes = 0
+        self._contexts = {}
+        self._stop = threading.Event()
+        self._threads = []
+
+    @staticmethod
+    def _issue(names, issuer=None, issuer_key=None):
+        """Generate a key and a certificate for ``names`` (a CA when ``issuer`` is None)"""
+        import datetime
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        subject = x509.Name([x509.NameAttribute(
+            NameOID.COMMON_NAME, names[0] if names else 'Stand-in CA')])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        builder = (x509.CertificateBuilder()
+                   .subject_name(subject)
+                   .issuer_name(issuer.subject if issuer is not None else subject)
+                   .public_key(key.public_key())
+                   .serial_number(x509.random_serial_number())
+                   .not_valid_before(now - datetime.timedelta(days=1))
+                   .not_valid_after(now + datetime.timedelta(days=90)))
+        if issuer is None:
+            builder = builder.add_extension(x509.BasicConstraints(ca=True, path_length=None), True)
+        else:
+            builder = builder.add_extension(
+                x509.SubjectAlternativeName([x509.DNSName(name) for name in names]), False)
+        return key, builder.sign(issuer_key or key, hashes.SHA256())
+
+    def start(self):
+        import ssl
+        import tempfile
+        from cryptography.hazmat.primitives import serialization
+
+        ca_key, ca = self._issue([])
+        ca_pem = ca.public_bytes(serialization.Encoding.PEM)
+        with tempfile.TemporaryDirectory() as tmp:
+            for server_name, names in self.certificates.items():
+                key, cert = self._issue(names, ca, ca_key)
+                path = os.path.join(tmp, 'cert.pem')
+                with open(path, 'wb') as f:
+                    f.write(key.private_bytes(serialization.Encoding.PEM,
+                                              serialization.PrivateFormat.PKCS8,
+                                              serialization.NoEncryption()))
+                    f.write(cert.public_bytes(serialization.Encoding.PEM) + ca_pem)
+                context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                context.load_cert_chain(path)
+                self._contexts[server_name] = context
+        default = self._contexts.get('') or next(iter(self._contexts.values()))
+
+        def select(sock, server_name, _):
+            sock.context = self._contexts.get(server_name or '', default)
+
+        default.sni_callback = select
+        self._default = default
+        for _ in range(self.count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, 0))
+            sock.listen(1024)
+            sock.settimeout(0.1)
+            self.sockets.append(sock)
+            self.ports.append(sock.getsockname()[1])
+            thread = threading.Thread(target=self._serve, args=(sock,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _serve(self, sock):
+        while not self._stop.is_set():
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                continue
+            threading.Thread(target=self._handshake, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        conn.settimeout(5)
+        try:
+            with self._default.wrap_socket(conn, server_side=True):
+                self.handshakes += 1
+        except OSError:
+            conn.close()
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        for sock in self.sockets:
+            sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubWhoisServer:
+    """
+    Threaded WHOIS (port 43) server for fixture domains.
+
+    Answers in the Verisign registry format for every domain in
+    ``domains`` and with a "No match" line otherwise, after ``delay``
+    seconds. With a ``limit``, queries beyond that many in the last
+    second are refused the way busy registries do, and counted.
+    """
+
+    def __init__(self, domains, host='127.0.0.1', delay=0.0, limit=None):
+        """
+        Args:
+            domains (iterable): Registered domain names
+            host (str): Address to bind on
+            delay (float): Seconds to wait before answering
+            limit (int): Queries per second served before refusing
+        """
+        self.domains = {domain.lower() for domain in domains}
+        self.host = host
+        self.delay = delay
+        self.limit = limit
+        self.queries = 0
+        self.refused = 0
+        self.port = None
+        self._recent = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def answer(self, domain):
+        if domain not in self.domains:
+            return f'No match for "{domain.upper()}".\r\n'
+        return (f"   Domain Name: {domain.upper()}\r\n"
+                f"   Registrar: Stub Registrar, Inc.\r\n"
+                f"   Creation Date: 2001-02-03T04:05:06Z\r\n"
+                f"   Registry Expiry Date: 2031-02-03T04:05:06Z\r\n"
+                f"   Domain Status: clientTransferProhibited\r\n"
+                f"   Name Server: NS1.{domain.upper()}\r\n"
+                f"   Name Server: NS2.{domain.upper()}\r\n"
+                f"   Registrant Country: US\r\n"
+                f"   Registrant Email: hostmaster@{domain}\r\n")
+
+    def start(self):
+        import socketserver
+
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                domain = self.rfile.readline().decode('utf-8', 'replace').strip().lower()
+                now = time.monotonic()
+                with stub._lock:
+                    stub.queries += 1
+                    stub._recent = [t for t in stub._recent if now - t < 1] + [now]
+                    refuse = stub.limit is not None and len(stub._recent) > stub.limit
+                    if refuse:
+                        stub.refused += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                text = ('WHOIS LIMIT EXCEEDED - SEE WWW.PIR.ORG/WHOIS FOR DETAILS\r\n' if refuse
+                        else stub.answer(domain))
+                self.wfile.write(text.encode())
+
+        self._server = socketserver.ThreadingTCPServer((self.host, 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
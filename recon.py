@@ -5,19 +5,35 @@ A comprehensive reconnaissance tool for cybersecurity professionals
 """
 
 import argparse
+import bisect
+import contextlib
+import functools
+import hashlib
+import itertools
+import ipaddress
+import math
+import mmap
 import socket
-import ssl
+import struct
 import sys
+import threading
 import json
-import dns.resolver
-import requests
-import whois
+from collections import Counter, OrderedDict, deque
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
-import subprocess
 import re
 import os
+import queue
+import random
+import shutil
+import tempfile
+import time
+
+# Heavy or stage-specific dependencies (asyncio, ssl, sqlite3, dnspython,
+# requests, whois, ...) are imported inside the functions that use them, so
+# `--help` and short single-stage runs do not pay for modules they never
+# touch. The `startup` module of `benchmarks/run.py` keeps this within budget.
+
 
 # ANSI Color codes
 class Colors:
@@ -31,41 +47,4086 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+
+@functools.lru_cache(maxsize=None)
+def service_name(port):
+    """Return the IANA service name for a TCP port, or 'unknown'"""
+    try:
+        return socket.getservbyport(port)
+    except (OSError, OverflowError):
+        return "unknown"
+
+
+def raise_fd_limit(wanted):
+    """
+    Raise the soft open-file limit towards ``wanted`` and return the
+    number of sockets that can safely be held open at once.
+    """
+    try:
+        import resource
+    except ImportError:
+        return wanted
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted + 64
+    if soft != resource.RLIM_INFINITY and soft < target:
+        new_soft = target if hard == resource.RLIM_INFINITY else min(target, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+            soft = new_soft
+        except (ValueError, OSError):
+            pass
+    if soft == resource.RLIM_INFINITY:
+        return wanted
+    # Keep some descriptors back for stdio, report files and DNS sockets
+    return max(1, min(wanted, soft - 64))
+
+
+async def run_workers(items, handle, concurrency):
+    """
+    Drain ``items`` through ``concurrency`` coroutines calling ``handle(item)``.
+
+    The iterator is shared, so at most ``concurrency`` items are ever in
+    flight and nothing is read ahead of the workers.
+    """
+    import asyncio
+
+    items = iter(items)
+
+    async def worker():
+        for item in items:
+            await handle(item)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+class RTTEstimator:
+    """
+    Round-trip time estimator and retransmission timeout (RFC 6298).
+
+    Keeps a smoothed RTT and RTT variance from probe round trips and
+    derives the timeout as SRTT + 4 * RTTVAR, clamped to
+    [``min_rto``, ``max_rto``]. Until the first sample arrives the
+    timeout is ``max_rto``.
+    """
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+    GRANULARITY = 0.01
+    QUEUE_SAMPLES = 8
+
+    def __init__(self, max_rto=3.0, min_rto=0.1):
+        """
+        Args:
+            max_rto (float): Upper bound (and initial value) of the timeout
+            min_rto (float): Lower bound of the timeout
+        """
+        self.max_rto = max_rto
+        self.min_rto = min(min_rto, max_rto)
+        self.srtt = None
+        self.rttvar = None
+        self.min_rtt = None
+        self.samples = 0
+        self._recent = deque(maxlen=self.QUEUE_SAMPLES)
+
+    def sample(self, rtt):
+        """
+        Fold one measured round trip (seconds) into the estimate.
+
+        Returns:
+            bool: True if the last ``QUEUE_SAMPLES`` round trips all show
+                queueing delay, i.e. are well above the lowest one seen so far
+        """
+        self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+        self._recent.append(rtt)
+        return (len(self._recent) == self._recent.maxlen
+                and min(self._recent) > self.min_rtt + max(self.GRANULARITY, self.min_rtt / 8))
+
+    @property
+    def rto(self):
+        if self.srtt is None:
+            return self.max_rto
+        rto = self.srtt + max(self.GRANULARITY, self.K * self.rttvar)
+        return min(self.max_rto, max(self.min_rto, rto))
+
+
+class AIMDWindow:
+    """
+    Additive-increase / multiplicative-decrease limit on probes in flight.
+
+    The window starts small and grows by one per completed probe (slow
+    start) up to the threshold, then by one per window of completions.
+    Probes that report queueing delay end slow start early. A
+    congestion signal halves the window and sets the threshold to the
+    new size. Like TCP's recovery point, signals from probes that were
+    already in flight when the window was cut are ignored, so a burst of
+    drops counts as one event. Create one per event loop.
+    """
+
+    def __init__(self, maximum, initial=10, minimum=1):
+        """
+        Args:
+            maximum (int): Hard cap on probes in flight
+            initial (int): Starting window
+            minimum (int): Floor the window never drops below
+        """
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.window = float(max(self.minimum, min(initial, self.maximum)))
+        self.threshold = float(self.maximum)
+        self.inflight = 0
+        self.completed = 0
+        self.decreases = 0
+        self._recovery = 0
+        self._waiters = deque()
+
+    async def acquire(self):
+        while self.inflight >= int(self.window):
+            import asyncio
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self.inflight += 1
+
+    def release(self, congested=False, queued=False):
+        """
+        Return a slot after a probe completes.
+
+        Args:
+            congested (bool): The probe detected a loss
+            queued (bool): The probe's round trip showed queueing delay;
+                slow start ends instead of waiting for drops
+        """
+        self.inflight -= 1
+        self.completed += 1
+        if congested:
+            self._decrease()
+        elif self.window < self.threshold:
+            if queued:
+                self.threshold = self.window
+            else:
+                self.window = min(self.maximum, self.window + 1)
+        else:
+            self.window = min(self.maximum, self.window + 1 / self.window)
+        for _ in range(min(len(self._waiters), int(self.window) - self.inflight)):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _decrease(self):
+        if self.completed <= self._recovery:
+            return
+        self._recovery = self.completed + self.inflight
+        self.window = max(self.minimum, self.window / 2)
+        self.threshold = self.window
+        self.decreases += 1
+
+
+class TokenBucket:
+    """
+    Rate limiter: ``take()`` (async) or ``wait()`` (blocking, for threads)
+    returns at most ``rate`` times per second on average
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Args:
+            rate (float): Tokens per second
+            burst (int): Bucket size (default: a tenth of a second of tokens, at least 1)
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate / 10))
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = None
+        self._thread_lock = threading.Lock()
+
+    async def take(self):
+        import asyncio
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def wait(self):
+        # The token is claimed up front, so waiting threads queue up behind
+        # one another without holding the lock while they sleep
+        with self._thread_lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate) - 1
+            self._updated = now
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class SharedTokenBucket:
+    """
+    Blocking rate limiter shared between processes: ``wait()`` returns at
+    most ``rate`` times per second across every process holding the same
+    ``slots`` mapping and ``lock`` (e.g. from a ``multiprocessing.Manager``).
+
+    Like ``TokenBucket.wait`` with a burst of one, each caller claims the
+    next free slot under the lock and sleeps until it comes round.
+    """
+
+    def __init__(self, rate, slots, lock, key):
+        """
+        Args:
+            rate (float): Calls per second
+            slots (dict): Shared mapping of key -> time of the next free slot
+            lock (Lock): Shared lock guarding ``slots``
+            key (str): Entry of ``slots`` this bucket uses
+        """
+        self.rate = float(rate)
+        self.slots = slots
+        self.lock = lock
+        self.key = key
+
+    def wait(self):
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.slots.get(self.key, 0.0))
+            self.slots[self.key] = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over a bytearray.
+
+    All probe positions come from one BLAKE2b digest unpacked as 32-bit
+    words, so each operation costs a single hash call.
+    """
+
+    MAX_HASHES = 10
+
+    def __init__(self, capacity, error_rate=1e-4):
+        """
+        Args:
+            capacity (int): Expected number of distinct items
+            error_rate (float): Target false-positive probability at capacity
+        """
+        capacity = max(1, capacity)
+        self.size = max(64, min(2 ** 32, int(-capacity * math.log(error_rate)
+                                             / (math.log(2) ** 2))))
+        self.hashes = min(self.MAX_HASHES, max(1, round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self._unpack = struct.Struct(f'<{self.hashes}I').unpack
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode() if isinstance(item, str) else item,
+                                 digest_size=4 * self.hashes).digest()
+        size = self.size
+        return [word % size for word in self._unpack(digest)]
+
+    def add(self, item):
+        """Insert ``item``; returns False if it was (probably) already present"""
+        bits = self.bits
+        added = False
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        return added
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class WordlistStream:
+    """
+    Lazily yield unique labels from a wordlist file.
+
+    The file is memory-mapped and walked line by line, so memory use does
+    not depend on the file size; duplicates are dropped on the fly with a
+    Bloom filter sized from the file. The filter cannot tell a repeat from
+    a false positive, so the first time a label tests positive it is still
+    yielded and kept in ``suspects``; only later copies count as
+    duplicates. No unique label is lost, at the cost of one extra lookup
+    (usually a cache hit) per repeated label.
+    """
+
+    def __init__(self, f, start=0):
+        """
+        Args:
+            f (file): Wordlist opened in binary mode
+            start (int): Byte offset to start from (a line boundary, e.g. a
+                previously recorded ``offset``)
+        """
+        self.file = f
+        self.size = os.fstat(f.fileno()).st_size
+        self.lines = 0
+        self.duplicates = 0
+        self.start = start
+        self.offset = start
+        self.estimated_lines = self._estimate_lines()
+        self.seen = BloomFilter(self.estimated_lines)
+        self.suspects = set()
+
+    def _estimate_lines(self):
+        sample = self.file.read(65536)
+        self.file.seek(0)
+        if not sample:
+            return 1
+        average = len(sample) / max(1, sample.count(b'\n'))
+        return int(self.size / average) + 1
+
+    def _raw_lines(self):
+        try:
+            mapped = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and pipes cannot be mapped
+            if self.start:
+                self.file.seek(self.start)
+            yield from self.file
+            return
+        with mapped:
+            mapped.seek(self.start)
+            yield from iter(mapped.readline, b'')
+
+    def __iter__(self):
+        for raw in self._raw_lines():
+            self.offset += len(raw)
+            label = raw.strip().decode('utf-8', errors='ignore').lower()
+            if not label:
+                continue
+            self.lines += 1
+            if not self.seen.add(label):
+                if label in self.suspects:
+                    self.duplicates += 1
+                    continue
+                # A repeat or a false positive: yield it once more to be sure
+                self.suspects.add(label)
+            yield label
+
+
+class PermutationGenerator:
+    """
+    Lazily mutate discovered subdomains into new candidate names.
+
+    The leftmost label of each seed is varied: numbers in it are stepped
+    up and down (or appended when it has none), and every word is joined
+    to it with or without a hyphen, swapped in for it, inserted below it
+    and prefixed as a new label (``api`` gives ``api-dev``, ``dev.api``,
+    ``eu.api``, ...). Words are the built-in environment and region names
+    followed by the labels of every found name passed to ``learn``.
+
+    Candidates are produced word by word across all seeds, so a capped
+    run tries the likeliest mutations of every seed first. Each name
+    handed out is added to a Bloom filter, and names already queried can
+    be marked with ``exclude``; memory is set by ``capacity``, not by the
+    size of the candidate space.
+    """
+
+    WORDS = ('dev', 'staging', 'stage', 'stg', 'test', 'qa', 'uat', 'prod', 'preprod', 'beta',
+             'demo', 'sandbox', 'int', 'internal', 'ext', 'admin', 'api', 'app', 'web', 'www',
+             'old', 'new', 'v1', 'v2', 'eu', 'us', 'uk', 'de', 'asia', 'east', 'west', 'cdn')
+    SEPARATORS = ('-', '')
+    NUMBERS = 3
+
+    def __init__(self, zone, words=WORDS, capacity=1000000, error_rate=1e-4):
+        """
+        Args:
+            zone (str): Domain the seeds and candidates belong to
+            words (iterable): Words to combine with the seeds' labels
+            capacity (int): Names expected to pass through the filter
+                (candidates plus excluded names)
+            error_rate (float): Chance of wrongly dropping a new candidate
+                at capacity
+        """
+        self.zone = zone
+        self.words = list(dict.fromkeys(words))
+        self._known_words = set(self.words)
+        self.seen = BloomFilter(capacity, error_rate)
+        self.generated = 0
+        self.duplicates = 0
+
+    def exclude(self, name):
+        """Mark ``name`` as already queried"""
+        self.seen.add(name)
+
+    def learn(self, name):
+        """Add the words making up the labels of ``name`` to the word list"""
+        for label in name[:-len(self.zone) - 1].split('.'):
+            for word in label.split('-'):
+                word = word.rstrip('0123456789')
+                if len(word) > 1 and word not in self._known_words:
+                    self._known_words.add(word)
+                    self.words.append(word)
+
+    def _numbered(self, head, parent):
+        digits = list(re.finditer(r'\d+', head))
+        if not digits:
+            for n in range(1, self.NUMBERS + 1):
+                for sep in self.SEPARATORS:
+                    yield f"{head}{sep}{n}.{parent}"
+            return
+        for match in digits:
+            value = int(match.group())
+            for n in range(max(0, value - self.NUMBERS), value + self.NUMBERS + 1):
+                if n != value:
+                    number = str(n).zfill(len(match.group()))
+                    yield f"{head[:match.start()]}{number}{head[match.end():]}.{parent}"
+
+    def _worded(self, word, head, parent):
+        if word == head:
+            return
+        for sep in self.SEPARATORS:
+            yield f"{head}{sep}{word}.{parent}"
+            yield f"{word}{sep}{head}.{parent}"
+        yield f"{word}.{parent}"
+        yield f"{word}.{head}.{parent}"
+        if parent != self.zone:
+            yield f"{head}.{word}.{parent}"
+
+    def candidates(self, seeds):
+        """
+        Yield new names derived from ``seeds``, each at most once.
+
+        Args:
+            seeds (iterable): Found names under the zone
+
+        Yields:
+            str: Candidate names not generated or excluded before
+        """
+        suffix = '.' + self.zone
+        seeds = [name.partition('.')[::2] for name in dict.fromkeys(seeds)
+                 if name.endswith(suffix)]
+        numbered = (self._numbered(head, parent) for head, parent in seeds)
+        # Words learned while this runs are picked up at the end of the list
+        worded = (self._worded(word, head, parent)
+                  for word in self.words for head, parent in seeds)
+        for name in itertools.chain.from_iterable(itertools.chain(numbered, worded)):
+            if len(name) > 253 or any(len(label) > 63 for label in name.split('.')):
+                continue
+            if not self.seen.add(name):
+                self.duplicates += 1
+                continue
+            self.generated += 1
+            yield name
+
+
+def json_default(value):
+    """``json`` fallback: result records become their dicts, anything else a string"""
+    to_json = getattr(value, 'to_json', None)
+    return to_json() if to_json is not None else str(value)
+
+
+def plain_results(value):
+    """``value`` with every result record replaced by its dict, ready for plain ``json``"""
+    if isinstance(value, Record):
+        return value.to_json()
+    if isinstance(value, dict):
+        return {key: plain_results(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [plain_results(item) for item in value]
+    return value
+
+
+class Record:
+    """
+    Base for compact result records.
+
+    Fields live in ``__slots__`` rather than a per-object dict, and records
+    read like the dicts they replace (``record['port']``, ``get``, ``keys``)
+    so consumers and baselines loaded from JSON are interchangeable.
+    ``to_json`` gives the dict written to reports, journals and events.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for field, value in zip(self.__slots__, args):
+            setattr(self, field, value)
+        for field, value in kwargs.items():
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_json()
+        if isinstance(other, dict):
+            return self.to_json() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+    def to_json(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class PortRecord(Record):
+    """An open port on the target"""
+
+    __slots__ = ('port', 'service')
+
+
+class EndpointRecord(Record):
+    """An open port on one address; one record is shared by every name on the address"""
+
+    __slots__ = ('ip', 'port', 'service')
+
+
+class AddressRecords(Record):
+    """A, AAAA and CNAME values of one name, held as tuples (empty ones share ``()``)"""
+
+    __slots__ = ('A', 'AAAA', 'CNAME')
+
+    def __init__(self, A=(), AAAA=(), CNAME=()):
+        self.A = tuple(A)
+        self.AAAA = tuple(AAAA)
+        self.CNAME = tuple(CNAME)
+
+    @classmethod
+    def coerce(cls, records):
+        """``records`` as AddressRecords (None stays None), e.g. after a JSON round trip"""
+        if records is None or isinstance(records, cls):
+            return records
+        return cls(records.get('A', ()), records.get('AAAA', ()), records.get('CNAME', ()))
+
+    def to_json(self):
+        return {'A': list(self.A), 'AAAA': list(self.AAAA), 'CNAME': list(self.CNAME)}
+
+
+class PortSet:
+    """
+    Ports held as sorted, merged (first, last) ranges.
+
+    ``-p 1-65535`` is one range instead of a 65,535-element list. Iteration
+    yields ports in ascending order and membership is a binary search.
+    """
+
+    __slots__ = ('ranges', '_starts', '_size')
+
+    def __init__(self, ports=()):
+        """
+        Args:
+            ports (iterable): Port numbers, in any order, duplicates allowed
+        """
+        self._set_ranges((port, port) for port in ports)
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Parse a port specification such as ``1-1000`` or ``22,80,8000-8100``.
+
+        Raises:
+            ValueError: If a port is malformed or outside 1-65535
+        """
+        ranges = []
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            first, _, last = part.partition('-')
+            first = int(first)
+            last = int(last) if last else first
+            if not 1 <= first <= last <= 65535:
+                raise ValueError(f"invalid port range: {part}")
+            ranges.append((first, last))
+        if not ranges:
+            raise ValueError(f"no ports in {spec!r}")
+        ports = cls()
+        ports._set_ranges(ranges)
+        return ports
+
+    def _set_ranges(self, ranges):
+        merged = []
+        for first, last in sorted(ranges):
+            if merged and first <= merged[-1][1] + 1:
+                if last > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], last)
+            else:
+                merged.append((first, last))
+        self.ranges = merged
+        self._starts = [first for first, _ in merged]
+        self._size = sum(last - first + 1 for first, last in merged)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(range(first, last + 1) for first, last in self.ranges)
+
+    def __contains__(self, port):
+        index = bisect.bisect_right(self._starts, port) - 1
+        return index >= 0 and port <= self.ranges[index][1]
+
+    def __eq__(self, other):
+        return isinstance(other, PortSet) and self.ranges == other.ranges
+
+    def __repr__(self):
+        return 'PortSet(' + ','.join(str(first) if first == last else f"{first}-{last}"
+                                     for first, last in self.ranges) + ')'
+
+
+class ResolutionCache:
+    """
+    DNS answer cache shared by every module of a run.
+
+    Entries are keyed by (name, kind) and expire with the record TTL.
+    Negative answers are stored as ``None`` (NXDOMAIN) or an empty list
+    (no data) with the RFC 2308 negative TTL. A bounded in-memory LRU sits in front of an
+    optional SQLite store, so repeated runs against the same estate skip
+    lookups that are still fresh.
+    """
+
+    NEGATIVE_TTL = 300
+    FLUSH_EVERY = 1000
+
+    def __init__(self, path=None, max_entries=100000):
+        """
+        Args:
+            path (str): SQLite file for persistence across runs (optional)
+            max_entries (int): Maximum entries kept in memory and on disk
+        """
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self._entries = OrderedDict()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            import sqlite3
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS dns_cache (
+                                    name TEXT NOT NULL,
+                                    kind TEXT NOT NULL,
+                                    expires REAL NOT NULL,
+                                    value TEXT,
+                                    PRIMARY KEY (name, kind))""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS dns_cache_expires ON dns_cache (expires)")
+            self._db.execute("DELETE FROM dns_cache WHERE expires <= ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, name, kind):
+        """
+        Look up a fresh entry.
+
+        Returns:
+            tuple: (found, value); ``value`` is None (NXDOMAIN) or empty (no
+            data) for a cached negative answer
+        """
+        key = (name.lower().rstrip('.'), kind)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires, value FROM dns_cache WHERE name = ? AND kind = ?",
+                    key).fetchone()
+                if row:
+                    entry = (row[0], None if row[1] is None else json.loads(row[1]))
+                    self._remember(key, entry)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._entries.pop(key, None)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if not entry[1]:
+                self.negative_hits += 1
+            return True, entry[1]
+
+    def put(self, name, kind, value, ttl=None):
+        """Store ``value`` for ``ttl`` seconds (the negative TTL default if None)"""
+        if ttl is None:
+            ttl = self.NEGATIVE_TTL
+        if ttl <= 0:
+            return
+        key = (name.lower().rstrip('.'), kind)
+        entry = (time.time() + ttl, value)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                value = None if value is None else json.dumps(value, default=json_default)
+                self._pending.append(key + (entry[0], value))
+                if len(self._pending) >= self.FLUSH_EVERY:
+                    self._flush()
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany("INSERT OR REPLACE INTO dns_cache VALUES (?, ?, ?, ?)",
+                                 self._pending)
+            self._db.commit()
+            self._pending = []
+
+    def stats(self):
+        """Hit/miss counters for the report"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'negative_hits': self.negative_hits,
+            'entries': len(self._entries),
+        }
+
+    def close(self):
+        """Write pending entries and trim the on-disk store to ``max_entries``"""
+        with self._lock:
+            if self._db is None:
+                return
+            self._flush()
+            self._db.execute("DELETE FROM dns_cache WHERE expires <= ?", (time.time(),))
+            self._db.execute("""DELETE FROM dns_cache WHERE rowid IN (
+                                    SELECT rowid FROM dns_cache ORDER BY expires DESC
+                                    LIMIT -1 OFFSET ?)""", (self.max_entries,))
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+
+def answer_ttl(response):
+    """Smallest TTL across the answer section of a dnspython message"""
+    ttls = [rrset.ttl for rrset in response.answer]
+    return min(ttls) if ttls else None
+
+
+def negative_ttl(response):
+    """RFC 2308 negative TTL: min(SOA TTL, SOA minimum) from the authority section"""
+    import dns.rdatatype
+
+    if response is None:
+        return None
+    for rrset in response.authority:
+        if rrset.rdtype == dns.rdatatype.SOA:
+            return min(rrset.ttl, rrset[0].minimum)
+    return None
+
+
+def _skip_wire_name(data, pos):
+    while True:
+        length = data[pos]
+        if length & 0xC0 == 0xC0:
+            return pos + 2
+        if length == 0:
+            return pos + 1
+        pos += 1 + length
+
+
+def wire_negative_ttl(data, question_length):
+    """
+    Negative TTL straight from a raw reply, without a full dnspython parse.
+
+    Walks past the question and answer records and returns
+    min(SOA TTL, SOA minimum) for the first SOA in the authority section.
+    """
+    import dns.rdatatype
+
+    try:
+        ancount = int.from_bytes(data[6:8], 'big')
+        nscount = int.from_bytes(data[8:10], 'big')
+        pos = 12 + question_length
+        for index in range(ancount + nscount):
+            pos = _skip_wire_name(data, pos)
+            rtype, _, ttl, rdlength = struct.unpack_from('!HHIH', data, pos)
+            pos += 10
+            if index >= ancount and rtype == dns.rdatatype.SOA:
+                minimum = int.from_bytes(data[pos + rdlength - 4:pos + rdlength], 'big')
+                return min(ttl, minimum)
+            pos += rdlength
+    except (IndexError, struct.error):
+        pass
+    return None
+
+
+class ConnectScanner:
+    """
+    Non-blocking TCP connect scanner built on asyncio.
+
+    A fixed pool of worker coroutines pulls (ip, port) pairs from a shared
+    iterator, so the number of connects in flight never exceeds
+    ``max_inflight`` and the target list is never materialised.
+
+    In adaptive mode the per-connect timeout follows each address's
+    measured RTT (one ``RTTEstimator`` per IP) and an ``AIMDWindow``
+    decides how many of the workers may probe at once. A silent port is
+    retried once its address is known to answer; if the retry gets a reply the first probe was lost,
+    which is the congestion signal that shrinks the window. Plain timeouts
+    are not, since filtered ports never answer at all. Once losses have
+    been seen, silent ports get up to ``MAX_RETRIES`` retries.
+    """
+
+    OPEN = 'open'
+    CLOSED = 'closed'
+    FILTERED = 'filtered'
+    ERROR = 'error'
+    MAX_RETRIES = 3
+
+    def __init__(self, timeout=3, max_inflight=1000, adaptive=True, rate=None, rtts=None,
+                 metrics=None):
+        """
+        Args:
+            timeout (float): Per-connect timeout in seconds (the cap in adaptive mode)
+            max_inflight (int): Maximum number of concurrent connects
+            adaptive (bool): Use RTT-based timeouts and AIMD concurrency
+            rate (float): Maximum connects per second (optional)
+            rtts (dict): IP -> RTTEstimator, shared with other modules
+            metrics (Metrics): Registry for per-probe latency and outcome counts
+        """
+        self.timeout = timeout
+        self.max_inflight = raise_fd_limit(max(1, max_inflight))
+        self.adaptive = adaptive
+        self.rate = rate
+        self.rtts = rtts if rtts is not None else {}
+        self.metrics = metrics or NULL_METRICS
+
+    def rtt_for(self, ip):
+        """RTT estimator for ``ip``, created on first use"""
+        rtt = self.rtts.get(ip)
+        if rtt is None:
+            rtt = self.rtts[ip] = RTTEstimator(max_rto=self.timeout)
+        return rtt
+
+    def scan(self, targets, on_result=None):
+        """
+        Probe every (ip, port) pair in ``targets``.
+
+        Args:
+            targets (iterable): (ip, port) tuples, consumed lazily
+            on_result (callable): Called as ``on_result(ip, port, state)``
+                for every probe as soon as it completes
+
+        Returns:
+            dict: Probe counters per state, retries and detected losses,
+                final window and timeout, elapsed time and rate
+        """
+        import asyncio
+
+        return asyncio.run(self._scan(iter(targets), on_result))
+
+    async def _scan(self, targets, on_result):
+        import asyncio
+
+        stats = {self.OPEN: 0, self.CLOSED: 0, self.FILTERED: 0, self.ERROR: 0,
+                 'retries': 0, 'losses': 0}
+        window = AIMDWindow(self.max_inflight) if self.adaptive else None
+        bucket = TokenBucket(self.rate) if self.rate else None
+        loop = asyncio.get_running_loop()
+        metrics = self.metrics
+        instrumented = metrics.enabled
+        start = time.perf_counter()
+
+        async def attempt(ip, port):
+            """Probe once; returns (state, whether the round trip showed queueing)"""
+            if bucket is not None:
+                await bucket.take()
+            rtt = self.rtt_for(ip) if self.adaptive else None
+            sent = loop.time()
+            state = await self.probe(ip, port, rtt.rto if rtt is not None else None)
+            elapsed = loop.time() - sent
+            if instrumented:
+                metrics.observe('connect_seconds', elapsed, state=state)
+            if rtt is not None and state in (self.OPEN, self.CLOSED):
+                return state, rtt.sample(elapsed)
+            return state, False
+
+        async def handle(target):
+            ip, port = target
+            if window is not None:
+                await window.acquire()
+            if instrumented:
+                metrics.gauge('connects_inflight', 1)
+            lost = queued = False
+            try:
+                state, queued = await attempt(ip, port)
+                tries = 0
+                while (state == self.FILTERED and window is not None
+                       and self.rtt_for(ip).srtt is not None
+                       and tries < (self.MAX_RETRIES if stats['losses'] else 1)):
+                    tries += 1
+                    stats['retries'] += 1
+                    state, queued = await attempt(ip, port)
+                    if state != self.FILTERED:
+                        stats['losses'] += 1
+                        lost = True
+            finally:
+                if window is not None:
+                    window.release(congested=lost, queued=queued)
+                if instrumented:
+                    metrics.gauge('connects_inflight', -1)
+            stats[state] += 1
+            if on_result:
+                on_result(ip, port, state)
+
+        await run_workers(targets, handle, self.max_inflight)
+
+        elapsed = time.perf_counter() - start
+        stats['probed'] = sum(stats[s] for s in (self.OPEN, self.CLOSED,
+                                                 self.FILTERED, self.ERROR))
+        stats['elapsed'] = elapsed
+        stats['rate'] = stats['probed'] / elapsed if elapsed > 0 else 0.0
+        stats['window'] = int(window.window) if window is not None else self.max_inflight
+        stats['rto'] = (max((rtt.rto for rtt in self.rtts.values()), default=self.timeout)
+                        if self.adaptive else self.timeout)
+        for state in (self.OPEN, self.CLOSED, self.FILTERED, self.ERROR):
+            metrics.inc('ports_total', stats[state], state=state)
+        metrics.inc('connect_retries_total', stats['retries'])
+        metrics.inc('connect_losses_total', stats['losses'])
+        return stats
+
+    async def probe(self, ip, port, timeout=None):
+        """Attempt a single TCP connect and classify the outcome"""
+        import asyncio
+
+        family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        loop = asyncio.get_running_loop()
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError:
+            return self.ERROR
+        try:
+            sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout or self.timeout)
+            return self.OPEN
+        except asyncio.TimeoutError:
+            return self.FILTERED
+        except ConnectionRefusedError:
+            return self.CLOSED
+        except OSError:
+            return self.ERROR
+        finally:
+            sock.close()
+
+
+class _CongestionSignal(Exception):
+    """Raised by a probe whose known-open port did not accept the connection"""
+
+
+class BannerGrabber:
+    """
+    Concurrent, protocol-aware banner collection built on asyncio.
+
+    Each port is matched to an entry in ``PROBES``: what to send (nothing
+    for services that greet first), whether to wrap the connection in TLS,
+    and a pattern marking a complete reply. Reading stops as soon as that
+    pattern appears, the byte cap is reached or the peer closes; probes
+    without a pattern stop once the peer goes quiet for ``IDLE`` seconds.
+    Ports without an entry wait ``GREETING`` seconds for the service to
+    speak, then send an HTTP HEAD, and repeat it over TLS if the service
+    drops the plaintext request, so web servers on unlisted ports still
+    report a banner.
+
+    In adaptive mode the connect timeout follows the measured RTT and an
+    ``AIMDWindow`` limits how many ports are probed at once; since every
+    port handed in is known to be open, a connect that times out or is
+    reset counts as congestion.
+    """
+
+    IDLE = 0.5
+    # How long a 'generic' port may stay silent before it is sent an HTTP HEAD
+    GREETING = 1.0
+
+    # name -> (payload or None, TLS, end-of-reply pattern or None); a TLS
+    # probe with neither payload nor pattern only reports the handshake
+    PROBES = {
+        'generic': (None, False, None),
+        'greeting': (None, False, re.compile(rb'\n')),
+        'ftp': (None, False, re.compile(rb'(?m)^\d{3} [^\n]*\n')),
+        'smtp': (None, False, re.compile(rb'(?m)^\d{3} [^\n]*\n')),
+        'http': (b'GET / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\n'
+                 b'Connection: close\r\n\r\n', False, re.compile(rb'\r?\n\r?\n')),
+        'https': (b'GET / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\n'
+                  b'Connection: close\r\n\r\n', True, re.compile(rb'\r?\n\r?\n')),
+        'tls': (None, True, None),
+        'smtps': (None, True, re.compile(rb'(?m)^\d{3} [^\n]*\n')),
+        'greeting-tls': (None, True, re.compile(rb'\n')),
+        'redis': (b'PING\r\n', False, re.compile(rb'\r\n')),
+        'memcached': (b'version\r\n', False, re.compile(rb'\r\n')),
+        # Fallbacks for a 'generic' port that stays silent
+        'http-head': (b'HEAD / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\n'
+                      b'Connection: close\r\n\r\n', False, re.compile(rb'\r?\n\r?\n')),
+        'https-head': (b'HEAD / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\n'
+                       b'Connection: close\r\n\r\n', True, re.compile(rb'\r?\n\r?\n')),
+    }
+
+    PORT_PROBES = {
+        21: 'ftp', 22: 'greeting', 25: 'smtp', 80: 'http', 110: 'greeting', 143: 'greeting',
+        443: 'https', 465: 'smtps', 587: 'smtp', 636: 'tls', 993: 'greeting-tls',
+        995: 'greeting-tls', 2525: 'smtp', 3000: 'http', 5000: 'http', 6379: 'redis',
+        8000: 'http', 8008: 'http', 8080: 'http', 8443: 'https', 8888: 'http', 9443: 'https',
+        11211: 'memcached',
+    }
+
+    # Banners showing TLS: a TLS probe's handshake prefix, or a web server
+    # complaining about plain HTTP on its TLS port
+    TLS_BANNER = re.compile(r'^\[(?:TLS|SSL)v|plain HTTP request was sent to HTTPS port'
+                            r'|speaking plain HTTP to an SSL-enabled', re.I)
+
+    def __init__(self, timeout=3, concurrency=256, max_bytes=4096, adaptive=True,
+                 rate=None, rtt=None, metrics=None):
+        """
+        Args:
+            timeout (float): Budget in seconds for connecting and reading one port
+            concurrency (int): Maximum number of ports probed at once
+            max_bytes (int): Bytes kept from each reply
+            adaptive (bool): Use RTT-based connect timeouts and AIMD concurrency
+            rate (float): Maximum connects per second (optional)
+            rtt (RTTEstimator): Estimator to share with other modules
+            metrics (Metrics): Registry for per-probe latency and outcome counts
+        """
+        self.timeout = timeout
+        self.concurrency = raise_fd_limit(max(1, concurrency))
+        self.max_bytes = max_bytes
+        self.adaptive = adaptive
+        self.rate = rate
+        self.rtt = rtt or RTTEstimator(max_rto=timeout)
+        self.metrics = metrics or NULL_METRICS
+        import ssl
+        self._tls = ssl.create_default_context()
+        self._tls.check_hostname = False
+        self._tls.verify_mode = ssl.CERT_NONE
+
+    @classmethod
+    def probe_for(cls, port):
+        """Name of the probe used for ``port``"""
+        name = cls.PORT_PROBES.get(port)
+        if name is None:
+            name = service_name(port)
+        return name if name in cls.PROBES else 'generic'
+
+    @classmethod
+    def speaks_tls(cls, port, banner=''):
+        """Whether ``port`` gets a TLS probe or its ``banner`` shows TLS"""
+        return cls.PROBES[cls.probe_for(port)][1] or bool(banner and cls.TLS_BANNER.search(banner))
+
+    def grab(self, ip, ports, host=None, on_result=None):
+        """
+        Collect banners from every port in ``ports`` on ``ip``.
+
+        Args:
+            ip (str): Address to connect to
+            ports (iterable): Open ports
+            host (str): Name used for SNI and HTTP Host headers (default: ``ip``)
+            on_result (callable): Called as ``on_result(port, probe, banner)``
+                for every non-empty banner as soon as it is read
+
+        Returns:
+            dict: Port -> banner text
+        """
+        import asyncio
+
+        return asyncio.run(self._grab(ip, ports, host or ip, on_result))
+
+    async def _grab(self, ip, ports, host, on_result):
+        banners = {}
+        window = AIMDWindow(self.concurrency) if self.adaptive else None
+        bucket = TokenBucket(self.rate) if self.rate else None
+
+        metrics = self.metrics
+
+        async def handle(port):
+            probe = self.probe_for(port)
+            if window is not None:
+                await window.acquire()
+            if bucket is not None:
+                await bucket.take()
+            metrics.gauge('banner_inflight', 1)
+            congested = False
+            try:
+                with metrics.timer('banner_seconds', probe=probe):
+                    banner = await self.probe(ip, port, probe, host)
+            except _CongestionSignal:
+                banner, congested = '', True
+            finally:
+                if window is not None:
+                    window.release(congested=congested)
+                metrics.gauge('banner_inflight', -1)
+            metrics.inc('banners_total', probe=probe,
+                        result='banner' if banner else 'lost' if congested else 'empty')
+            if banner:
+                banners[port] = banner
+                if on_result:
+                    on_result(port, probe, banner)
+
+        await run_workers(ports, handle, self.concurrency)
+        return banners
+
+    async def probe(self, ip, port, probe, host):
+        """Run one probe and return the decoded banner ('' if nothing came back)"""
+        import asyncio
+        import ssl
+
+        payload, tls, done = self.PROBES[probe]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.timeout
+        connect_timeout = self.timeout
+        if self.adaptive:
+            # A TLS connect includes the handshake: allow it a couple more round trips
+            connect_timeout = min(self.timeout, self.rtt.rto * (3 if tls else 1))
+        writer = None
+        tls_fallback = False
+        try:
+            if tls:
+                try:
+                    ipaddress.ip_address(host)
+                    server_hostname = ''  # no SNI for IP literals
+                except ValueError:
+                    server_hostname = host
+                connect = asyncio.open_connection(ip, port, ssl=self._tls,
+                                                  server_hostname=server_hostname)
+            else:
+                connect = asyncio.open_connection(ip, port)
+            try:
+                reader, writer = await asyncio.wait_for(connect, connect_timeout)
+            except (asyncio.TimeoutError, ConnectionResetError, ConnectionRefusedError):
+                if self.adaptive:
+                    raise _CongestionSignal()
+                return ''
+            if self.adaptive and not tls:
+                self.rtt.sample(loop.time() - started)
+            prefix = ''
+            if tls:
+                tls_object = writer.get_extra_info('ssl_object')
+                cipher = writer.get_extra_info('cipher')
+                prefix = f"[{tls_object.version()}{' ' + cipher[0] if cipher else ''}]"
+                if payload is None and done is None:
+                    return prefix
+            if payload is not None:
+                writer.write(payload.replace(b'{host}', host.encode()))
+                await writer.drain()
+            if probe != 'generic':
+                data = await self._read(reader, done, deadline)
+            else:
+                data = await self._read(reader, done, min(deadline, loop.time() + self.GREETING))
+                if not data and not reader.at_eof():
+                    head, _, head_done = self.PROBES['http-head']
+                    writer.write(head.replace(b'{host}', host.encode()))
+                    await writer.drain()
+                    tls_fallback = True
+                    data = await self._read(reader, head_done, deadline)
+                    # A TLS service closes (or sends an alert record) on plaintext
+                    tls_fallback = (not data and reader.at_eof()) or data[:2] == b'\x15\x03'
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            if not tls_fallback:
+                return ''
+        finally:
+            if writer is not None:
+                writer.close()
+        if tls_fallback:
+            try:
+                return await self.probe(ip, port, 'https-head', host)
+            except _CongestionSignal:
+                # The port already answered, so a failed TLS connect is no congestion
+                return ''
+        text = data.decode('utf-8', errors='ignore')
+        text = ''.join(ch for ch in text if ch.isprintable() or ch in '\r\n\t').strip()
+        return f"{prefix} {text}".strip() if prefix else text
+
+    async def _read(self, reader, done, deadline):
+        """Read until ``done`` matches, the byte cap, EOF, the deadline or an idle gap"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        data = b''
+        while len(data) < self.max_bytes:
+            wait = deadline - loop.time()
+            if data and done is None:
+                wait = min(wait, self.IDLE)
+            if wait <= 0:
+                break
+            try:
+                chunk = await asyncio.wait_for(reader.read(self.max_bytes - len(data)), wait)
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                break
+            data += chunk
+            match = done.search(data) if done is not None else None
+            if match:
+                return data[:match.end()]
+        return data[:self.max_bytes]
+
+
+def parse_certificate(der):
+    """
+    Decode the parts of a DER certificate that matter for recon.
+
+    Returns:
+        dict: {'subject', 'issuer', 'names' (DNS subject alternative names,
+        or a host-like common name when there are none), 'not_before',
+        'not_after' (ISO 8601, UTC), 'serial'}, or None if it cannot be parsed
+
+    Raises:
+        ImportError: If the cryptography package is not installed
+    """
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+
+    try:
+        cert = x509.load_der_x509_certificate(der)
+        try:
+            san = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+            names = san.get_values_for_type(x509.DNSName)
+        except x509.ExtensionNotFound:
+            names = [attribute.value for attribute
+                     in cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+                     if '.' in attribute.value and ' ' not in attribute.value]
+        # cryptography 42 renamed the validity accessors to *_utc
+        not_before = getattr(cert, 'not_valid_before_utc', None) or cert.not_valid_before
+        not_after = getattr(cert, 'not_valid_after_utc', None) or cert.not_valid_after
+        return {
+            'subject': cert.subject.rfc4514_string(),
+            'issuer': cert.issuer.rfc4514_string(),
+            'names': list(dict.fromkeys(name.lower().rstrip('.') for name in names)),
+            'not_before': not_before.replace(tzinfo=None).isoformat(),
+            'not_after': not_after.replace(tzinfo=None).isoformat(),
+            'serial': format(cert.serial_number, 'x'),
+        }
+    except ValueError:
+        return None
+
+
+def peer_chain(ssl_object):
+    """
+    DER certificates the peer presented, leaf first, without verifying them.
+
+    Python 3.13+ returns the whole chain; earlier versions only expose the
+    leaf through the public API.
+    """
+    chain = getattr(ssl_object, 'get_unverified_chain', None)
+    if chain is not None:
+        return list(chain() or ())
+    leaf = ssl_object.getpeercert(binary_form=True)
+    return [leaf] if leaf else []
+
+
+class CertificateHarvester:
+    """
+    Concurrent TLS handshakes that collect the certificates services present.
+
+    Every (address, port, server name) endpoint gets one handshake with SNI
+    (none for IP literals); nothing is sent after it. Certificates are
+    keyed by SHA-256 fingerprint, so a certificate shared by many hosts or
+    ports is parsed once and reported once with all its endpoints.
+    """
+
+    def __init__(self, timeout=3, concurrency=256, rate=None, metrics=None):
+        """
+        Args:
+            timeout (float): Budget in seconds for connecting and handshaking
+            concurrency (int): Maximum number of handshakes at once
+            rate (float): Maximum connects per second (optional)
+            metrics (Metrics): Registry for handshake latency and outcome counts
+        """
+        self.timeout = timeout
+        self.concurrency = raise_fd_limit(max(1, concurrency))
+        self.rate = rate
+        self.metrics = metrics or NULL_METRICS
+        self.parsed = {}
+        import ssl
+        self._tls = ssl.create_default_context()
+        self._tls.check_hostname = False
+        self._tls.verify_mode = ssl.CERT_NONE
+
+    def harvest(self, endpoints, on_certificate=None):
+        """
+        Handshake with every endpoint and collect the certificates.
+
+        Args:
+            endpoints (iterable): (ip, port, server name) tuples; an empty or
+                IP-literal server name sends no SNI
+            on_certificate (callable): Called as ``on_certificate(info)`` the
+                first time each leaf certificate is seen
+
+        Returns:
+            list: One dict per distinct leaf certificate, in the order first
+            seen: ``parse_certificate`` fields plus 'fingerprint', 'chain'
+            (issuer certificate subjects; empty before Python 3.13, see
+            ``peer_chain``) and 'endpoints' ({ip, port, sni})
+        """
+        import asyncio
+
+        return asyncio.run(self._harvest(endpoints, on_certificate))
+
+    async def _harvest(self, endpoints, on_certificate):
+        certificates = {}
+        bucket = TokenBucket(self.rate) if self.rate else None
+        metrics = self.metrics
+
+        async def handle(endpoint):
+            ip, port, name = endpoint
+            try:
+                ipaddress.ip_address(name)
+                name = None  # no SNI for IP literals
+            except ValueError:
+                pass
+            if bucket is not None:
+                await bucket.take()
+            metrics.gauge('tls_inflight', 1)
+            try:
+                with metrics.timer('tls_handshake_seconds'):
+                    chain = await self.handshake(ip, port, name)
+            finally:
+                metrics.gauge('tls_inflight', -1)
+            metrics.inc('tls_handshakes_total', result='certificate' if chain else 'failed')
+            if not chain:
+                return
+            fingerprints = []
+            for der in chain:
+                fingerprint = hashlib.sha256(der).hexdigest()
+                if fingerprint not in self.parsed:
+                    self.parsed[fingerprint] = parse_certificate(der)
+                    metrics.inc('tls_certificates_parsed_total')
+                fingerprints.append(fingerprint)
+            leaf = fingerprints[0]
+            if self.parsed[leaf] is None:
+                return
+            entry = certificates.get(leaf)
+            if entry is None:
+                entry = certificates[leaf] = {
+                    **self.parsed[leaf], 'fingerprint': leaf,
+                    'chain': [self.parsed[fp]['subject'] for fp in fingerprints[1:]
+                              if self.parsed[fp] is not None],
+                    'endpoints': []}
+                if on_certificate:
+                    on_certificate(entry)
+            entry['endpoints'].append({'ip': ip, 'port': port, 'sni': name or None})
+
+        await run_workers(endpoints, handle, self.concurrency)
+        return list(certificates.values())
+
+    async def handshake(self, ip, port, server_name=None):
+        """Complete one TLS handshake (SNI ``server_name``); the peer's chain, [] on failure"""
+        import asyncio
+        import ssl
+
+        writer = None
+        try:
+            connect = asyncio.open_connection(ip, port, ssl=self._tls,
+                                              server_hostname=server_name or '')
+            _, writer = await asyncio.wait_for(connect, self.timeout)
+            return peer_chain(writer.get_extra_info('ssl_object'))
+        except (OSError, asyncio.TimeoutError, ssl.SSLError, ValueError):
+            return []
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+class _DNSEndpoint:
+    """
+    Connected UDP socket to one nameserver, demultiplexing replies by query ID.
+
+    Implements the ``asyncio.DatagramProtocol`` interface without
+    subclassing it, so defining it does not import asyncio.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self.pending = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        future = self.pending.get(int.from_bytes(data[:2], 'big'))
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        # ICMP errors cannot be tied to a query ID; affected queries time out
+        pass
+
+    def connection_lost(self, exc):
+        pass
+
+    def pause_writing(self):
+        pass
+
+    def resume_writing(self):
+        pass
+
+
+def parse_nameserver(spec):
+    """Split 'ip', 'ip:port' or '[ipv6]:port' into (ip, port)"""
+    spec = spec.strip()
+    if spec.startswith('['):
+        host, _, port = spec[1:].partition(']')
+        return host, int(port.lstrip(':') or 53)
+    if spec.count(':') == 1:
+        host, port = spec.split(':')
+        return host, int(port)
+    return spec, 53
+
+
+class AsyncResolver:
+    """
+    Stub resolver that keeps many UDP queries in flight.
+
+    Each nameserver gets one UDP socket; replies are matched to waiting
+    queries by message ID, so thousands of lookups share a handful of
+    sockets. Queries rotate round-robin across the nameservers, failed
+    attempts are retried on the next server and truncated replies are
+    repeated over TCP.
+    """
+
+    RCVBUF = 4 * 1024 * 1024
+    WILDCARD_PROBES = 3
+    QUERY_HEADER = b'\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00'
+
+    def __init__(self, nameservers=None, timeout=2, retries=2, max_inflight=500, cache=None,
+                 rate=None, metrics=None):
+        """
+        Args:
+            nameservers (list): 'ip' or 'ip:port' strings; defaults to the
+                system resolvers from /etc/resolv.conf
+            timeout (float): Per-attempt timeout in seconds
+            retries (int): Extra attempts after a timeout or server failure
+            max_inflight (int): Maximum names being resolved at once
+            cache (ResolutionCache): Shared cache consulted before querying
+            rate (float): Maximum queries per second across all nameservers (optional)
+            metrics (Metrics): Registry for per-name latency and query counters
+        """
+        if not nameservers:
+            try:
+                import dns.resolver
+                nameservers = dns.resolver.Resolver().nameservers
+            except Exception:
+                nameservers = []
+            nameservers = nameservers or ['8.8.8.8', '1.1.1.1']
+        self.nameservers = [parse_nameserver(ns) for ns in nameservers]
+        self.timeout = timeout
+        self.retries = retries
+        self.max_inflight = max(1, max_inflight)
+        self.cache = cache
+        self.rate = rate
+        self.metrics = metrics or NULL_METRICS
+        self._bucket = None
+        self.stats = {'queries': 0, 'timeouts': 0, 'retries': 0, 'tcp_fallbacks': 0,
+                      'wildcard': 0}
+        self.wildcards = {}
+        self._wildcard_probes = {}
+        self._endpoints = []
+        self._next = 0
+
+    async def open(self):
+        """Create the UDP sockets; must be called inside the running loop"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        self._endpoints = []
+        self._bucket = TokenBucket(self.rate) if self.rate else None
+        for host, port in self.nameservers:
+            transport, endpoint = await loop.create_datagram_endpoint(
+                _DNSEndpoint, remote_addr=(host, port))
+            # Replies arrive in bursts while the loop is busy parsing; a larger
+            # receive buffer keeps them from being dropped by the kernel
+            try:
+                transport.get_extra_info('socket').setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, self.RCVBUF)
+            except OSError:
+                pass
+            self._endpoints.append(endpoint)
+
+    def close(self):
+        for endpoint in self._endpoints:
+            if endpoint.transport:
+                endpoint.transport.close()
+        self._endpoints = []
+
+    @staticmethod
+    def encode_question(name, rdtype):
+        """Encode the question section for (name, rdtype) in wire format"""
+        try:
+            labels = name.rstrip('.').lower().encode('ascii').split(b'.')
+            if len(name) > 253 or any(not 0 < len(label) < 64 for label in labels):
+                raise ValueError(f"invalid name: {name}")
+            qname = b''.join(bytes((len(label),)) + label for label in labels) + b'\x00'
+        except UnicodeEncodeError:
+            import dns.name
+            qname = dns.name.from_text(name).to_wire().lower()
+        import dns.rdatatype
+        return qname + dns.rdatatype.from_text(rdtype).to_bytes(2, 'big') + b'\x00\x01'
+
+    async def _udp(self, endpoint, question):
+        """Send one query and return the raw reply once its ID and question match"""
+        import asyncio
+        import dns.exception
+
+        loop = asyncio.get_running_loop()
+        qid = random.getrandbits(16)
+        while qid in endpoint.pending:
+            qid = random.getrandbits(16)
+        future = loop.create_future()
+        endpoint.pending[qid] = future
+        try:
+            # Header: ID, RD set, one question, no other records
+            endpoint.transport.sendto(qid.to_bytes(2, 'big') + self.QUERY_HEADER + question)
+            data = await asyncio.wait_for(future, self.timeout)
+        finally:
+            endpoint.pending.pop(qid, None)
+        qname_end = len(question) - 4
+        if (not data[2] & 0x80 or data[4:6] != b'\x00\x01'
+                or data[12:12 + qname_end].lower() != question[:qname_end]
+                or data[12 + qname_end:12 + len(question)] != question[qname_end:]):
+            raise dns.exception.FormError('reply does not match query')
+        return data
+
+    async def query(self, name, rdtype):
+        """
+        Resolve one (name, rdtype) pair.
+
+        Replies are only parsed with dnspython when they carry answers, so
+        the common NXDOMAIN case costs a header check and nothing more.
+
+        Returns:
+            tuple: (rcode, dns.message.Message or None, ttl), or None if every
+            attempt failed. ``ttl`` is the answer TTL, or the negative TTL
+            when there are no answers.
+        """
+        import asyncio
+        import dns.exception
+        import dns.rcode
+
+        try:
+            question = self.encode_question(name, rdtype)
+        except (ValueError, dns.exception.DNSException):
+            return None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+            if self._bucket is not None:
+                await self._bucket.take()
+            index = self._next % len(self._endpoints)
+            self._next += 1
+            self.stats['queries'] += 1
+            try:
+                data = await self._udp(self._endpoints[index], question)
+                if data[2] & 0x02:
+                    self.stats['tcp_fallbacks'] += 1
+                    import dns.asyncquery
+                    import dns.message
+                    host, port = self.nameservers[index]
+                    response = await dns.asyncquery.tcp(dns.message.make_query(name, rdtype),
+                                                        host, timeout=self.timeout, port=port)
+                    rcode = response.rcode()
+                    ttl = answer_ttl(response) if response.answer else negative_ttl(response)
+                else:
+                    rcode = data[3] & 0x0F
+                    response = None
+                    if rcode == dns.rcode.NOERROR and data[6:8] != b'\x00\x00':
+                        import dns.message
+                        response = dns.message.from_wire(data)
+                        ttl = answer_ttl(response)
+                    else:
+                        ttl = wire_negative_ttl(data, len(question))
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                continue
+            except (dns.exception.DNSException, OSError, ValueError):
+                continue
+            if rcode in (dns.rcode.SERVFAIL, dns.rcode.REFUSED):
+                continue
+            return rcode, response, ttl
+        return None
+
+    async def resolve_records(self, name, wildcard=None):
+        """
+        Look up A, AAAA and CNAME data for ``name``.
+
+        Args:
+            name (str): Fully qualified name
+            wildcard (dict): Wildcard of the enclosing zone (see
+                ``wildcard_answers``); an A answer drawn from it skips the
+                AAAA lookup, since the name will be filtered anyway
+
+        Returns:
+            dict: {'A': [...], 'AAAA': [...], 'CNAME': [...]} for names that
+            resolve, or None for NXDOMAIN, no data or failure
+        """
+        import dns.rcode
+
+        if self.cache is not None:
+            found, cached = self.cache.get(name, 'ADDR')
+            if found:
+                return AddressRecords.coerce(cached)  # a dict when read back from SQLite
+
+        records = {'A': [], 'AAAA': [], 'CNAME': []}
+        reply = await self.query(name, 'A')
+        if reply is None:
+            return None
+        rcode, response, ttl = reply
+        if rcode != dns.rcode.NOERROR:
+            if rcode == dns.rcode.NXDOMAIN and self.cache is not None:
+                self.cache.put(name, 'ADDR', None, ttl)
+            return None
+        self._collect(response, records)
+        ttls = [ttl]
+        if wildcard is None or not self.is_wildcard(records, wildcard):
+            reply = await self.query(name, 'AAAA')
+            if reply is not None and reply[0] == dns.rcode.NOERROR:
+                self._collect(reply[1], records)
+                ttls.append(reply[2])
+        if records['A'] or records['AAAA'] or records['CNAME']:
+            records = AddressRecords(records['A'], records['AAAA'], records['CNAME'])
+        else:
+            records = None
+        if self.cache is not None:
+            ttls = [t for t in ttls if t is not None]
+            self.cache.put(name, 'ADDR', records, min(ttls) if ttls else None)
+        return records
+
+    @staticmethod
+    def _collect(response, records):
+        import dns.rdatatype
+
+        if response is None:
+            return
+        for rrset in response.answer:
+            if rrset.rdtype == dns.rdatatype.CNAME:
+                key = 'CNAME'
+                values = [rdata.target.to_text() for rdata in rrset]
+            elif rrset.rdtype in (dns.rdatatype.A, dns.rdatatype.AAAA):
+                key = dns.rdatatype.to_text(rrset.rdtype)
+                values = [rdata.address for rdata in rrset]
+            else:
+                continue
+            for value in values:
+                if value not in records[key]:
+                    records[key].append(value)
+
+    async def wildcard_answers(self, zone):
+        """
+        Probe ``zone`` with random labels to detect wildcard records.
+
+        Returns:
+            dict: {'answers': set of A/AAAA/CNAME values the probes resolved
+            to, 'stable': whether any value repeated across probes,
+            'filtered': 0, 'skipped': 0}, or None when no probe resolved
+        """
+        import asyncio
+        import secrets
+
+        probes = [f"{secrets.token_hex(8)}.{zone}" for _ in range(self.WILDCARD_PROBES)]
+        replies = await asyncio.gather(*(self.resolve_records(name) for name in probes))
+        hits = [set(r['A'] + r['AAAA'] + r['CNAME']) for r in replies if r]
+        if not hits:
+            return None
+        answers = set().union(*hits)
+        # Probes answered from disjoint pools leave nothing to match candidates against
+        stable = len(hits) == 1 or sum(len(hit) for hit in hits) > len(answers)
+        return {'answers': answers, 'stable': stable, 'filtered': 0, 'skipped': 0}
+
+    async def _zone_wildcard(self, name, root):
+        """Wildcard of the zone enclosing ``name``, probed once per zone under ``root``"""
+        import asyncio
+
+        zone = name.partition('.')[2]
+        if zone != root and not zone.endswith('.' + root):
+            return None
+        probe = self._wildcard_probes.get(zone)
+        if probe is None:
+            probe = self._wildcard_probes[zone] = asyncio.ensure_future(
+                self.wildcard_answers(zone))
+        wildcard = await probe
+        if wildcard is not None:
+            self.wildcards[zone] = wildcard
+        return wildcard
+
+    @staticmethod
+    def is_wildcard(records, wildcard):
+        """Whether every value in ``records`` is one of the wildcard's answers"""
+        values = records['A'] + records['AAAA'] + records['CNAME']
+        return bool(values) and wildcard['answers'].issuperset(values)
+
+    def brute_force(self, names, on_hit=None, on_done=None, wildcard_zone=None):
+        """
+        Resolve every name in ``names`` with up to ``max_inflight`` in flight.
+
+        With ``wildcard_zone`` set, each zone at or below it is probed for
+        wildcard records before its first name is resolved. Names whose
+        answers share a value with the wildcard are not reported, and their
+        other values join the wildcard's set (rotating pools); names under
+        a wildcard whose probes shared no value are skipped unqueried.
+        Detected wildcards are kept in ``self.wildcards``.
+
+        Args:
+            names (iterable): Fully qualified names, consumed lazily
+            on_hit (callable): Called as ``on_hit(name, records)`` for each
+                name that resolves
+            on_done (callable): Called as ``on_done(name)`` once each name
+                has been answered, hit or not
+            wildcard_zone (str): Zone to filter wildcard answers under (optional)
+
+        Returns:
+            dict: Query counters plus names tried, elapsed time and queries/s
+        """
+        import asyncio
+
+        return asyncio.run(self._brute_force(names, on_hit, on_done, wildcard_zone))
+
+    async def _brute_force(self, names, on_hit, on_done, wildcard_zone=None):
+        tried = 0
+        start = time.perf_counter()
+        metrics = self.metrics
+        self.wildcards = {}
+        self._wildcard_probes = {}
+
+        async def handle(name):
+            nonlocal tried
+            wildcard = None
+            if wildcard_zone is not None:
+                wildcard = await self._zone_wildcard(name, wildcard_zone)
+                if wildcard is not None and not wildcard['stable']:
+                    wildcard['skipped'] += 1
+                    metrics.inc('dns_names_total', result='skipped')
+                    if on_done:
+                        on_done(name)
+                    return
+            tried += 1
+            metrics.gauge('dns_inflight', 1)
+            try:
+                with metrics.timer('dns_resolve_seconds'):
+                    records = await self.resolve_records(name, wildcard)
+            finally:
+                metrics.gauge('dns_inflight', -1)
+            result = 'hit' if records else 'miss'
+            if records and wildcard is not None:
+                values = records['A'] + records['AAAA'] + records['CNAME']
+                if not wildcard['answers'].isdisjoint(values):
+                    wildcard['answers'].update(values)
+                    wildcard['filtered'] += 1
+                    self.stats['wildcard'] += 1
+                    records, result = None, 'wildcard'
+            metrics.inc('dns_names_total', result=result)
+            if records and on_hit:
+                on_hit(name, records)
+            if on_done:
+                on_done(name)
+
+        await self.open()
+        try:
+            await run_workers(names, handle, self.max_inflight)
+        finally:
+            self.close()
+
+        elapsed = time.perf_counter() - start
+        stats = dict(self.stats)
+        for counter in ('queries', 'timeouts', 'retries', 'tcp_fallbacks', 'wildcard'):
+            metrics.inc(f"dns_{counter}_total", stats[counter])
+        stats['names'] = tried
+        stats['elapsed'] = elapsed
+        stats['qps'] = stats['queries'] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+
+class HTTPResponse:
+    """Headers and (size-capped) body of one fetched URL"""
+
+    __slots__ = ('url', 'status_code', 'headers', 'body', 'encoding', 'elapsed', 'not_modified')
+
+    def __init__(self, url, status_code, headers, body, encoding, elapsed, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        self.elapsed = elapsed
+        # A 304 to a conditional request: ``headers`` are the earlier ones
+        # refreshed by the 304's, and there is no body
+        self.not_modified = not_modified
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+
+def _timed_pool_classes(metrics):
+    """
+    urllib3 pool classes whose connections report phase timings.
+
+    Each new connection records ``http_phase_seconds`` for ``dns``
+    (getaddrinfo), ``connect`` (TCP), ``tls`` (handshake, HTTPS only) and
+    every response records ``first_byte`` (request sent to headers read).
+    The name is resolved before connecting and the connection is made to
+    the resulting address, so the DNS and TCP phases are measured apart;
+    SNI and the Host header still use the name.
+    """
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class Timed:
+        def _new_conn(self):
+            try:
+                ipaddress.ip_address(self._dns_host.strip('[]'))
+            except ValueError:
+                start = time.perf_counter()
+                try:
+                    info = socket.getaddrinfo(self._dns_host, self.port, type=socket.SOCK_STREAM)
+                    self._dns_host = info[0][4][0]
+                except OSError:
+                    pass  # urllib3 resolves again and raises its usual error
+                metrics.observe('http_phase_seconds', time.perf_counter() - start, phase='dns')
+            start = time.perf_counter()
+            sock = super()._new_conn()
+            self._tcp_done = time.perf_counter()
+            metrics.observe('http_phase_seconds', self._tcp_done - start, phase='connect')
+            return sock
+
+        def getresponse(self, *args, **kwargs):
+            start = time.perf_counter()
+            response = super().getresponse(*args, **kwargs)
+            metrics.observe('http_phase_seconds', time.perf_counter() - start, phase='first_byte')
+            return response
+
+    class TimedHTTPS(Timed, HTTPSConnection):
+        def connect(self):
+            super().connect()
+            metrics.observe('http_phase_seconds', time.perf_counter() - self._tcp_done, phase='tls')
+
+    return {
+        'http': type('TimedHTTPConnectionPool', (HTTPConnectionPool,),
+                     {'ConnectionCls': type('TimedHTTPConnection', (Timed, HTTPConnection), {})}),
+        'https': type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,),
+                      {'ConnectionCls': TimedHTTPS}),
+    }
+
+
+class HTTPClient:
+    """
+    Pooled HTTP client that fetches each URL at most once per run.
+
+    One keep-alive ``requests.Session`` with a bounded connection pool per
+    host is shared by every module. Responses (or the exception a fetch
+    raised) are cached per URL, and concurrent callers asking for the same
+    URL wait for the first fetch instead of issuing their own.
+
+    In adaptive mode the connect timeout for a host follows an RTT estimate
+    built from its earlier response times, which overstate the round trip
+    and so keep the timeout on the safe side.
+
+    With metrics enabled, requests are counted by status, cache hits are
+    counted and connections report DNS, TCP, TLS and first-byte times.
+
+    URLs registered with ``add_validators`` are fetched conditionally
+    (If-None-Match / If-Modified-Since), so an unchanged page costs a 304
+    instead of a full download.
+    """
+
+    def __init__(self, timeout=3, pool_size=10, max_body=1024 * 1024, adaptive=True,
+                 metrics=None, session=None):
+        """
+        Args:
+            timeout (float): Connect/read timeout in seconds
+            pool_size (int): Maximum keep-alive connections per host
+            max_body (int): Bytes of body kept per response
+            adaptive (bool): Derive per-host connect timeouts from response times
+            metrics (Metrics): Registry for request counters and phase timings
+            session (requests.Session): Existing session (and its warm
+                connection pool) to use; it is left open by ``close``
+        """
+        self.timeout = timeout
+        self.max_body = max_body
+        self.adaptive = adaptive
+        self.metrics = metrics or NULL_METRICS
+        self.pool_size = pool_size
+        self._rtt = {}
+        self._validators = {}
+        self._session = session
+        self._owns_session = session is None
+        self.request_counts = Counter()
+        self._cache = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The shared ``requests.Session``, created (and requests imported) on first use"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                session.verify = False
+                adapter = HTTPAdapter(pool_connections=100, pool_maxsize=self.pool_size,
+                                      pool_block=True)
+                if self.metrics.enabled:
+                    adapter.poolmanager.pool_classes_by_scheme = _timed_pool_classes(self.metrics)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def add_validators(self, url, headers):
+        """
+        Make the fetch of ``url`` conditional on an earlier response.
+
+        Args:
+            url (str): URL to revalidate
+            headers (dict): Headers of the earlier response; its ETag and
+                Last-Modified become the request's validators
+        """
+        lower = {key.lower(): value for key, value in headers.items()}
+        conditions = {}
+        if lower.get('etag'):
+            conditions['If-None-Match'] = lower['etag']
+        if lower.get('last-modified'):
+            conditions['If-Modified-Since'] = lower['last-modified']
+        if conditions:
+            self._validators[url] = (conditions, headers)
+
+    def fetch(self, url):
+        """
+        Return the cached response for ``url``, fetching it on first use.
+
+        Raises:
+            requests.exceptions.RequestException: The (cached) fetch failure
+        """
+        with self._lock:
+            lock = self._locks.setdefault(url, threading.Lock())
+        with lock:
+            if url in self._cache:
+                self.metrics.inc('http_cache_hits_total')
+            else:
+                try:
+                    self._cache[url] = (self._get(url), None)
+                except Exception as e:
+                    self.metrics.inc('http_requests_total', status=type(e).__name__)
+                    self._cache[url] = (None, e)
+        response, error = self._cache[url]
+        if error is not None:
+            raise error
+        return response
+
+    def _get(self, url):
+        host = urlparse(url).hostname
+        with self._lock:
+            self.request_counts[url] += 1
+            rtt = self._rtt.setdefault(host, RTTEstimator(max_rto=self.timeout))
+        timeout = (rtt.rto, self.timeout) if self.adaptive else self.timeout
+        conditions, previous = self._validators.get(url, (None, None))
+        with self.metrics.timer('http_request_seconds'), \
+                self.session.get(url, timeout=timeout, allow_redirects=True, stream=True,
+                                 headers=conditions) as response:
+            self.metrics.inc('http_requests_total', status=response.status_code)
+            if self.adaptive:
+                with self._lock:
+                    rtt.sample(response.elapsed.total_seconds())
+            if response.status_code == 304 and previous is not None:
+                from requests.structures import CaseInsensitiveDict
+
+                headers = CaseInsensitiveDict(previous)
+                headers.update(response.headers)
+                return HTTPResponse(response.url, 304, headers, b'', response.encoding,
+                                    response.elapsed.total_seconds(), not_modified=True)
+            body = bytearray()
+            for chunk in response.iter_content(65536):
+                body += chunk[:self.max_body - len(body)]
+                if len(body) >= self.max_body:
+                    break
+            return HTTPResponse(response.url, response.status_code, response.headers,
+                                bytes(body), response.encoding, response.elapsed.total_seconds())
+
+    def close(self):
+        if self._session is not None and self._owns_session:
+            self._session.close()
+
+
+DATA_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'),
+    '/usr/local/share/recon',
+]
+
+
+def find_data_file(name):
+    """Locate a bundled data file next to recon.py or in the system install"""
+    for directory in DATA_DIRS:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _literal(pattern):
+    """Return the literal text of ``pattern`` if it has no regex syntax, else None"""
+    text = []
+    escaped = False
+    for ch in pattern:
+        if escaped:
+            if ch.isalnum():
+                return None
+            text.append(ch)
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch in '.^$*+?{}[]|()':
+            return None
+        else:
+            text.append(ch)
+    return None if escaped else ''.join(text)
+
+
+def _lower_pattern(pattern):
+    """
+    Lowercase a regex for matching against lowercased text.
+
+    Characters after a backslash are left alone so escapes such as ``\\S``
+    keep their meaning. Unlike IGNORECASE this keeps ``re``'s fast literal
+    prefix search.
+    """
+    out = []
+    escaped = False
+    for ch in pattern:
+        out.append(ch if escaped else ch.lower())
+        escaped = not escaped and ch == '\\'
+    return ''.join(out)
+
+
+def _anchor(pattern, minimum=3):
+    """
+    Return the longest literal run that every match of ``pattern`` contains.
+
+    Only top-level text is considered: groups, classes and quantified
+    characters end a run, and a top-level ``|`` means there is no anchor.
+    Returns None if no run of at least ``minimum`` characters exists.
+    """
+    runs = [[]]
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\' and i + 1 < len(pattern):
+            i += 1
+            if pattern[i].isalnum():
+                runs.append([])
+            else:
+                runs[-1].append(pattern[i])
+        elif ch in '([':
+            close = ')' if ch == '(' else ']'
+            depth = 0
+            while i < len(pattern):
+                if pattern[i] == '\\':
+                    i += 1
+                elif pattern[i] == ch and (ch == '(' or depth == 0):
+                    depth += 1
+                elif pattern[i] == close:
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            runs.append([])
+        elif ch == '|':
+            return None
+        elif ch in '?*{':
+            if runs[-1]:
+                runs[-1].pop()
+            if ch == '{':
+                i = pattern.find('}', i) if '}' in pattern[i:] else len(pattern)
+            runs.append([])
+        elif ch in '.^$+':
+            runs.append([])
+        else:
+            runs[-1].append(ch)
+        i += 1
+    best = max((''.join(run) for run in runs), key=len)
+    return best if len(best) >= minimum else None
+
+
+def _trie_regex(words):
+    """Build a regex matching any of ``words`` whose branches share prefixes"""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if '' in node else group
+
+    return build(trie)
+
+
+class _KeywordIndex:
+    """
+    Signatures for one kind of input, matched through a keyword trie.
+
+    Each pattern is filed under a literal keyword: the pattern itself when
+    it is plain text, otherwise a literal run every match must contain, in
+    which case the regex is only run once the keyword has been seen.
+    Patterns without such a run are searched for on every input.
+    """
+
+    def __init__(self):
+        # keyword -> technologies it proves, or (regex, technology) to verify
+        self.keywords = {}
+        self.unanchored = []
+        self.regex = None
+        # keyword -> shorter keywords it starts with
+        self.prefixes = {}
+
+    def add(self, tech, pattern):
+        literal = _literal(pattern)
+        if literal:
+            self.keywords.setdefault(literal.lower().encode(), []).append(tech)
+            return
+        regex = re.compile(_lower_pattern(pattern).encode())
+        anchor = _anchor(pattern)
+        if anchor:
+            self.keywords.setdefault(anchor.lower().encode(), []).append((regex, tech))
+        else:
+            self.unanchored.append((regex, tech))
+
+    def pattern(self):
+        """Trie regex over all keywords, matched in a lookahead so overlapping ones are seen"""
+        if not self.keywords:
+            return None
+        # The trie reports the longest keyword starting at each position;
+        # ``hit`` adds the keywords on its path (``ng-`` in ``ng-version=``)
+        self.prefixes = {}
+        for keyword in self.keywords:
+            prefixes = [keyword[:end] for end in range(1, len(keyword))
+                        if keyword[:end] in self.keywords]
+            if prefixes:
+                self.prefixes[keyword] = prefixes
+        return f"(?=(?P<kw>{_trie_regex(sorted(keyword.decode() for keyword in self.keywords))}))"
+
+    def compile(self):
+        pattern = self.pattern()
+        self.regex = re.compile(pattern.encode()) if pattern else None
+
+    def hit(self, keyword, data, found):
+        """Handle one keyword seen in lowercased ``data``, and the keywords it starts with"""
+        for key in (keyword, *self.prefixes.get(keyword, ())):
+            for entry in self.keywords[key]:
+                if isinstance(entry, str):
+                    found.add(entry)
+                elif entry[1] not in found and entry[0].search(data):
+                    found.add(entry[1])
+
+    def finish(self, data, found):
+        """Run the patterns that have no keyword"""
+        for regex, tech in self.unanchored:
+            if tech not in found and regex.search(data):
+                found.add(tech)
+
+    def search(self, data, found):
+        """Match lowercased ``data`` on its own, using the compiled trie"""
+        if self.regex is not None:
+            for keyword in {match.group('kw') for match in self.regex.finditer(data)}:
+                self.hit(keyword, data, found)
+        self.finish(data, found)
+
+
+class FingerprintEngine:
+    """
+    Technology fingerprints compiled into a handful of combined matchers.
+
+    Body data is lowercased once and scanned by a single prefix-sharing
+    trie regex holding every literal signature plus a required literal
+    ("anchor") of each regex signature; a regex is only run once its anchor
+    has been seen. ``<script src>`` values are extracted in the same pass
+    and checked against a second trie. Header signatures are looked up by
+    header name and cookie names are matched against one combined
+    expression. A body is therefore scanned about once no matter how many
+    signatures are loaded.
+    """
+
+    MAX_BODY = 1024 * 1024
+    OVERLAP = 256
+    COOKIE_NAME = re.compile(r'(?:^|[;,])\s*([^=;,\s]+)=')
+
+    # Used when the signature file is not installed alongside recon.py
+    BUILTIN_SIGNATURES = {
+        'WordPress': {'body': ['wp-content', 'wordpress']},
+        'Joomla': {'body': ['joomla']},
+        'Drupal': {'body': ['drupal']},
+        'React': {'body': ['react']},
+        'Angular': {'body': ['ng-', 'angular']},
+        'Vue.js': {'body': ['vue\\.js', '__vue']},
+        'jQuery': {'body': ['jquery']},
+        'Bootstrap': {'body': ['bootstrap']},
+        'PHP': {'body': ['\\.php']},
+    }
+
+    def __init__(self, signatures, max_body=MAX_BODY):
+        """
+        Args:
+            signatures (dict): Technology name -> {'body': [...], 'script': [...],
+                'headers': {name: pattern}, 'cookies': [...]}
+            max_body (int): Bytes of each body that are scanned
+        """
+        self.max_body = max_body
+        self.count = 0
+        self._body = _KeywordIndex()
+        self._scripts = _KeywordIndex()
+        self._headers = {}
+        self._cookies = []
+
+        for tech, signature in signatures.items():
+            if tech.startswith('_'):
+                continue
+            try:
+                for pattern in signature.get('body', []):
+                    self._body.add(tech, pattern)
+                    self.count += 1
+                for pattern in signature.get('script', []):
+                    self._scripts.add(tech, pattern)
+                    self.count += 1
+                for header, pattern in signature.get('headers', {}).items():
+                    regex = re.compile(pattern, re.IGNORECASE)
+                    self._headers.setdefault(header.lower(), []).append((regex, tech))
+                    self.count += 1
+                for pattern in signature.get('cookies', []):
+                    self._cookies.append((re.compile(pattern, re.IGNORECASE), tech))
+                    self.count += 1
+            except re.error as e:
+                print(f"{Colors.WARNING}[-] Skipping invalid signature for {tech}: "
+                      f"{e}{Colors.ENDC}")
+
+        # The script alternative is zero-width so keywords inside the tag still match
+        body = [self._body.pattern()] if self._body.keywords else []
+        body.append(r'<script(?=[^>]*?\bsrc\s*=\s*["\']?(?P<src>[^"\'\s>]+))')
+        self._body_re = re.compile('|'.join(body).encode())
+        self._scripts.compile()
+        # One alternation rules out most cookie names in a single pass
+        self._cookie_re = None
+        if self._cookies:
+            self._cookie_re = re.compile('|'.join(f"(?:{regex.pattern})"
+                                                  for regex, _ in self._cookies), re.IGNORECASE)
+
+    @classmethod
+    def load(cls, path=None, **kwargs):
+        """Build an engine from a JSON signature file (default: data/fingerprints.json)"""
+        path = path or find_data_file('fingerprints.json')
+        if path is None:
+            return cls(cls.BUILTIN_SIGNATURES, **kwargs)
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def matcher(self):
+        """Return a streaming matcher for one response body"""
+        return FingerprintMatcher(self)
+
+    def scan(self, data, found):
+        """Add technologies whose body or script signatures match ``data`` to ``found``"""
+        data = data.lower()
+        seen = set()
+        for match in self._body_re.finditer(data):
+            key = match.group(match.lastgroup)
+            if key in seen:
+                continue
+            seen.add(key)
+            if match.lastgroup == 'src':
+                self._scripts.search(key, found)
+            else:
+                self._body.hit(key, data, found)
+        self._body.finish(data, found)
+
+    def match_body(self, body):
+        """Match a complete body (capped at ``max_body``)"""
+        matcher = self.matcher()
+        for start in range(0, min(len(body), self.max_body), 65536):
+            matcher.feed(body[start:start + 65536])
+        return matcher.found
+
+    def match_headers(self, headers):
+        """Match header and cookie signatures against a header mapping"""
+        found = set()
+        for key, value in (headers or {}).items():
+            key = key.lower()
+            for regex, tech in self._headers.get(key, ()):
+                if tech not in found and regex.search(value):
+                    found.add(tech)
+            if key == 'set-cookie' and self._cookie_re is not None:
+                # requests joins repeated Set-Cookie headers with ", "
+                for name in self.COOKIE_NAME.findall(value):
+                    # Several technologies may set the same cookie
+                    if self._cookie_re.fullmatch(name):
+                        found.update(tech for regex, tech in self._cookies
+                                     if regex.fullmatch(name))
+        return found
+
+
+class FingerprintMatcher:
+    """
+    Incremental body matcher fed with chunks as they arrive.
+
+    The last ``OVERLAP`` bytes of each chunk are rescanned with the next
+    one, so signatures shorter than that are found across chunk
+    boundaries. Input past the engine's ``max_body`` is ignored.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.found = set()
+        self.consumed = 0
+        self._tail = b''
+
+    def feed(self, chunk):
+        remaining = self.engine.max_body - self.consumed
+        if remaining <= 0 or not chunk:
+            return
+        chunk = chunk[:remaining]
+        self.consumed += len(chunk)
+        data = self._tail + chunk
+        self.engine.scan(data, self.found)
+        self._tail = data[-self.engine.OVERLAP:]
+
+
+@functools.lru_cache(maxsize=None)
+def load_fingerprints(path=None):
+    """Compile the signature file once per process"""
+    return FingerprintEngine.load(path)
+
+
+class PublicSuffixList:
+    """
+    Public suffix rules (publicsuffix.org) for finding registrable domains.
+
+    Plain, wildcard (``*.ck``) and exception (``!www.ck``) rules are
+    supported, with the longest match winning; names under no listed
+    suffix fall back to the implicit ``*`` rule (their last label).
+    """
+
+    _loaded = {}
+
+    def __init__(self, lines=()):
+        """
+        Args:
+            lines (iterable): Lines of a public_suffix_list.dat file
+        """
+        self.rules = set()
+        self.wildcards = set()
+        self.exceptions = set()
+        for line in lines:
+            rule = line.strip().lower()
+            if not rule or rule.startswith('//'):
+                continue
+            rule = rule.split()[0]
+            if not rule.isascii():
+                try:
+                    rule = rule.encode('idna').decode('ascii')
+                except UnicodeError:
+                    continue
+            if rule.startswith('!'):
+                self.exceptions.add(rule[1:])
+            elif rule.startswith('*.'):
+                self.wildcards.add(rule[2:])
+            else:
+                self.rules.add(rule)
+
+    @classmethod
+    def load(cls, path=None):
+        """The list at ``path`` (default: data/public_suffix_list.dat), parsed once per process"""
+        path = path or find_data_file('public_suffix_list.dat')
+        if path not in cls._loaded:
+            if path is None:
+                cls._loaded[path] = cls()
+            else:
+                with open(path, encoding='utf-8') as f:
+                    cls._loaded[path] = cls(f)
+        return cls._loaded[path]
+
+    def registrable_domain(self, name):
+        """
+        The public suffix of ``name`` plus one label (``a.b.example.co.uk``
+        gives ``example.co.uk``), or None if ``name`` is a public suffix
+        """
+        labels = name.lower().rstrip('.').split('.')
+        suffix = 1
+        for i in range(len(labels)):
+            candidate = '.'.join(labels[i:])
+            if candidate in self.exceptions:
+                suffix = len(labels) - i - 1
+                break
+            if candidate in self.rules or '.'.join(labels[i + 1:]) in self.wildcards:
+                suffix = len(labels) - i
+                break
+        if suffix >= len(labels):
+            return None
+        return '.'.join(labels[-suffix - 1:])
+
+
+class WhoisClient:
+    """
+    WHOIS lookups by registrable domain, shared by every scan in a process.
+
+    Names are reduced to their registrable domain with the public suffix
+    list, so ``a.example.co.uk`` and ``b.example.co.uk`` cost one query
+    for ``example.co.uk``; concurrent requests for a domain wait for the
+    first one. Answers are kept in the resolution cache (on disk with
+    ``--cache-db``) for ``TTL`` seconds, failures for its negative TTL.
+
+    Queries go straight to port 43 of the registry's server, then of the
+    registrar server it refers to. Each server has its own token bucket,
+    so lookups against different servers run in parallel while none of
+    them sees more than ``rate`` queries per second from this process, or
+    from every process of a batch when they pass the same ``shared`` state.
+    """
+
+    TTL = 86400
+    MAX_RESPONSE = 1024 * 1024
+    REFERRAL = re.compile(r'^\s*(?:Registrar )?WHOIS Server:\s*([\w.-]+)\s*$', re.I | re.M)
+    THROTTLED = re.compile(r'limit exceeded|too many (?:requests|queries)|query rate', re.I)
+    # Servers that want more than the bare domain
+    QUERY_FORMATS = {'whois.denic.de': '-T dn,ace -C UTF-8 {}',
+                     'whois.dk-hostmaster.dk': '--show-handles {}'}
+
+    def __init__(self, cache=None, rate=1.0, timeout=10, servers=None, metrics=None,
+                 shared=None):
+        """
+        Args:
+            cache (ResolutionCache): Cache holding answers between lookups and runs
+            rate (float): Queries per second allowed to each WHOIS server
+            timeout (float): Connect/read timeout in seconds
+            servers (dict): Top-level domain (or '*' for all) -> 'host[:port]'
+                to query instead of the registry's server; referrals are
+                not followed from these
+            metrics (Metrics): Registry for query counters and latency
+            shared (tuple): ``(slots, lock)`` from a ``multiprocessing.Manager``
+                to hold each server to ``rate`` across processes (see
+                ``SharedTokenBucket``)
+        """
+        self.cache = cache or ResolutionCache()
+        self.rate = rate
+        self.timeout = timeout
+        self.servers = dict(servers or {})
+        self.metrics = metrics or NULL_METRICS
+        self.shared = shared
+        self.queries = Counter()
+        self._buckets = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def server_for(self, domain):
+        """(host, port, whether referrals are followed) for ``domain``"""
+        override = self.servers.get(domain.rpartition('.')[2]) or self.servers.get('*')
+        if override:
+            host, _, port = override.rpartition(':') if override.count(':') == 1 \
+                else (override, '', '')
+            return host, int(port or 43), False
+        from whois.whois import NICClient
+
+        return NICClient().choose_server(domain), 43, True
+
+    def lookup(self, name):
+        """
+        WHOIS data for the registrable domain of ``name``.
+
+        Returns:
+            dict: 'domain' plus registrar, dates, name servers, status,
+            emails and country
+
+        Raises:
+            LookupError: ``name`` has no registrable domain, no server or
+                no record, or the lookup failed (also served from cache)
+            OSError: The server could not be reached
+        """
+        try:
+            ipaddress.ip_address(name)
+        except ValueError:
+            pass
+        else:
+            # Addresses are looked up by the domain of their PTR name
+            name = socket.gethostbyaddr(name)[0]
+        domain = PublicSuffixList.load().registrable_domain(name)
+        if domain is None:
+            raise LookupError(f"{name} is a public suffix")
+        with self._lock:
+            lock = self._locks.setdefault(domain, threading.Lock())
+        with lock:
+            found, info = self.cache.get(domain, 'WHOIS')
+            if found:
+                self.metrics.inc('whois_cache_hits_total')
+                if info is None:
+                    raise LookupError(f"WHOIS lookup of {domain} failed recently")
+                return info
+            try:
+                info = self._lookup(domain)
+            except (LookupError, OSError):
+                self.cache.put(domain, 'WHOIS', None)
+                raise
+            self.cache.put(domain, 'WHOIS', info, self.TTL)
+        return info
+
+    def _lookup(self, domain):
+        from whois.parser import PywhoisError, WhoisEntry
+
+        # Servers are asked for the ASCII (punycode) form of the name
+        try:
+            ace = domain.encode('idna').decode('ascii')
+        except UnicodeError:
+            raise LookupError(f"{domain} is not a valid domain name") from None
+        host, port, follow = self.server_for(ace)
+        if not host:
+            raise LookupError(f"no WHOIS server known for {domain}")
+        text = self.query(host, port, ace)
+        referral = self.REFERRAL.search(text) if follow else None
+        if referral and referral.group(1).lower() != host.lower():
+            # Registrar data is a bonus; the registry's answer stands on its own
+            with contextlib.suppress(LookupError, OSError):
+                text += self.query(referral.group(1), 43, ace)
+        try:
+            w = WhoisEntry.load(domain, text)
+        except PywhoisError as e:
+            raise LookupError(str(e).strip().splitlines()[0] if str(e).strip() else
+                              f"no WHOIS record for {domain}") from None
+        info = {
+            'domain': domain,
+            'registrar': w.registrar,
+            'creation_date': str(w.creation_date),
+            'expiration_date': str(w.expiration_date),
+            'name_servers': w.name_servers,
+            'status': w.status,
+            'emails': w.emails,
+            'country': w.country
+        }
+        if not any(value for key, value in info.items()
+                   if key != 'domain' and value not in (None, 'None')):
+            raise LookupError(f"no WHOIS record for {domain}")
+        return info
+
+    def query(self, host, port, domain):
+        """
+        Send one query for ``domain`` (ASCII) to ``host:port`` once its
+        token bucket allows.
+
+        Raises:
+            LookupError: The server answered that we are over its limit
+            OSError: Connection failure or timeout
+        """
+        server = f"{host}:{port}"
+        with self._lock:
+            bucket = self._buckets.get(server)
+            if bucket is None:
+                if self.shared is not None:
+                    bucket = SharedTokenBucket(self.rate, *self.shared, server)
+                else:
+                    bucket = TokenBucket(self.rate, burst=1)
+                self._buckets[server] = bucket
+        bucket.wait()
+        self.queries[server] += 1
+        request = self.QUERY_FORMATS.get(host, '{}').format(domain)
+        with self.metrics.timer('whois_query_seconds'), \
+                socket.create_connection((host, port), timeout=self.timeout) as sock:
+            sock.sendall(request.encode('ascii') + b'\r\n')
+            response = bytearray()
+            while len(response) < self.MAX_RESPONSE:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                response += chunk
+        text = response.decode('utf-8', errors='replace')
+        self.metrics.inc('whois_queries_total')
+        if self.THROTTLED.search(text[:500]) and 'Domain Name' not in text:
+            raise LookupError(f"{host} is rate limiting queries")
+        return text
+
+
+class Metrics:
+    """
+    In-process counters, latency histograms and gauges.
+
+    A series is a name plus labels, e.g. ``inc('connects_total', state='open')``.
+    Histograms use fixed latency buckets (seconds), wider ones for the
+    series in ``LONG_SERIES``; gauges keep their peak as well as their
+    current value. All methods are thread-safe.
+    ``snapshot()`` returns a JSON-ready dict for the report and
+    ``prometheus()`` the Prometheus text exposition format.
+    """
+
+    enabled = True
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    LONG_BUCKETS = (0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+                    1800.0, 3600.0)
+    # Whole stages and WHOIS lookups (rate limit waits included) run for minutes
+    LONG_SERIES = {'stage_seconds', 'whois_seconds'}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}      # key -> [value, peak]
+        self.histograms = {}  # key -> [per-bucket counts (last is +Inf), sum, bounds]
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """Add ``value`` to a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, delta, **labels):
+        """Move a gauge by ``delta`` (e.g. +1 when a probe starts, -1 when it ends)"""
+        key = self._key(name, labels)
+        with self._lock:
+            gauge = self.gauges.setdefault(key, [0, 0])
+            gauge[0] += delta
+            gauge[1] = max(gauge[1], gauge[0])
+
+    def observe(self, name, seconds, **labels):
+        """Record one latency sample in a histogram"""
+        key = self._key(name, labels)
+        buckets = self.LONG_BUCKETS if name in self.LONG_SERIES else self.BUCKETS
+        index = bisect.bisect_left(buckets, seconds)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(buckets) + 1), 0.0, buckets]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+
+    def timer(self, name, **labels):
+        """Context manager that observes its own duration"""
+        return _MetricsTimer(self, name, labels)
+
+    @staticmethod
+    def _series(key):
+        name, labels = key
+        if not labels:
+            return name
+        return name + '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+    @staticmethod
+    def _quantile(counts, buckets, fraction):
+        """Upper bound of the bucket holding the ``fraction`` quantile; None past the last one"""
+        rank = fraction * sum(counts)
+        seen = 0
+        for bound, count in zip(buckets, counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    @staticmethod
+    def bound_text(quantile):
+        """A snapshot quantile for reports: ``<=0.5s``, or ``>max`` past the last bucket"""
+        return f"<={quantile}s" if quantile is not None else '>max'
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {'counters': {series: value}, 'gauges': {series: {value, peak}},
+            'histograms': {series: {count, sum, mean, p50, p90, p99}}};
+            quantiles are bucket upper bounds in seconds, None when they
+            fall past the last bucket
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = {key: list(value) for key, value in self.gauges.items()}
+            histograms = {key: (list(counts), total, buckets)
+                          for key, (counts, total, buckets) in self.histograms.items()}
+        snapshot = {
+            'counters': {self._series(key): value for key, value in sorted(counters.items())},
+            'gauges': {self._series(key): {'value': value, 'peak': peak}
+                       for key, (value, peak) in sorted(gauges.items())},
+            'histograms': {},
+        }
+        for key, (counts, total, buckets) in sorted(histograms.items()):
+            count = sum(counts)
+            snapshot['histograms'][self._series(key)] = {
+                'count': count,
+                'sum': round(total, 6),
+                'mean': round(total / count, 6) if count else 0.0,
+                'p50': self._quantile(counts, buckets, 0.50),
+                'p90': self._quantile(counts, buckets, 0.90),
+                'p99': self._quantile(counts, buckets, 0.99),
+            }
+        return snapshot
+
+    def prometheus(self):
+        """Render every series in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((key, (list(counts), total, buckets))
+                                for key, (counts, total, buckets) in self.histograms.items())
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE recon_{name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, 'counter')
+            lines.append(f"recon_{self._series((name, labels))} {value}")
+        for (name, labels), (value, _) in gauges:
+            declare(name, 'gauge')
+            lines.append(f"recon_{self._series((name, labels))} {value}")
+        for (name, labels), (counts, total, buckets) in histograms:
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), counts):
+                cumulative += count
+                series = self._series((f"{name}_bucket", labels + (('le', bound),)))
+                lines.append(f"recon_{series} {cumulative}")
+            lines.append(f"recon_{self._series((name + '_sum', labels))} {total}")
+            lines.append(f"recon_{self._series((name + '_count', labels))} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsTimer:
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class NullMetrics(Metrics):
+    """Metrics that record nothing; the default, so instrumented code costs next to nothing"""
+
+    enabled = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def gauge(self, name, delta, **labels):
+        pass
+
+    def observe(self, name, seconds, **labels):
+        pass
+
+    def timer(self, name, **labels):
+        return contextlib.nullcontext()
+
+    def snapshot(self):
+        return {}
+
+
+NULL_METRICS = NullMetrics()
+
+
+class MetricsServer:
+    """Serves ``Metrics.prometheus()`` at ``/metrics`` from a background thread"""
+
+    def __init__(self, metrics, port, host='127.0.0.1'):
+        """
+        Args:
+            metrics (Metrics): Registry to expose
+            port (int): TCP port to listen on (0 picks a free one)
+            host (str): Address to bind on
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class StageProfiler:
+    """
+    Opt-in profiling of individual stages.
+
+    With ``directory`` every stage runs under cProfile and its stats are
+    written to ``<directory>/<stage>.prof`` (read with ``python3 -m pstats``).
+    cProfile only sees the stage's own thread. With ``trace_memory``,
+    tracemalloc snapshots taken around each stage give its net allocation,
+    which is recorded as the ``stage_alloc_bytes`` gauge; the top allocation
+    sites go to ``<directory>/<stage>.alloc.txt`` or, without a directory,
+    to the console. Stages overlap, so their memory figures can include
+    allocations made by stages running at the same time.
+    """
+
+    def __init__(self, directory=None, trace_memory=False, metrics=None):
+        """
+        Args:
+            directory (str): Where to write profiles (optional)
+            trace_memory (bool): Track allocations per stage with tracemalloc
+            metrics (Metrics): Registry for the allocation gauge
+        """
+        self.directory = directory
+        self.trace_memory = trace_memory
+        self.metrics = metrics or NULL_METRICS
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+
+    def run(self, name, func):
+        """Run one stage under the enabled profilers"""
+        before = None
+        if self.trace_memory:
+            import tracemalloc
+            before = tracemalloc.take_snapshot()
+        try:
+            if self.directory:
+                import cProfile
+                profile = cProfile.Profile()
+                try:
+                    profile.runcall(func)
+                finally:
+                    profile.dump_stats(os.path.join(self.directory, f"{name}.prof"))
+            else:
+                func()
+        finally:
+            if before is not None:
+                self._report_memory(name, before)
+
+    def _report_memory(self, name, before):
+        import tracemalloc
+        stats = tracemalloc.take_snapshot().compare_to(before, 'lineno')
+        net = sum(stat.size_diff for stat in stats)
+        self.metrics.gauge('stage_alloc_bytes', net, stage=name)
+        top = [str(stat) for stat in stats[:10]]
+        if self.directory:
+            with open(os.path.join(self.directory, f"{name}.alloc.txt"), 'w') as f:
+                f.write(f"net {net} bytes\n" + '\n'.join(top) + '\n')
+        else:
+            print(f"{Colors.OKBLUE}[*] {name}: net {net / 1048576:+.1f} MB allocated{Colors.ENDC}")
+            for line in top[:3]:
+                print(f"    {line}")
+
+
+class StageScheduler:
+    """
+    Run named stages as a dependency DAG.
+
+    Every stage whose dependencies have finished starts immediately on its
+    own daemon thread, so independent stages overlap their network waits
+    while an interrupted run can still exit at once.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.timings = {}
+
+    def add(self, name, func, depends_on=(), condition=None):
+        """
+        Register a stage.
+
+        Args:
+            name (str): Stage name used in timings and dependency lists
+            func (callable): Stage body, called without arguments
+            depends_on (iterable): Stage names that must finish first;
+                names that were not registered are ignored
+            condition (callable): Checked once dependencies are done; the
+                stage is skipped if it returns False
+        """
+        self.stages[name] = {'func': func, 'depends_on': tuple(depends_on),
+                             'condition': condition}
+
+    def run(self):
+        """
+        Execute all stages and return their wall-clock timings.
+
+        If a stage raises, no further stages are started and the first
+        exception is re-raised once running stages have finished.
+        """
+        done = queue.Queue()
+        pending = dict(self.stages)
+        finished = set()
+        running = 0
+        error = None
+
+        def execute(name, func):
+            start = time.perf_counter()
+            try:
+                func()
+                done.put((name, time.perf_counter() - start, None))
+            except BaseException as e:
+                done.put((name, time.perf_counter() - start, e))
+
+        while pending or running:
+            if error is None:
+                for name, stage in list(pending.items()):
+                    waits_on = [d for d in stage['depends_on'] if d in self.stages]
+                    if not all(d in finished for d in waits_on):
+                        continue
+                    del pending[name]
+                    if stage['condition'] and not stage['condition']():
+                        finished.add(name)
+                        continue
+                    threading.Thread(target=execute, args=(name, stage['func']),
+                                     daemon=True).start()
+                    running += 1
+            elif not running:
+                break
+            if not running:
+                continue
+            name, elapsed, exc = done.get()
+            running -= 1
+            finished.add(name)
+            self.timings[name] = round(elapsed, 3)
+            if exc is not None and error is None:
+                error = exc
+
+        if error is not None:
+            raise error
+        return self.timings
+
+
+class CheckpointJournal:
+    """
+    Append-only NDJSON journal of completed work units for one target.
+
+    Entries are buffered and written in batches (every ``FLUSH_EVERY``
+    entries or ``FLUSH_INTERVAL`` seconds), so hot loops only pay for a
+    list append. With ``resume=True`` an existing journal is replayed into
+    ``state`` before new entries are appended; a torn last line from a
+    crash is ignored.
+
+    Entry kinds:
+        meta   {"t": "meta", "target": ...}
+        port   {"t": "port", "i": ip, "p": port, "s": state}
+        sub    {"t": "sub", "n": name, "r": records}
+        words  {"t": "words", "f": wordlist, "o": offset of the first unfinished line}
+        stage  {"t": "stage", "s": name, "r": {result key: value}}
+    """
+
+    FLUSH_EVERY = 1000
+    FLUSH_INTERVAL = 1.0
+
+    # Result keys restored when a finished stage is skipped on resume
+    STAGE_RESULTS = {
+        'dns': ('dns_records',),
+        'subdomains': ('subdomains', 'subdomain_records'),
+        'permutations': ('subdomains', 'subdomain_records'),
+        'ports': ('open_ports', 'host_ports'),
+        'banners': ('banners',),
+        'certs': ('certificates', 'subdomains', 'subdomain_records'),
+        'http': ('http_headers',),
+        'http_hosts': ('subdomain_http',),
+        'tech': ('technologies',),
+        'whois': ('whois_info',),
+    }
+
+    def __init__(self, path, target, resume=False):
+        """
+        Args:
+            path (str): Journal file
+            target (str): Target the journal belongs to
+            resume (bool): Replay and extend an existing journal instead of
+                starting a new one
+        """
+        self.path = path
+        self.target = target
+        self.state = {'stages': {}, 'ports': {}, 'subdomains': {}, 'words': None}
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+        if resume and os.path.exists(path):
+            if self._replay() != target:
+                print(f"{Colors.WARNING}[-] Journal {path} belongs to another target; "
+                      f"starting over{Colors.ENDC}")
+                self.state = {'stages': {}, 'ports': {}, 'subdomains': {}, 'words': None}
+                resume = False
+        else:
+            resume = False
+        self.resumed = resume
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if resume else 'w')
+        if not resume:
+            self.record({'t': 'meta', 'target': target})
+            self.flush()
+
+    def _replay(self):
+        target = None
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                kind = entry.get('t')
+                if kind == 'meta':
+                    target = entry.get('target')
+                elif kind == 'port':
+                    self.state['ports'][(entry['i'], entry['p'])] = entry['s']
+                elif kind == 'sub':
+                    self.state['subdomains'][entry['n']] = entry['r']
+                elif kind == 'words':
+                    self.state['words'] = (entry['f'], entry['o'])
+                elif kind == 'stage':
+                    self.state['stages'][entry['s']] = entry['r']
+        return target
+
+    def record(self, entry):
+        """Queue one entry; flushes when the batch is full or old enough"""
+        with self._lock:
+            self._buffer.append(entry)
+            if (len(self._buffer) < self.FLUSH_EVERY and
+                    time.monotonic() - self._last_flush < self.FLUSH_INTERVAL):
+                return
+            self._flush_locked()
+
+    def flush(self):
+        """Write buffered entries to disk"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer or self._file.closed:
+            return
+        self._file.write(''.join(json.dumps(entry, default=json_default) + '\n'
+                                 for entry in self._buffer))
+        self._file.flush()
+        self._buffer.clear()
+
+    def stage_done(self, name, results):
+        """Record a finished stage together with the results it produced"""
+        keys = self.STAGE_RESULTS.get(name, ())
+        self.record({'t': 'stage', 's': name, 'r': {key: results[key] for key in keys}})
+        self.flush()
+
+    def close(self, remove=False):
+        """Flush and close the journal; ``remove`` deletes it (scan finished)"""
+        with self._lock:
+            self._flush_locked()
+            if not self._file.closed:
+                os.fsync(self._file.fileno())
+                self._file.close()
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+# Result keys compared by diff_results, and the stage that produces each
+DIFF_SECTIONS = {
+    'dns_records': 'dns',
+    'subdomains': 'subdomains',
+    'open_ports': 'ports',
+    'host_ports': 'ports',
+    'http_headers': 'http',
+    'technologies': 'tech',
+}
+
+# Headers that change on every response and would drown real changes
+VOLATILE_HEADERS = frozenset({
+    'date', 'age', 'expires', 'set-cookie', 'last-modified', 'etag', 'cf-ray', 'x-request-id',
+    'x-amz-request-id', 'x-amz-cf-id', 'x-runtime', 'server-timing', 'report-to', 'nel',
+})
+
+
+def load_baseline(path):
+    """
+    Load earlier results to re-scan against.
+
+    Args:
+        path (str): A JSON report written by ``generate_report``, or a batch
+            report (JSON array of per-target results)
+
+    Returns:
+        dict: Target -> its earlier results
+
+    Raises:
+        ValueError: The file is not a JSON report
+    """
+    with open(path) as f:
+        data = json.load(f)
+    reports = data if isinstance(data, list) else [data]
+    baselines = {}
+    for report in reports:
+        if not isinstance(report, dict) or 'target' not in report:
+            raise ValueError(f"{path} is not a recon JSON report")
+        if 'error' not in report:
+            baselines[report['target']] = report
+    return baselines
+
+
+def _added_removed(old, new):
+    old, new = set(old), set(new)
+    return {'added': sorted(new - old), 'removed': sorted(old - new)}
+
+
+def diff_results(old, new, sections=None):
+    """
+    Structured changes between earlier results and this run's.
+
+    Args:
+        old (dict): Earlier results, e.g. from ``load_baseline``
+        new (dict): Current results
+        sections (iterable): Result keys to compare (default: every key in
+            DIFF_SECTIONS); leave out sections whose stage did not run, or
+            everything in them would show up as removed
+
+    Returns:
+        dict: ``since`` (earlier timestamp), ``changes`` (total count) and,
+        for each section that changed, its added/removed entries; headers
+        are compared per protocol, case-insensitively and without
+        VOLATILE_HEADERS, and also report ``changed`` values
+    """
+    sections = set(DIFF_SECTIONS if sections is None else sections)
+    diff = {'since': old.get('timestamp', ''), 'changes': 0}
+
+    def add(section, changes, count):
+        if count:
+            diff[section] = changes
+            diff['changes'] += count
+
+    if 'dns_records' in sections:
+        old_records, new_records = old.get('dns_records', {}), new.get('dns_records', {})
+        changes = {}
+        for rtype in sorted(set(old_records) | set(new_records)):
+            change = _added_removed(old_records.get(rtype, []), new_records.get(rtype, []))
+            if change['added'] or change['removed']:
+                changes[rtype] = change
+        add('dns_records', changes,
+            sum(len(c['added']) + len(c['removed']) for c in changes.values()))
+    if 'subdomains' in sections:
+        change = _added_removed(old.get('subdomains', []), new.get('subdomains', []))
+        add('subdomains', change, len(change['added']) + len(change['removed']))
+    if 'open_ports' in sections:
+        change = _added_removed((p['port'] for p in old.get('open_ports', [])),
+                                (p['port'] for p in new.get('open_ports', [])))
+        add('open_ports', change, len(change['added']) + len(change['removed']))
+    if 'host_ports' in sections and (old.get('host_ports') or new.get('host_ports')):
+        def endpoints(results):
+            return {(host, e['ip'], e['port'])
+                    for host, entries in results.get('host_ports', {}).items() for e in entries}
+        change = _added_removed(endpoints(old), endpoints(new))
+        change = {key: [{'host': host, 'ip': ip, 'port': port} for host, ip, port in values]
+                  for key, values in change.items()}
+        add('host_ports', change, len(change['added']) + len(change['removed']))
+    if 'http_headers' in sections:
+        old_headers, new_headers = old.get('http_headers', {}), new.get('http_headers', {})
+        changes = {}
+        for protocol in sorted(set(old_headers) | set(new_headers)):
+            before, after = ({key.lower(): value for key, value in headers.get(protocol, {}).items()
+                              if key.lower() not in VOLATILE_HEADERS}
+                             for headers in (old_headers, new_headers))
+            change = {
+                'added': {key: after[key] for key in sorted(after.keys() - before.keys())},
+                'removed': {key: before[key] for key in sorted(before.keys() - after.keys())},
+                'changed': {key: {'old': before[key], 'new': after[key]}
+                            for key in sorted(before.keys() & after.keys())
+                            if before[key] != after[key]},
+            }
+            if any(change.values()):
+                changes[protocol] = change
+        add('http_headers', changes,
+            sum(len(part) for c in changes.values() for part in c.values()))
+    if 'technologies' in sections:
+        change = _added_removed(old.get('technologies', []), new.get('technologies', []))
+        add('technologies', change, len(change['added']) + len(change['removed']))
+    return diff
+
+
+def diff_lines(diff):
+    """
+    Yield one readable line per change in a ``diff_results`` dict
+    (+ added, - removed, ~ changed)
+    """
+    for rtype, change in diff.get('dns_records', {}).items():
+        for sign, key in (('+', 'added'), ('-', 'removed')):
+            for value in change[key]:
+                yield f"{sign} {rtype} record {value}"
+    for sign, key in (('+', 'added'), ('-', 'removed')):
+        for name in diff.get('subdomains', {}).get(key, []):
+            yield f"{sign} subdomain {name}"
+        for port in diff.get('open_ports', {}).get(key, []):
+            yield f"{sign} port {port}"
+        for entry in diff.get('host_ports', {}).get(key, []):
+            yield f"{sign} {entry['host']} port {entry['port']} ({entry['ip']})"
+    for protocol, change in diff.get('http_headers', {}).items():
+        for name, value in change['added'].items():
+            yield f"+ {protocol} header {name}: {value}"
+        for name, value in change['removed'].items():
+            yield f"- {protocol} header {name}: {value}"
+        for name, values in change['changed'].items():
+            yield f"~ {protocol} header {name}: {values['old']} -> {values['new']}"
+    for sign, key in (('+', 'added'), ('-', 'removed')):
+        for tech in diff.get('technologies', {}).get(key, []):
+            yield f"{sign} technology {tech}"
+
+
+def iter_findings(results):
+    """Yield ``(event, fields)`` for every finding held in a ``ReconTool.results`` dict"""
+    yield 'scan', {'target': results['target'], 'timestamp': results['timestamp']}
+    for record_type, values in results['dns_records'].items():
+        yield 'dns', {'type': record_type, 'values': values}
+    for name in results['subdomains']:
+        yield 'subdomain', {'name': name, 'records': results['subdomain_records'].get(name)}
+    for zone, wildcard in results.get('dns_wildcards', {}).items():
+        yield 'wildcard', {'zone': zone, **wildcard}
+    for port in results['open_ports']:
+        yield 'port', {'port': port['port'], 'service': port['service']}
+    for host, ports in results['host_ports'].items():
+        yield 'host_ports', {'host': host, 'ports': ports}
+    for port, banner in results['banners'].items():
+        yield 'banner', {'port': port, 'banner': banner}
+    for cert in results.get('certificates', []):
+        yield 'certificate', dict(cert)
+    for protocol, headers in results['http_headers'].items():
+        yield 'http', {'protocol': protocol, 'headers': headers}
+    for host, protocols in results['subdomain_http'].items():
+        yield 'subdomain_http', {'host': host, 'protocols': protocols}
+    for tech in results['technologies']:
+        yield 'technology', {'name': tech}
+    if results['whois_info']:
+        yield 'whois', {'info': results['whois_info']}
+    if results.get('diff'):
+        yield 'diff', {'diff': results['diff']}
+    if results['stage_timings'] or results['cache_stats']:
+        yield 'summary', {'stage_timings': results['stage_timings'],
+                          'cache_stats': results['cache_stats'],
+                          'metrics': results.get('metrics', {})}
+
+
+class ResultDatabase:
+    """
+    SQLite store of findings, indexed for queries after the scan.
+
+    Each scanned target gets a row in ``scans``; findings go to one table
+    per kind (named after the JSON report keys) referencing it, with
+    indexes on host, port, subdomain and technology name. Rows are
+    buffered and written in batches, so memory stays flat however many
+    targets and findings a run produces. For example, every host with
+    port 443 open across all scans::
+
+        SELECT s.target, h.host, h.ip FROM host_ports h JOIN scans s ON s.id = h.scan
+        WHERE h.port = 443
+    """
+
+    FLUSH_EVERY = 1000
+
+    TABLES = {
+        'dns_records': ('type', 'value'),
+        'subdomains': ('name', 'a', 'aaaa', 'cname'),
+        'open_ports': ('port', 'service'),
+        'host_ports': ('host', 'ip', 'port', 'service'),
+        'banners': ('port', 'banner'),
+        'certificates': ('fingerprint', 'subject', 'issuer', 'not_after', 'names'),
+        'http_headers': ('protocol', 'name', 'value'),
+        'technologies': ('name',),
+    }
+    INDEXES = [('subdomains', 'name'), ('open_ports', 'port'), ('host_ports', 'host'),
+               ('host_ports', 'port'), ('certificates', 'fingerprint'), ('technologies', 'name')]
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): SQLite file; created if missing, appended to otherwise
+        """
+        import sqlite3
+
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS scans (
+                                id INTEGER PRIMARY KEY,
+                                target TEXT NOT NULL,
+                                timestamp TEXT NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS scans_target ON scans (target)")
+        for table, columns in self.TABLES.items():
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                             f"(scan INTEGER NOT NULL REFERENCES scans (id), {', '.join(columns)})")
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_scan ON {table} (scan)")
+        for table, column in self.INDEXES:
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+        self._db.commit()
+        self._scan = None
+        self._pending = {table: [] for table in self.TABLES}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, event, fields):
+        """Store one finding, as streamed to a ``ResultSink``"""
+        with self._lock:
+            if event == 'scan':
+                self._flush()
+                self._scan = self._db.execute(
+                    "INSERT INTO scans (target, timestamp) VALUES (?, ?)",
+                    (fields['target'], fields['timestamp'])).lastrowid
+                return
+            if self._scan is None:
+                return
+            for table, row in self._rows(event, fields):
+                self._pending[table].append((self._scan,) + row)
+                self._count += 1
+            if self._count >= self.FLUSH_EVERY or event == 'summary':
+                self._flush()
+
+    def add_results(self, results):
+        """Store every finding of a ``ReconTool.results`` dict"""
+        for event, fields in iter_findings(results):
+            self.add(event, fields)
+        with self._lock:
+            self._flush()
+
+    @staticmethod
+    def _rows(event, fields):
+        """(table, row) pairs for one finding"""
+        if event == 'dns':
+            for value in fields['values']:
+                yield 'dns_records', (fields['type'], str(value))
+        elif event == 'subdomain':
+            records = fields['records'] or {}
+            yield 'subdomains', (fields['name'],) + tuple(
+                ','.join(records.get(kind, ())) for kind in ('A', 'AAAA', 'CNAME'))
+        elif event == 'port':
+            yield 'open_ports', (fields['port'], fields['service'])
+        elif event == 'host_ports':
+            for entry in fields['ports']:
+                yield 'host_ports', (fields['host'], entry['ip'], entry['port'], entry['service'])
+        elif event == 'banner':
+            yield 'banners', (int(fields['port']), fields['banner'])
+        elif event == 'certificate':
+            yield 'certificates', (fields['fingerprint'], fields['subject'], fields['issuer'],
+                                   fields['not_after'], ','.join(fields['names']))
+        elif event == 'http':
+            for name, value in fields['headers'].items():
+                yield 'http_headers', (fields['protocol'], name.lower(), str(value))
+        elif event == 'technology':
+            yield 'technologies', (fields['name'],)
+
+    def _flush(self):
+        for table, rows in self._pending.items():
+            if rows:
+                placeholders = ', '.join('?' * (len(self.TABLES[table]) + 1))
+                self._db.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+                rows.clear()
+        self._db.commit()
+        self._count = 0
+
+    def close(self):
+        """Write pending rows and close the database"""
+        with self._lock:
+            if self._db is None:
+                return
+            self._flush()
+            self._db.close()
+            self._db = None
+
+
+class ResultSink:
+    """
+    Findings stream: one NDJSON line per finding, written as it is produced.
+
+    Every line is a JSON object with an ``event`` field (scan, dns,
+    subdomain, wildcard, port, host_ports, banner, certificate, http,
+    subdomain_http, technology, whois, diff, summary) and is flushed
+    immediately, so ``tail -f`` or a pipeline can consume results while
+    the scan runs. A wildcard zone is repeated with running totals when a
+    later stage filters more names under it. Reports are rendered from this
+    file by ``ReportRenderer``.
+    """
+
+    def __init__(self, path, database=None):
+        """
+        Args:
+            path (str): NDJSON file to create
+            database (ResultDatabase): Store that also receives every finding (optional)
+        """
+        self.path = path
+        self.database = database
+        self.count = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'w')
+
+    def emit(self, event, **fields):
+        """Append one finding"""
+        line = json.dumps({'event': event, **fields}, default=json_default) + '\n'
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self._file.flush()
+            self.count += 1
+            if self.database is not None:
+                self.database.add(event, fields)
+
+    def emit_results(self, results):
+        """Write every finding held in a ``ReconTool.results`` dict"""
+        for event, fields in iter_findings(results):
+            self.emit(event, **fields)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        if self.database is not None:
+            self.database.close()
+
+
+def wildcard_summary(wildcard):
+    """One-line description of a detected wildcard for the reports"""
+    if wildcard['skipped']:
+        return f"wildcard answering differently per name, {wildcard['skipped']} names skipped"
+    return (f"wildcard ({', '.join(wildcard['answers'])}), "
+            f"{wildcard['filtered']} matching names filtered")
+
+
+class _TextReport:
+    """Section fragments and layout of the plain-text report"""
+
+    SECTIONS = [('dns', 'DNS RECORDS'), ('subdomains', 'SUBDOMAINS'),
+                ('ports', 'OPEN PORTS'), ('host_ports', 'OPEN PORTS BY HOST'),
+                ('certificates', 'CERTIFICATES'), ('technologies', 'TECHNOLOGIES')]
+    # Sections left out entirely when the scan produced nothing for them
+    OPTIONAL = {'host_ports', 'certificates'}
+
+    def __init__(self):
+        self.seen = set()
+
+    def fragments(self, event):
+        kind = event['event']
+        if kind == 'dns':
+            yield 'dns', f"{event['type']}: {', '.join(event['values'])}\n"
+        elif kind == 'subdomain':
+            yield 'subdomains', f"{event['name']}\n"
+        elif kind == 'wildcard':
+            yield 'subdomains', f"*.{event['zone']}: {wildcard_summary(event)}\n"
+        elif kind == 'port':
+            yield 'ports', f"Port {event['port']} ({event['service']})\n"
+        elif kind == 'host_ports':
+            self.seen.add('host_ports')
+            ports = ', '.join(f"{p['port']}/{p['service']} ({p['ip']})" for p in event['ports'])
+            yield 'host_ports', f"{event['host']}: {ports}\n"
+        elif kind == 'certificate':
+            self.seen.add('certificates')
+            endpoints = ', '.join(f"{e['sni'] or e['ip']}:{e['port']}" for e in event['endpoints'])
+            yield 'certificates', (f"{event['subject']} (issuer {event['issuer']}, "
+                                   f"{event['not_before'][:10]} to {event['not_after'][:10]})\n"
+                                   f"  Names: {', '.join(event['names']) or '-'}\n"
+                                   f"  Seen on: {endpoints}\n")
+        elif kind == 'technology':
+            yield 'technologies', f"{event['name']}\n"
+
+    def write(self, out, meta, copy):
+        out.write("Reconnaissance Report\n")
+        out.write(f"Target: {meta['target']}\n")
+        out.write(f"Timestamp: {meta['timestamp']}\n")
+        out.write("=" * 60 + "\n\n")
+
+        for section, title in self.SECTIONS:
+            if section in self.OPTIONAL and section not in self.seen:
+                continue
+            out.write(f"{title}\n")
+            out.write("-" * 60 + "\n")
+            copy(section)
+            out.write("\n")
+
+        diff = meta['diff']
+        if diff:
+            out.write(f"CHANGES SINCE {diff['since']}\n")
+            out.write("-" * 60 + "\n")
+            for line in diff_lines(diff):
+                out.write(f"{line}\n")
+            if not diff['changes']:
+                out.write("No changes\n")
+            out.write("\n")
+
+        if meta['stage_timings']:
+            out.write("STAGE TIMINGS\n")
+            out.write("-" * 60 + "\n")
+            for stage, elapsed in meta['stage_timings'].items():
+                out.write(f"{stage}: {elapsed:.3f}s\n")
+            out.write("\n")
+
+        cache = meta['cache_stats']
+        if cache:
+            out.write("RESOLUTION CACHE\n")
+            out.write("-" * 60 + "\n")
+            out.write(f"Hits: {cache['hits']} ({cache['negative_hits']} negative), "
+                      f"Misses: {cache['misses']}\n")
+
+        metrics = meta['metrics']
+        if metrics:
+            out.write("\nMETRICS\n")
+            out.write("-" * 60 + "\n")
+            for series, value in metrics['counters'].items():
+                out.write(f"{series}: {value}\n")
+            for series, gauge in metrics['gauges'].items():
+                out.write(f"{series}: {gauge['value']} (peak {gauge['peak']})\n")
+            for series, h in metrics['histograms'].items():
+                out.write(f"{series}: n={h['count']} mean={h['mean'] * 1000:.1f}ms "
+                          f"p50{Metrics.bound_text(h['p50'])} p90{Metrics.bound_text(h['p90'])} "
+                          f"p99{Metrics.bound_text(h['p99'])}\n")
+
+
+class _JSONReport:
+    """Section fragments and layout of the JSON report (same keys as ``results``)"""
+
+    # (key, section or None for values taken from the summary events, container)
+    KEYS = [('dns_records', 'dns', '{}'),
+            ('subdomains', 'subdomains', '[]'),
+            ('subdomain_records', 'subdomain_records', '{}'),
+            ('dns_wildcards', 'dns_wildcards', '{}'),
+            ('open_ports', 'ports', '[]'),
+            ('host_ports', 'host_ports', '{}'),
+            ('http_headers', 'http', '{}'),
+            ('subdomain_http', 'subdomain_http', '{}'),
+            ('technologies', 'technologies', '[]'),
+            ('whois_info', None, None),
+            ('banners', 'banners', '{}'),
+            ('certificates', 'certificates', '[]'),
+            ('cache_stats', None, None),
+            ('stage_timings', None, None),
+            ('metrics', None, None),
+            ('diff', None, None)]
+
+    def __init__(self):
+        self.started = set()
+
+    def _item(self, section, text):
+        prefix = ',\n        ' if section in self.started else '\n        '
+        self.started.add(section)
+        return section, prefix + text
+
+    def fragments(self, event):
+        kind = event['event']
+        if kind == 'dns':
+            yield self._item('dns', f"{json.dumps(event['type'])}: {json.dumps(event['values'])}")
+        elif kind == 'subdomain':
+            yield self._item('subdomains', json.dumps(event['name']))
+            yield self._item('subdomain_records',
+                             f"{json.dumps(event['name'])}: {json.dumps(event['records'])}")
+        elif kind == 'wildcard':
+            wildcard = {key: event[key] for key in ('answers', 'filtered', 'skipped')}
+            yield self._item('dns_wildcards',
+                             f"{json.dumps(event['zone'])}: {json.dumps(wildcard)}")
+        elif kind == 'port':
+            yield self._item('ports', json.dumps({'port': event['port'],
+                                                  'service': event['service']}))
+        elif kind == 'host_ports':
+            yield self._item('host_ports',
+                             f"{json.dumps(event['host'])}: {json.dumps(event['ports'])}")
+        elif kind == 'banner':
+            yield self._item('banners',
+                             f"{json.dumps(str(event['port']))}: {json.dumps(event['banner'])}")
+        elif kind == 'certificate':
+            yield self._item('certificates', json.dumps(
+                {key: value for key, value in event.items() if key != 'event'}))
+        elif kind == 'http':
+            yield self._item('http',
+                             f"{json.dumps(event['protocol'])}: {json.dumps(event['headers'])}")
+        elif kind == 'subdomain_http':
+            yield self._item('subdomain_http',
+                             f"{json.dumps(event['host'])}: {json.dumps(event['protocols'])}")
+        elif kind == 'technology':
+            yield self._item('technologies', json.dumps(event['name']))
+
+    def write(self, out, meta, copy):
+        out.write('{\n')
+        out.write(f'    "target": {json.dumps(meta["target"])},\n')
+        out.write(f'    "timestamp": {json.dumps(meta["timestamp"])}')
+        for key, section, container in self.KEYS:
+            out.write(f',\n    {json.dumps(key)}: ')
+            if section is None:
+                out.write(json.dumps(meta[key], default=json_default))
+                continue
+            out.write(container[0])
+            copy(section)
+            if section in self.started:
+                out.write('\n    ')
+            out.write(container[1])
+        out.write('\n}\n')
+
+
+class _HTMLReport:
+    """Section fragments and layout of the HTML report; every value is escaped"""
+
+    STYLE = """
+        body { font-family: Arial, sans-serif; margin: 20px; background: #f4f4f4; }
+        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 20px; }
+        h1 { color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }
+        h2 { color: #4CAF50; margin-top: 30px; }
+        .info { background: #e8f5e9; padding: 15px; border-left: 4px solid #4CAF50;
+                margin: 10px 0; }
+        .warning { background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107;
+                   margin: 10px 0; }
+        table { width: 100%; border-collapse: collapse; margin: 15px 0; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background: #4CAF50; color: white; }
+        .port { display: inline-block; background: #4CAF50; color: white; padding: 5px 10px;
+                margin: 5px; border-radius: 3px; }
+"""
+
+    def __init__(self):
+        self.seen = set()
+
+    def fragments(self, event):
+        from html import escape
+
+        kind = event['event']
+        if kind == 'dns':
+            yield 'dns', (f"<tr><td>{escape(event['type'])}</td>"
+                          f"<td>{escape(', '.join(event['values']))}</td></tr>\n")
+        elif kind == 'subdomain':
+            yield 'subdomains', f"{escape(event['name'])}<br>\n"
+        elif kind == 'wildcard':
+            yield 'subdomains', (f"<em>*.{escape(event['zone'])}: "
+                                 f"{escape(wildcard_summary(event))}</em><br>\n")
+        elif kind == 'port':
+            yield 'ports', (f'<span class="port">{event["port"]} '
+                            f'({escape(event["service"])})</span>\n')
+        elif kind == 'host_ports':
+            self.seen.add('host_ports')
+            ports = ', '.join(f"{p['port']}/{escape(p['service'])} ({escape(p['ip'])})"
+                              for p in event['ports'])
+            yield 'host_ports', f"<tr><td>{escape(event['host'])}</td><td>{ports}</td></tr>\n"
+        elif kind == 'certificate':
+            self.seen.add('certificates')
+            endpoints = ', '.join(f"{e['sni'] or e['ip']}:{e['port']}" for e in event['endpoints'])
+            yield 'certificates', (f"<tr><td>{escape(event['subject'])}</td>"
+                                   f"<td>{escape(event['issuer'])}</td>"
+                                   f"<td>{escape(event['not_after'][:10])}</td>"
+                                   f"<td>{escape(', '.join(event['names']))}</td>"
+                                   f"<td>{escape(endpoints)}</td></tr>\n")
+        elif kind == 'technology':
+            yield 'technologies', f"{escape(event['name'])}<br>\n"
+
+    def write(self, out, meta, copy):
+        from html import escape
+        cache = meta['cache_stats']
+        out.write(f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Recon Report - {escape(meta['target'])}</title>
+    <style>{self.STYLE}    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Reconnaissance Report</h1>
+        <div class="info">
+            <strong>Target:</strong> {escape(meta['target'])}<br>
+            <strong>Scan Date:</strong> {escape(meta['timestamp'])}<br>
+            <strong>Resolution Cache:</strong> {cache.get('hits', 0)} hits,
+            {cache.get('misses', 0)} misses<br>
+        </div>
+
+        <h2>DNS Records</h2>
+        <table>
+            <tr><th>Record Type</th><th>Values</th></tr>
+""")
+        copy('dns')
+        out.write("""
+        </table>
+
+        <h2>Subdomains</h2>
+        <div class="info">
+""")
+        copy('subdomains')
+        out.write("""
+        </div>
+
+        <h2>Open Ports</h2>
+        <div>
+""")
+        copy('ports')
+        out.write("""
+        </div>
+""")
+        if 'host_ports' in self.seen:
+            out.write("""
+        <h2>Open Ports by Host</h2>
+        <table>
+            <tr><th>Host</th><th>Ports</th></tr>
+""")
+            copy('host_ports')
+            out.write("""
+        </table>
+""")
+        if 'certificates' in self.seen:
+            out.write("""
+        <h2>Certificates</h2>
+        <table>
+            <tr><th>Subject</th><th>Issuer</th><th>Expires</th><th>Names</th><th>Seen on</th></tr>
+""")
+            copy('certificates')
+            out.write("""
+        </table>
+""")
+        out.write("""
+
+        <h2>Technologies</h2>
+        <div class="info">
+""")
+        copy('technologies')
+        out.write("""
+        </div>
+""")
+        diff = meta['diff']
+        if diff:
+            out.write(f"""
+        <h2>Changes since {escape(diff['since'])}</h2>
+        <div class="info">
+""")
+            for line in diff_lines(diff):
+                out.write(f"{escape(line)}<br>\n")
+            if not diff['changes']:
+                out.write("No changes<br>\n")
+            out.write("""
+        </div>
+""")
+        out.write("""
+
+        <h2>Stage Timings</h2>
+        <table>
+            <tr><th>Stage</th><th>Wall Clock (s)</th></tr>
+""")
+        for stage, elapsed in meta['stage_timings'].items():
+            out.write(f"<tr><td>{escape(stage)}</td><td>{elapsed:.3f}</td></tr>\n")
+        out.write("""
+        </table>
+""")
+        metrics = meta['metrics']
+        if metrics:
+            out.write("""
+        <h2>Metrics</h2>
+        <table>
+            <tr><th>Series</th><th>Value</th></tr>
+""")
+            for series, value in metrics['counters'].items():
+                out.write(f"<tr><td>{escape(series)}</td><td>{value}</td></tr>\n")
+            for series, gauge in metrics['gauges'].items():
+                out.write(f"<tr><td>{escape(series)}</td><td>{gauge['value']} "
+                          f"(peak {gauge['peak']})</td></tr>\n")
+            for series, h in metrics['histograms'].items():
+                out.write(f"<tr><td>{escape(series)}</td><td>n={h['count']} "
+                          f"mean={h['mean'] * 1000:.1f}ms "
+                          f"p50{escape(Metrics.bound_text(h['p50']))} "
+                          f"p99{escape(Metrics.bound_text(h['p99']))}</td></tr>\n")
+            out.write("""
+        </table>
+""")
+        out.write("""
+    </div>
+</body>
+</html>
+""")
+
+
+class ReportRenderer:
+    """
+    Render a report from a ``ResultSink`` stream in one pass.
+
+    Each event is formatted as it is read and appended to a temporary
+    spool file for its report section; the spools are then copied into the
+    report in section order. Time is linear in the number of findings and
+    memory use does not depend on it. Wildcard zones, which can repeat with
+    updated counts, are held back and formatted once at the end.
+    """
+
+    FORMATS = {'text': _TextReport, 'json': _JSONReport, 'html': _HTMLReport}
+
+    def __init__(self, events_path):
+        """
+        Args:
+            events_path (str): NDJSON file written by ``ResultSink``
+        """
+        self.events_path = events_path
+
+    def events(self):
+        """Yield the events in the stream, skipping a torn last line"""
+        with open(self.events_path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def render(self, output_path, report_format='text'):
+        """
+        Write the report for ``report_format`` (text, json or html) to ``output_path``.
+
+        Returns:
+            int: Number of events read
+        """
+        report = self.FORMATS[report_format]()
+        meta = {'target': '', 'timestamp': '', 'whois_info': {},
+                'stage_timings': {}, 'cache_stats': {}, 'metrics': {}, 'diff': {}}
+        spools = {}
+        wildcards = {}
+        count = 0
+        with tempfile.TemporaryDirectory(prefix='recon-report-') as spool_dir:
+            try:
+                for event in self.events():
+                    count += 1
+                    kind = event.get('event')
+                    if kind == 'wildcard':
+                        # The latest totals for a zone replace its earlier ones
+                        wildcards[event['zone']] = event
+                        continue
+                    if kind == 'scan':
+                        meta['target'] = event['target']
+                        meta['timestamp'] = event['timestamp']
+                    elif kind == 'whois':
+                        meta['whois_info'] = event['info']
+                    elif kind == 'diff':
+                        meta['diff'] = event['diff']
+                    elif kind == 'summary':
+                        meta['stage_timings'] = event['stage_timings']
+                        meta['cache_stats'] = event['cache_stats']
+                        meta['metrics'] = event.get('metrics', {})
+                    self._spool(report, event, spools, spool_dir)
+                for event in wildcards.values():
+                    self._spool(report, event, spools, spool_dir)
+
+                def copy(section):
+                    spool = spools.get(section)
+                    if spool is not None:
+                        spool.seek(0)
+                        shutil.copyfileobj(spool, out)
+
+                with open(output_path, 'w') as out:
+                    report.write(out, meta, copy)
+            finally:
+                for spool in spools.values():
+                    spool.close()
+        return count
+
+    @staticmethod
+    def _spool(report, event, spools, spool_dir):
+        """Append the report fragments for ``event`` to their section spools"""
+        for section, text in report.fragments(event):
+            spool = spools.get(section)
+            if spool is None:
+                spool = spools[section] = open(os.path.join(spool_dir, section), 'w+')
+            spool.write(text)
+
+
 class ReconTool:
-    def __init__(self, target, ports=None, timeout=3, threads=10, wordlist=None):
+    def __init__(self, target, ports=None, timeout=3, threads=10, wordlist=None,
+                 max_inflight=1000, resolvers=None, dns_inflight=500, cache=None,
+                 probe_subdomains=False, fingerprints=None, banner_workers=256, journal=None,
+                 sink=None, rate=None, adaptive=True, scan_subdomains=False, metrics=None,
+                 profiler=None, baseline=None, recheck_only=False, permute_depth=0,
+                 permute_limit=1000000, http_session=None, rtts=None, whois=None,
+                 whois_rate=1.0, whois_servers=None, certs_all_ports=False):
         """
         Initialize the reconnaissance tool
-        
+
         Args:
             target (str): Target domain or IP address
-            ports (list): List of ports to scan
+            ports (iterable): Ports to scan, e.g. a ``PortSet``
             timeout (int): Connection timeout in seconds
             threads (int): Number of concurrent threads
             wordlist (str): Path to subdomain wordlist
+            max_inflight (int): Maximum concurrent connects during port scanning
+            resolvers (list): Nameservers ('ip' or 'ip:port') for subdomain brute force
+            dns_inflight (int): Maximum concurrent lookups during subdomain brute force
+            cache (ResolutionCache): Resolution cache shared by all modules
+            probe_subdomains (bool): Also fetch HTTP/HTTPS from every discovered subdomain
+            fingerprints (FingerprintEngine): Compiled technology signatures
+            banner_workers (int): Maximum ports probed at once during banner grabbing
+            journal (CheckpointJournal): Checkpoint journal; if it was resumed,
+                finished work is restored from it and skipped
+            sink (ResultSink): Findings stream written as results come in
+            rate (float): Maximum packets (connects or DNS queries) per second
+            adaptive (bool): Adapt probe timeouts and concurrency to measured RTT and loss
+            scan_subdomains (bool): Port scan every address of the target and of
+                every discovered subdomain, not just the target's IPv4 address
+            metrics (Metrics): Instrumentation registry; its snapshot is added
+                to the results as ``metrics``
+            profiler (StageProfiler): Per-stage cProfile/tracemalloc hook
+            baseline (dict): Results of an earlier scan of the target. Its
+                subdomains and open ports are re-checked first, its pages are
+                fetched conditionally and the changes are added to the
+                results as ``diff``
+            recheck_only (bool): With a baseline, only re-check what it
+                found: no wordlist sweep and no ports it did not list as open
+            permute_depth (int): Rounds of permutations of the found
+                subdomains, each mutating the previous round's hits (0 disables)
+            permute_limit (int): Maximum permutation candidates resolved
+            http_session (requests.Session): Keep-alive session shared with
+                other scans (see ``ScanDaemon``); a private one by default
+            rtts (dict): Per-address RTT estimates shared with other scans
+            whois (WhoisClient): WHOIS client shared with other scans; a
+                private one (on ``cache``) by default
+            whois_rate (float): WHOIS queries per second per server, for
+                the private client
+            whois_servers (dict): Top-level domain (or '*') -> WHOIS server
+                'host[:port]' overrides, for the private client
+            certs_all_ports (bool): Handshake with every open port when
+                harvesting certificates, not just those known to speak TLS
         """
         self.target = target
-        self.ports = ports or [21, 22, 23, 25, 53, 80, 110, 143, 443, 445, 3306, 3389, 8080, 8443]
+        if not isinstance(ports, PortSet):
+            ports = PortSet(ports or [21, 22, 23, 25, 53, 80, 110, 143, 443, 445, 3306, 3389,
+                                      8080, 8443])
+        self.ports = ports
         self.timeout = timeout
         self.threads = threads
+        self.max_inflight = max_inflight
+        self.resolvers = resolvers
+        self.dns_inflight = dns_inflight
+        self.banner_workers = banner_workers
+        self.rate = rate
+        self.adaptive = adaptive
+        # Per-address RTT estimates, shared by the port scanner and banner grabber
+        self.rtts = rtts if rtts is not None else {}
+        self.cache = cache or ResolutionCache()
+        self.probe_subdomains = probe_subdomains
+        self.scan_subdomains = scan_subdomains
+        self.metrics = metrics or NULL_METRICS
+        self.profiler = profiler
+        self.http = HTTPClient(timeout=timeout, pool_size=threads, adaptive=adaptive,
+                               metrics=self.metrics, session=http_session)
+        self.baseline = baseline
+        self.recheck_only = recheck_only and baseline is not None
+        self.permute_depth = permute_depth
+        self.permute_limit = permute_limit
+        self.certs_all_ports = certs_all_ports
+        self.whois = whois or WhoisClient(self.cache, rate=whois_rate, servers=whois_servers,
+                                          metrics=self.metrics)
+        if baseline is not None:
+            for protocol, headers in baseline.get('http_headers', {}).items():
+                self.http.add_validators(f"{protocol}://{target}", headers)
+        self.fingerprints = fingerprints or load_fingerprints()
         self.wordlist = wordlist or "wordlists/subdomains.txt"
         self.results = {
             'target': target,
             'timestamp': datetime.now().isoformat(),
             'dns_records': {},
             'subdomains': [],
+            'subdomain_records': {},
+            'dns_wildcards': {},
             'open_ports': [],
+            'host_ports': {},
             'http_headers': {},
+            'subdomain_http': {},
             'technologies': [],
             'whois_info': {},
-            'banners': {}
+            'banners': {},
+            'certificates': [],
+            'cache_stats': {},
+            'stage_timings': {},
+            'metrics': {},
+            'diff': {}
         }
+        self.journal = journal
+        self.sink = sink
+        if journal is not None and journal.resumed:
+            self._restore(journal.state)
+        if sink is not None:
+            if journal is not None and journal.resumed:
+                sink.emit_results(self.results)
+            else:
+                sink.emit('scan', target=target, timestamp=self.results['timestamp'])
+
+    def _restore(self, state):
+        """Rebuild ``self.results`` from a replayed checkpoint journal"""
+        for stage, results in state['stages'].items():
+            self.results.update(results)
+        # Banner ports come back from JSON as strings
+        self.results['banners'] = {int(port): banner
+                                   for port, banner in self.results['banners'].items()}
+        if 'subdomains' not in state['stages']:
+            self.results['subdomains'] = list(state['subdomains'])
+            self.results['subdomain_records'] = {name: AddressRecords.coerce(records)
+                                                 for name, records in state['subdomains'].items()}
+        # Ports probed by an unfinished scan are folded back in by port_scan,
+        # which knows which addresses belong to which host
+
+    def _checkpoint(self, entry):
+        if self.journal is not None:
+            self.journal.record(entry)
+
+    def _emit(self, event, **fields):
+        if self.sink is not None:
+            self.sink.emit(event, **fields)
 
     def print_banner(self):
         """Display tool banner"""
         banner = f"""
 {Colors.OKCYAN}
-╦═╗╔═╗╔═╗╔═╗╔╗╔  ╔╦╗╔═╗╔═╗╦  
-╠╦╝║╣ ║  ║ ║║║║   ║ ║ ║║ ║║  
+╦═╗╔═╗╔═╗╔═╗╔╗╔  ╔╦╗╔═╗╔═╗╦
+╠╦╝║╣ ║  ║ ║║║║   ║ ║ ║║ ║║
 ╩╚═╚═╝╚═╝╚═╝╝╚╝   ╩ ╚═╝╚═╝╩═╝
 {Colors.ENDC}
 {Colors.BOLD}Recon Automation Tool v1.0.0{Colors.ENDC}
@@ -75,37 +4136,121 @@ class ReconTool:
 """
         print(banner)
 
+    def dns_query(self, name, record_type):
+        """
+        Resolve ``name`` through the shared cache.
+
+        Returns:
+            list: Record values as text
+
+        Raises:
+            dns.resolver.NXDOMAIN: Name does not exist (possibly cached)
+            dns.resolver.NoAnswer: No records of this type (possibly cached)
+        """
+        import dns.resolver
+
+        found, value = self.cache.get(name, record_type)
+        if found:
+            if value is None:
+                raise dns.resolver.NXDOMAIN()
+            if not value:
+                raise dns.resolver.NoAnswer()
+            return value
+
+        try:
+            answers = dns.resolver.resolve(name, record_type)
+        except dns.resolver.NXDOMAIN as e:
+            ttls = [negative_ttl(r) for r in e.responses().values()]
+            self.cache.put(name, record_type, None,
+                           min((t for t in ttls if t is not None), default=None))
+            raise
+        except dns.resolver.NoAnswer as e:
+            self.cache.put(name, record_type, [], negative_ttl(e.response()))
+            raise
+        records = [str(rdata) for rdata in answers]
+        self.cache.put(name, record_type, records, answers.rrset.ttl)
+        return records
+
+    def resolve_host(self, name):
+        """
+        Resolve ``name`` to an IPv4 address, replacing socket.gethostbyname.
+
+        DNS answers come from the shared cache; names DNS cannot resolve
+        (e.g. /etc/hosts entries) fall back to the system resolver.
+
+        Raises:
+            socket.gaierror: The name cannot be resolved
+        """
+        try:
+            ipaddress.ip_address(name)
+            return name
+        except ValueError:
+            pass
+        try:
+            return self.dns_query(name, 'A')[0]
+        except Exception:
+            return socket.gethostbyname(name)
+
+    def resolve_addresses(self, name):
+        """
+        Resolve ``name`` to all of its IPv4 and IPv6 addresses.
+
+        Returns:
+            list: Normalised address strings, IPv4 first
+
+        Raises:
+            socket.gaierror: The name cannot be resolved
+        """
+        try:
+            return [ipaddress.ip_address(name).compressed]
+        except ValueError:
+            pass
+        addresses = []
+        for record_type in ('A', 'AAAA'):
+            try:
+                addresses += [ipaddress.ip_address(ip).compressed
+                              for ip in self.dns_query(name, record_type)]
+            except Exception:
+                pass
+        return addresses or [self.resolve_host(name)]
+
     def dns_lookup(self):
         """Perform comprehensive DNS lookups"""
         print(f"\n{Colors.HEADER}[*] Starting DNS Enumeration...{Colors.ENDC}")
-        
+        import dns.resolver
+
         record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'SOA', 'CNAME']
-        
+
         for record_type in record_types:
             try:
-                answers = dns.resolver.resolve(self.target, record_type)
-                records = [str(rdata) for rdata in answers]
+                with self.metrics.timer('dns_query_seconds', type=record_type):
+                    records = self.dns_query(self.target, record_type)
                 self.results['dns_records'][record_type] = records
-                
+                self._emit('dns', type=record_type, values=records)
+                self.metrics.inc('dns_lookups_total', type=record_type, result='answer')
+
                 print(f"{Colors.OKGREEN}[+] {record_type} Records:{Colors.ENDC}")
                 for record in records:
                     print(f"    {record}")
             except dns.resolver.NoAnswer:
+                self.metrics.inc('dns_lookups_total', type=record_type, result='noanswer')
                 print(f"{Colors.WARNING}[-] No {record_type} records found{Colors.ENDC}")
             except dns.resolver.NXDOMAIN:
+                self.metrics.inc('dns_lookups_total', type=record_type, result='nxdomain')
                 print(f"{Colors.FAIL}[!] Domain does not exist{Colors.ENDC}")
                 return
             except Exception as e:
+                self.metrics.inc('dns_lookups_total', type=record_type, result='error')
                 print(f"{Colors.WARNING}[-] Error querying {record_type}: {str(e)}{Colors.ENDC}")
 
         # PTR (Reverse DNS) lookup
         try:
-            ip = socket.gethostbyname(self.target)
+            ip = self.resolve_host(self.target)
             reversed_ip = '.'.join(reversed(ip.split('.')))
             ptr_query = f"{reversed_ip}.in-addr.arpa"
-            answers = dns.resolver.resolve(ptr_query, 'PTR')
-            ptr_records = [str(rdata) for rdata in answers]
+            ptr_records = self.dns_query(ptr_query, 'PTR')
             self.results['dns_records']['PTR'] = ptr_records
+            self._emit('dns', type='PTR', values=ptr_records)
             print(f"{Colors.OKGREEN}[+] PTR Records:{Colors.ENDC}")
             for record in ptr_records:
                 print(f"    {record}")
@@ -115,155 +4260,554 @@ class ReconTool:
     def subdomain_enumeration(self):
         """Enumerate subdomains using wordlist"""
         print(f"\n{Colors.HEADER}[*] Starting Subdomain Enumeration...{Colors.ENDC}")
-        
-        if not os.path.exists(self.wordlist):
-            print(f"{Colors.WARNING}[-] Wordlist not found: {self.wordlist}{Colors.ENDC}")
-            return
 
+        # Subdomains from the baseline are re-checked ahead of the sweep
+        known = []
+        if self.baseline is not None:
+            known = [name for name in self.baseline.get('subdomains', [])
+                     if name not in self.results['subdomain_records']]
+        known_names = set(known)
+
+        f = None
+        if not self.recheck_only:
+            if not os.path.exists(self.wordlist):
+                print(f"{Colors.WARNING}[-] Wordlist not found: {self.wordlist}{Colors.ENDC}")
+            else:
+                try:
+                    f = open(self.wordlist, 'rb')
+                except Exception as e:
+                    print(f"{Colors.FAIL}[!] Error reading wordlist: {str(e)}{Colors.ENDC}")
+            if f is None and not known:
+                return
+
+        start = 0
+        if self.journal is not None and self.journal.state['words']:
+            wordlist, offset = self.journal.state['words']
+            if wordlist == self.wordlist:
+                start = offset
+
+        # Lookups finish out of order, so the journalled offset only moves
+        # past lines whose lookups (and every earlier one) have completed
+        pending = OrderedDict()
+        finished = 0
+
+        def sweep(labels):
+            for label in labels:
+                name = f"{label}.{self.target}"
+                if name in known_names:
+                    continue
+                if self.journal is not None:
+                    pending[name] = [labels.offset, False]
+                yield name
+
+        def done(name):
+            nonlocal finished
+            if name not in pending:
+                return  # a re-checked baseline name
+            pending[name][1] = True
+            offset = None
+            while pending:
+                head = next(iter(pending.values()))
+                if not head[1]:
+                    break
+                offset = pending.popitem(last=False)[1][0]
+                finished += 1
+            if offset is not None and finished >= 1000:
+                finished = 0
+                self._checkpoint({'t': 'words', 'f': self.wordlist, 'o': offset})
+
+        resolver = AsyncResolver(nameservers=self.resolvers, timeout=self.timeout,
+                                 max_inflight=self.dns_inflight, cache=self.cache,
+                                 rate=self.rate, metrics=self.metrics)
+        if known:
+            print(f"{Colors.OKBLUE}[*] Re-checking {len(known)} subdomains from the "
+                  f"baseline{Colors.ENDC}")
+        labels = None
         try:
-            with open(self.wordlist, 'r') as f:
-                subdomains = [line.strip() for line in f if line.strip()]
-        except Exception as e:
-            print(f"{Colors.FAIL}[!] Error reading wordlist: {str(e)}{Colors.ENDC}")
-            return
+            if f is not None:
+                labels = WordlistStream(f, start=start)
+                print(f"{Colors.OKBLUE}[*] Streaming wordlist ({labels.size / 1048576:.1f} MB, "
+                      f"{resolver.max_inflight} lookups in flight)...{Colors.ENDC}")
+                if start:
+                    print(f"{Colors.OKBLUE}[*] Resuming wordlist at byte {start}{Colors.ENDC}")
+            names = itertools.chain(known, sweep(labels) if labels is not None else ())
+            stats = resolver.brute_force(names, self._add_subdomain,
+                                         done if self.journal is not None else None,
+                                         wildcard_zone=self.target)
+        finally:
+            if f is not None:
+                f.close()
+        self._record_wildcards(resolver)
+        skipped = ''
+        if labels is not None:
+            skipped = (f" ({labels.duplicates} duplicates skipped, {len(labels.suspects)} "
+                       f"possible duplicates re-tested)")
+        print(f"{Colors.OKBLUE}[*] Tested {stats['names']} subdomains{skipped}{Colors.ENDC}")
+        print(f"{Colors.OKBLUE}[*] {stats['queries']} queries in {stats['elapsed']:.2f}s "
+              f"({stats['qps']:.0f} queries/s, {stats['timeouts']} timeouts, "
+              f"{stats['tcp_fallbacks']} TCP fallbacks){Colors.ENDC}")
+
+        print(f"\n{Colors.OKGREEN}[+] Total subdomains found: "
+              f"{len(self.results['subdomains'])}{Colors.ENDC}")
+
+    def _record_wildcards(self, resolver):
+        """
+        Add the wildcard zones a brute force detected to the results; a zone
+        seen again by a later run (permutation rounds) adds its filtered and
+        skipped counts to the entry and its answers to the set
+        """
+        for zone, wildcard in resolver.wildcards.items():
+            entry = self.results['dns_wildcards'].get(zone)
+            if entry is not None:
+                if wildcard['filtered'] or wildcard['skipped']:
+                    entry['answers'] = sorted(set(entry['answers']) | wildcard['answers'])
+                    entry['filtered'] += wildcard['filtered']
+                    entry['skipped'] += wildcard['skipped']
+                    self._emit('wildcard', zone=zone, **entry)
+                continue
+            answers = sorted(wildcard['answers'])
+            entry = {'answers': answers, 'filtered': wildcard['filtered'],
+                     'skipped': wildcard['skipped']}
+            self.results['dns_wildcards'][zone] = entry
+            self._emit('wildcard', zone=zone, **entry)
+            if wildcard['stable']:
+                print(f"{Colors.WARNING}[!] Wildcard DNS on *.{zone} ({', '.join(answers[:3])}"
+                      f"{' ...' if len(answers) > 3 else ''}): {wildcard['filtered']} matching "
+                      f"names filtered{Colors.ENDC}")
+            else:
+                print(f"{Colors.WARNING}[!] Wildcard DNS on *.{zone} answers differently for "
+                      f"every name: skipped {wildcard['skipped']} names{Colors.ENDC}")
+
+    def _add_subdomain(self, name, records, source=None):
+        """Record a resolved subdomain (once) and report it"""
+        if name in self.results['subdomain_records']:
+            return  # already found before a resume, or by another stage
+        self.results['subdomains'].append(name)
+        self.results['subdomain_records'][name] = records
+        self._checkpoint({'t': 'sub', 'n': name, 'r': records})
+        self._emit('subdomain', name=name, records=records)
+        addresses = ', '.join(records['A'] + records['AAAA'] + records['CNAME'])
+        print(f"{Colors.OKGREEN}[+] Found: {name} ({addresses})"
+              f"{f' [{source}]' if source else ''}{Colors.ENDC}")
+
+    def subdomain_permutation(self):
+        """
+        Resolve permutations of the found subdomains, then of the names
+        those turn up, for up to ``permute_depth`` rounds
+        """
+        print(f"\n{Colors.HEADER}[*] Starting Subdomain Permutation...{Colors.ENDC}")
+        seeds = list(self.results['subdomains'])
 
-        print(f"{Colors.OKBLUE}[*] Testing {len(subdomains)} subdomains...{Colors.ENDC}")
-        
-        found_subdomains = []
-        
-        def check_subdomain(subdomain):
-            full_domain = f"{subdomain}.{self.target}"
+        labels = None
+        if not self.recheck_only and os.path.exists(self.wordlist):
             try:
-                socket.gethostbyname(full_domain)
-                return full_domain
-            except socket.gaierror:
-                return None
+                f = open(self.wordlist, 'rb')
+            except OSError:
+                f = None
+            if f is not None:
+                labels = WordlistStream(f)
+        capacity = self.permute_limit + len(seeds)
+        if labels is not None:
+            capacity += labels.estimated_lines
+        generator = PermutationGenerator(self.target, capacity=capacity)
+        for name in seeds:
+            generator.exclude(name)
+            generator.learn(name)
+        # Names the wordlist sweep already asked for
+        if labels is not None:
+            with labels.file:
+                for label in labels:
+                    generator.exclude(f"{label}.{self.target}")
 
-        with ThreadPoolExecutor(max_workers=self.threads) as executor:
-            futures = {executor.submit(check_subdomain, sub): sub for sub in subdomains}
-            
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    found_subdomains.append(result)
-                    print(f"{Colors.OKGREEN}[+] Found: {result}{Colors.ENDC}")
+        resolver = AsyncResolver(nameservers=self.resolvers, timeout=self.timeout,
+                                 max_inflight=self.dns_inflight, cache=self.cache,
+                                 rate=self.rate, metrics=self.metrics)
+        found = 0
+        for depth in range(1, self.permute_depth + 1):
+            remaining = self.permute_limit - generator.generated
+            if not seeds or remaining <= 0:
+                break
+            hits = []
+
+            def hit(name, records):
+                hits.append(name)
+                generator.learn(name)
+                self._add_subdomain(name, records, source='permutation')
 
-        self.results['subdomains'] = found_subdomains
-        print(f"\n{Colors.OKGREEN}[+] Total subdomains found: {len(found_subdomains)}{Colors.ENDC}")
+            tried, queries = generator.generated, resolver.stats['queries']
+            stats = resolver.brute_force(itertools.islice(generator.candidates(seeds), remaining),
+                                         hit, wildcard_zone=self.target)
+            self._record_wildcards(resolver)
+            print(f"{Colors.OKBLUE}[*] Round {depth}: {generator.generated - tried} permutations "
+                  f"of {len(seeds)} names, {len(hits)} found ({stats['queries'] - queries} "
+                  f"queries in {stats['elapsed']:.2f}s){Colors.ENDC}")
+            found += len(hits)
+            seeds = hits
+
+        if generator.generated >= self.permute_limit:
+            print(f"{Colors.WARNING}[!] Stopped at the permutation limit "
+                  f"({self.permute_limit}){Colors.ENDC}")
+        print(f"\n{Colors.OKGREEN}[+] Subdomains found by permutation: {found}{Colors.ENDC}")
 
     def port_scan(self):
-        """Scan common ports on target"""
+        """
+        Scan ports on the target, or with ``scan_subdomains`` on every
+        address of the target and its discovered subdomains.
+
+        Addresses shared by several names are scanned once; probes are
+        ordered port by port across addresses, so no single host sees a
+        burst. Open ports are mapped back to every name on the address.
+        """
         print(f"\n{Colors.HEADER}[*] Starting Port Scan...{Colors.ENDC}")
-        
-        try:
-            target_ip = socket.gethostbyname(self.target)
-            print(f"{Colors.OKBLUE}[*] Target IP: {target_ip}{Colors.ENDC}")
-        except socket.gaierror:
+
+        hosts = self._scan_hosts()
+        if self.target not in hosts:
             print(f"{Colors.FAIL}[!] Could not resolve hostname{Colors.ENDC}")
-            return
+            if not hosts:
+                return
+        elif not self.scan_subdomains:
+            print(f"{Colors.OKBLUE}[*] Target IP: {hosts[self.target][0]}{Colors.ENDC}")
+
+        # Address -> every name that resolves to it
+        ip_hosts = {}
+        for name, addresses in hosts.items():
+            for ip in addresses:
+                names = ip_hosts.setdefault(ip, [])
+                if name not in names:
+                    names.append(name)
+        target_ips = set(hosts.get(self.target, ()))
+        ips = list(ip_hosts)
+        multi = self.scan_subdomains
+        if multi:
+            print(f"{Colors.OKBLUE}[*] {len(hosts)} hosts share {len(ips)} unique "
+                  f"addresses{Colors.ENDC}")
 
         open_ports = []
+        target_ports = set()
+        endpoints = {}
 
-        def scan_port(port):
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(self.timeout)
-                result = sock.connect_ex((target_ip, port))
-                sock.close()
-                
-                if result == 0:
-                    try:
-                        service = socket.getservbyport(port)
-                    except:
-                        service = "unknown"
-                    return {'port': port, 'service': service}
-            except Exception as e:
-                pass
-            return None
+        def found(ip, port):
+            if (ip, port) in endpoints:
+                return
+            service = endpoints[(ip, port)] = service_name(port)
+            if ip in target_ips and port not in target_ports:
+                target_ports.add(port)
+                open_ports.append(PortRecord(port, service))
+                self._emit('port', port=port, service=service)
+            if multi:
+                names = ip_hosts[ip]
+                shown = ', '.join(names[:3]) + (f" +{len(names) - 3}" if len(names) > 3 else '')
+                print(f"{Colors.OKGREEN}[+] {ip} port {port} ({service}) - OPEN "
+                      f"[{shown}]{Colors.ENDC}")
+            else:
+                print(f"{Colors.OKGREEN}[+] Port {port} ({service}) - OPEN{Colors.ENDC}")
 
-        with ThreadPoolExecutor(max_workers=self.threads) as executor:
-            futures = {executor.submit(scan_port, port): port for port in self.ports}
-            
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    open_ports.append(result)
-                    print(f"{Colors.OKGREEN}[+] Port {result['port']} ({result['service']}) - OPEN{Colors.ENDC}")
+        # Ports the baseline found open are re-checked ahead of the sweep
+        known = self._baseline_ports(ip_hosts, target_ips)
+        known_pairs = set(known)
+
+        probed = self.journal.state['ports'] if self.journal is not None else {}
+        skipped = 0
+        for (ip, port), state in probed.items():
+            if ip in ip_hosts:
+                skipped += 1
+                if state == ConnectScanner.OPEN:
+                    found(ip, port)
+        if skipped:
+            print(f"{Colors.OKBLUE}[*] Skipping {skipped} ports "
+                  f"probed before the interruption{Colors.ENDC}")
+
+        def targets():
+            for pair in known:
+                if pair not in probed:
+                    yield pair
+            if self.recheck_only:
+                return
+            for port in self.ports:
+                for ip in ips:
+                    if (ip, port) not in probed and (ip, port) not in known_pairs:
+                        yield ip, port
+
+        def record(ip, port, state):
+            self._checkpoint({'t': 'port', 'i': ip, 'p': port, 's': state})
+            if state == ConnectScanner.OPEN:
+                found(ip, port)
+
+        scanner = ConnectScanner(timeout=self.timeout, max_inflight=self.max_inflight,
+                                 adaptive=self.adaptive, rate=self.rate, rtts=self.rtts,
+                                 metrics=self.metrics)
+        rechecks = sum(1 for pair in known if pair not in probed)
+        if self.recheck_only:
+            total = rechecks
+        else:
+            total = (len(ips) * len(self.ports) - skipped
+                     + sum(1 for ip, port in known
+                           if port not in self.ports and (ip, port) not in probed))
+        if known:
+            print(f"{Colors.OKBLUE}[*] Re-checking {rechecks} ports open in the "
+                  f"baseline{Colors.ENDC}")
+        print(f"{Colors.OKBLUE}[*] Scanning {total} ports "
+              f"({scanner.max_inflight} connects in flight)...{Colors.ENDC}")
+        stats = scanner.scan(targets(), record)
+
+        open_ports.sort(key=lambda p: p['port'])
+        print(f"{Colors.OKBLUE}[*] Probed {stats['probed']} ports in {stats['elapsed']:.2f}s "
+              f"({stats['rate']:.0f} ports/s, {stats['filtered']} filtered){Colors.ENDC}")
+        if self.adaptive:
+            print(f"{Colors.OKBLUE}[*] Timeout {stats['rto'] * 1000:.0f}ms, window "
+                  f"{stats['window']}, {stats['losses']} losses in "
+                  f"{stats['retries']} retries{Colors.ENDC}")
 
         self.results['open_ports'] = open_ports
-        print(f"\n{Colors.OKGREEN}[+] Total open ports: {len(open_ports)}{Colors.ENDC}")
+        if multi:
+            host_ports = {}
+            # One record per address and port, shared by every name on the address
+            ip_ports = {}
+            for ip, port in sorted(endpoints, key=lambda pair: pair[1]):
+                ip_ports.setdefault(ip, []).append(EndpointRecord(ip, port, endpoints[(ip, port)]))
+            for name, addresses in hosts.items():
+                ports = [record for ip in addresses for record in ip_ports.get(ip, ())]
+                if ports:
+                    host_ports[name] = ports
+            self.results['host_ports'] = host_ports
+            for name, ports in host_ports.items():
+                self._emit('host_ports', host=name, ports=ports)
+            print(f"\n{Colors.OKGREEN}[+] Open ports: {len(endpoints)} on "
+                  f"{len({ip for ip, _ in endpoints})} addresses, "
+                  f"{len(host_ports)} hosts{Colors.ENDC}")
+        else:
+            print(f"\n{Colors.OKGREEN}[+] Total open ports: {len(open_ports)}{Colors.ENDC}")
+
+    def _baseline_ports(self, ip_hosts, target_ips):
+        """
+        (ip, port) pairs the baseline reported open on addresses being
+        scanned now, in port order. The target's ports are matched to its
+        current addresses, so they are re-checked even if it has moved.
+        """
+        if self.baseline is None:
+            return []
+        pairs = {(ip, entry['port']) for ip in target_ips
+                 for entry in self.baseline.get('open_ports', [])}
+        for entries in self.baseline.get('host_ports', {}).values():
+            for entry in entries:
+                ip = ipaddress.ip_address(entry['ip']).compressed
+                if ip in ip_hosts:
+                    pairs.add((ip, entry['port']))
+        return sorted(pairs, key=lambda pair: (pair[1], pair[0]))
+
+    def _scan_hosts(self):
+        """
+        Map each host to port scan onto its addresses.
+
+        Without ``scan_subdomains`` this is just the target's IPv4 address;
+        with it, every A and AAAA address of the target and of each
+        discovered subdomain, normalised so equal addresses compare equal.
+        """
+        hosts = {}
+        try:
+            if self.scan_subdomains:
+                hosts[self.target] = self.resolve_addresses(self.target)
+            else:
+                hosts[self.target] = [self.resolve_host(self.target)]
+        except socket.gaierror:
+            pass
+        if self.scan_subdomains:
+            for name in self.results['subdomains']:
+                records = self.results['subdomain_records'].get(name) or {}
+                addresses = [ipaddress.ip_address(ip).compressed
+                             for ip in records.get('A', []) + records.get('AAAA', [])]
+                if addresses:
+                    hosts[name] = addresses
+        return hosts
 
     def banner_grabbing(self):
         """Grab banners from open ports"""
         print(f"\n{Colors.HEADER}[*] Starting Banner Grabbing...{Colors.ENDC}")
-        
+
         if not self.results['open_ports']:
             print(f"{Colors.WARNING}[-] No open ports to grab banners from{Colors.ENDC}")
             return
 
         try:
-            target_ip = socket.gethostbyname(self.target)
+            target_ip = self.resolve_host(self.target)
         except socket.gaierror:
             return
 
-        for port_info in self.results['open_ports']:
-            port = port_info['port']
+        def record(port, probe, banner):
+            self._emit('banner', port=port, banner=banner)
+            print(f"{Colors.OKGREEN}[+] Port {port} Banner ({probe}):{Colors.ENDC}")
+            print(f"    {banner[:200]}...")
+
+        ports = [port_info['port'] for port_info in self.results['open_ports']]
+        grabber = BannerGrabber(timeout=self.timeout, concurrency=self.banner_workers,
+                                adaptive=self.adaptive, rate=self.rate,
+                                rtt=self.rtts.get(target_ip), metrics=self.metrics)
+        start = time.perf_counter()
+        banners = grabber.grab(target_ip, ports, host=self.target, on_result=record)
+        self.results['banners'] = {port: banners[port] for port in ports if port in banners}
+        print(f"{Colors.OKBLUE}[*] Collected {len(banners)} banners from {len(ports)} ports "
+              f"in {time.perf_counter() - start:.2f}s{Colors.ENDC}")
+
+    def certificate_harvest(self):
+        """
+        Collect TLS certificates from the open ports known to speak TLS
+        (by their probe or banner; every open port with ``certs_all_ports``)
+        and add the names they list under the target to the subdomains
+        """
+        print(f"\n{Colors.HEADER}[*] Harvesting TLS Certificates...{Colors.ENDC}")
+        try:
+            import cryptography.x509  # noqa: F401
+        except ImportError:
+            print(f"{Colors.WARNING}[-] The cryptography package is needed to read "
+                  f"certificates (pip3 install cryptography){Colors.ENDC}")
+            return
+
+        endpoints = []
+        if self.results['host_ports']:
+            for host, ports in self.results['host_ports'].items():
+                endpoints.extend((p['ip'], p['port'], host) for p in ports)
+        elif self.results['open_ports']:
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(self.timeout)
-                sock.connect((target_ip, port))
-                
-                # Send HTTP request for web ports
-                if port in [80, 443, 8080, 8443]:
-                    sock.send(b"GET / HTTP/1.1\r\nHost: " + self.target.encode() + b"\r\n\r\n")
-                
-                banner = sock.recv(1024).decode('utf-8', errors='ignore').strip()
-                sock.close()
-                
-                if banner:
-                    self.results['banners'][port] = banner
-                    print(f"{Colors.OKGREEN}[+] Port {port} Banner:{Colors.ENDC}")
-                    print(f"    {banner[:200]}...")
-            except Exception as e:
-                pass
+                target_ip = self.resolve_host(self.target)
+            except socket.gaierror:
+                return
+            endpoints.extend((target_ip, p['port'], self.target)
+                             for p in self.results['open_ports'])
+        # Banners were grabbed from the target's address only
+        banners = self.results['banners']
+        tls = [endpoint for endpoint in endpoints if BannerGrabber.speaks_tls(
+            endpoint[1], banners.get(endpoint[1], '') if endpoint[2] == self.target else '')]
+        if self.certs_all_ports:
+            # Ports known to speak TLS go first; the rest are tried as well
+            known = set(tls)
+            endpoints = tls + [endpoint for endpoint in endpoints if endpoint not in known]
+        else:
+            if len(tls) < len(endpoints):
+                print(f"{Colors.OKBLUE}[*] Skipping {len(endpoints) - len(tls)} open ports not "
+                      f"known to speak TLS (--certs-all-ports tries them){Colors.ENDC}")
+            endpoints = tls
+        if not endpoints:
+            print(f"{Colors.WARNING}[-] No TLS ports to handshake with{Colors.ENDC}")
+            return
+
+        candidates = []
+
+        def record(cert):
+            print(f"{Colors.OKGREEN}[+] Certificate {cert['subject']} (issuer {cert['issuer']}, "
+                  f"expires {cert['not_after'][:10]}){Colors.ENDC}")
+            names = cert['names']
+            if names:
+                print(f"    {', '.join(names[:10])}"
+                      f"{f' +{len(names) - 10} more' if len(names) > 10 else ''}")
+            candidates.extend(cert['names'])
+
+        harvester = CertificateHarvester(timeout=self.timeout, concurrency=self.banner_workers,
+                                         rate=self.rate, metrics=self.metrics)
+        start = time.perf_counter()
+        certificates = harvester.harvest(endpoints, on_certificate=record)
+        self.results['certificates'] = certificates
+        for cert in certificates:
+            self._emit('certificate', **cert)
+        print(f"{Colors.OKBLUE}[*] {len(certificates)} distinct certificates from "
+              f"{len(endpoints)} endpoints in {time.perf_counter() - start:.2f}s{Colors.ENDC}")
+
+        # Wildcard entries name a zone, not a host
+        suffix = '.' + self.target
+        names = [name for name in dict.fromkeys(candidates)
+                 if name.endswith(suffix) and not name.startswith('*.')
+                 and name not in self.results['subdomain_records']]
+        if not names:
+            return
+        print(f"{Colors.OKBLUE}[*] Resolving {len(names)} new names from certificates{Colors.ENDC}")
+        resolver = AsyncResolver(nameservers=self.resolvers, timeout=self.timeout,
+                                 max_inflight=self.dns_inflight, cache=self.cache,
+                                 rate=self.rate, metrics=self.metrics)
+        resolver.brute_force(names, functools.partial(self._add_subdomain, source='certificate'))
 
     def http_headers(self):
         """Retrieve HTTP/HTTPS headers"""
         print(f"\n{Colors.HEADER}[*] Retrieving HTTP Headers...{Colors.ENDC}")
-        
+        import requests
+
         protocols = ['http', 'https']
-        
+
         for protocol in protocols:
             url = f"{protocol}://{self.target}"
             try:
-                response = requests.get(url, timeout=self.timeout, verify=False, allow_redirects=True)
+                response = self.http.fetch(url)
                 self.results['http_headers'][protocol] = dict(response.headers)
-                
+                self._emit('http', protocol=protocol,
+                           headers=self.results['http_headers'][protocol])
+
+                if response.not_modified:
+                    print(f"{Colors.OKBLUE}[*] {url} not modified since the baseline{Colors.ENDC}")
                 print(f"{Colors.OKGREEN}[+] {protocol.upper()} Headers:{Colors.ENDC}")
                 for key, value in response.headers.items():
                     print(f"    {key}: {value}")
-                
+
                 # Check for security headers
-                security_headers = ['Strict-Transport-Security', 'X-Frame-Options', 
-                                  'X-Content-Type-Options', 'Content-Security-Policy']
+                security_headers = ['Strict-Transport-Security', 'X-Frame-Options',
+                                    'X-Content-Type-Options', 'Content-Security-Policy']
                 missing_headers = [h for h in security_headers if h not in response.headers]
-                
+
                 if missing_headers:
-                    print(f"{Colors.WARNING}[!] Missing security headers: {', '.join(missing_headers)}{Colors.ENDC}")
-                    
+                    print(f"{Colors.WARNING}[!] Missing security headers: "
+                          f"{', '.join(missing_headers)}{Colors.ENDC}")
+
             except requests.exceptions.SSLError:
                 print(f"{Colors.WARNING}[-] SSL Error for {protocol}://{self.target}{Colors.ENDC}")
             except requests.exceptions.ConnectionError:
-                print(f"{Colors.WARNING}[-] Connection failed for {protocol}://{self.target}{Colors.ENDC}")
+                print(f"{Colors.WARNING}[-] Connection failed for {protocol}://{self.target}"
+                      f"{Colors.ENDC}")
             except Exception as e:
-                print(f"{Colors.WARNING}[-] Error accessing {protocol}://{self.target}: {str(e)}{Colors.ENDC}")
+                print(f"{Colors.WARNING}[-] Error accessing {protocol}://{self.target}: "
+                      f"{str(e)}{Colors.ENDC}")
+
+    def subdomain_http_probe(self):
+        """Fetch HTTP and HTTPS from every discovered subdomain concurrently"""
+        print(f"\n{Colors.HEADER}[*] Probing Subdomains over HTTP/HTTPS...{Colors.ENDC}")
+
+        hosts = list(self.results['subdomains'])
+        if not hosts:
+            print(f"{Colors.WARNING}[-] No subdomains to probe{Colors.ENDC}")
+            return
+
+        def probe(host, protocol):
+            try:
+                response = self.http.fetch(f"{protocol}://{host}")
+            except Exception:
+                return host, protocol, None
+            return host, protocol, {
+                'status': response.status_code,
+                'url': response.url,
+                'server': response.headers.get('Server'),
+            }
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            jobs = [executor.submit(probe, host, protocol)
+                    for host in hosts for protocol in ('http', 'https')]
+            for job in jobs:
+                host, protocol, info = job.result()
+                if info is not None:
+                    self.results['subdomain_http'].setdefault(host, {})[protocol] = info
+                    print(f"{Colors.OKGREEN}[+] {protocol}://{host} - {info['status']}"
+                          f"{' (' + info['server'] + ')' if info['server'] else ''}{Colors.ENDC}")
+                # Jobs are ordered http, https per host
+                if protocol == 'https' and host in self.results['subdomain_http']:
+                    self._emit('subdomain_http', host=host,
+                               protocols=self.results['subdomain_http'][host])
+
+        print(f"\n{Colors.OKGREEN}[+] Hosts answering HTTP(S): "
+              f"{len(self.results['subdomain_http'])}/{len(hosts)}{Colors.ENDC}")
 
     def technology_detection(self):
         """Detect web technologies"""
         print(f"\n{Colors.HEADER}[*] Detecting Technologies...{Colors.ENDC}")
-        
+
         technologies = []
-        
+
         # Check from HTTP headers
         for protocol, headers in self.results['http_headers'].items():
             if 'Server' in headers:
@@ -273,32 +4817,28 @@ class ReconTool:
             if 'X-AspNet-Version' in headers:
                 technologies.append(f"ASP.NET: {headers['X-AspNet-Version']}")
 
+            with self.metrics.timer('fingerprint_seconds', part='headers'):
+                technologies.extend(self.fingerprints.match_headers(headers))
+
         # Try to detect from page content
         try:
-            response = requests.get(f"http://{self.target}", timeout=self.timeout, verify=False)
-            content = response.text.lower()
-            
-            # Common technology patterns
-            tech_patterns = {
-                'WordPress': r'wp-content|wordpress',
-                'Joomla': r'joomla',
-                'Drupal': r'drupal',
-                'React': r'react',
-                'Angular': r'ng-|angular',
-                'Vue.js': r'vue\.js|__vue',
-                'jQuery': r'jquery',
-                'Bootstrap': r'bootstrap',
-                'PHP': r'\.php',
-            }
-            
-            for tech, pattern in tech_patterns.items():
-                if re.search(pattern, content):
-                    technologies.append(tech)
-        except:
+            response = self.http.fetch(f"http://{self.target}")
+            if response.not_modified:
+                # Same page as in the baseline (and no body to match): keep its findings
+                technologies.extend(self.baseline.get('technologies', []))
+            else:
+                with self.metrics.timer('fingerprint_seconds', part='headers'):
+                    technologies.extend(self.fingerprints.match_headers(response.headers))
+                with self.metrics.timer('fingerprint_seconds', part='body'):
+                    technologies.extend(self.fingerprints.match_body(response.body))
+        except Exception:
             pass
 
-        self.results['technologies'] = list(set(technologies))
-        
+        technologies = sorted(set(technologies))
+        self.results['technologies'] = technologies
+        for tech in technologies:
+            self._emit('technology', name=tech)
+
         if technologies:
             print(f"{Colors.OKGREEN}[+] Detected Technologies:{Colors.ENDC}")
             for tech in technologies:
@@ -307,170 +4847,173 @@ class ReconTool:
             print(f"{Colors.WARNING}[-] No technologies detected{Colors.ENDC}")
 
     def whois_lookup(self):
-        """Perform WHOIS lookup"""
+        """Perform WHOIS lookup of the target's registrable domain"""
         print(f"\n{Colors.HEADER}[*] Performing WHOIS Lookup...{Colors.ENDC}")
-        
-        try:
-            w = whois.whois(self.target)
-            
-            # Extract relevant information
-            whois_data = {
-                'registrar': w.registrar,
-                'creation_date': str(w.creation_date),
-                'expiration_date': str(w.expiration_date),
-                'name_servers': w.name_servers,
-                'status': w.status,
-                'emails': w.emails,
-                'country': w.country
-            }
-            
+        try:
+            queries = sum(self.whois.queries.values())
+            with self.metrics.timer('whois_seconds'):
+                whois_data = self.whois.lookup(self.target)
+            # Counts queries by concurrent scans too, which only hides the note
+            cached = sum(self.whois.queries.values()) == queries
+
             self.results['whois_info'] = whois_data
-            
-            print(f"{Colors.OKGREEN}[+] WHOIS Information:{Colors.ENDC}")
+            self._emit('whois', info=whois_data)
+
+            print(f"{Colors.OKGREEN}[+] WHOIS Information ({whois_data['domain']}"
+                  f"{', cached' if cached else ''}):{Colors.ENDC}")
             for key, value in whois_data.items():
-                if value:
+                if value and key != 'domain':
                     print(f"    {key}: {value}")
-                    
+
         except Exception as e:
             print(f"{Colors.WARNING}[-] WHOIS lookup failed: {str(e)}{Colors.ENDC}")
 
+    def _print_stage_timings(self):
+        timings = self.results['stage_timings']
+        stages = {k: v for k, v in timings.items() if k != 'total'}
+        if not stages:
+            return
+        print(f"\n{Colors.OKBLUE}[*] Stage timings:{Colors.ENDC}")
+        for name, elapsed in sorted(stages.items(), key=lambda item: -item[1]):
+            print(f"    {name:<12} {elapsed:8.2f}s")
+        print(f"    {'wall clock':<12} {timings['total']:8.2f}s "
+              f"(sequential sum {sum(stages.values()):.2f}s)")
+
+    def _print_diff(self):
+        diff = self.results['diff']
+        if not diff:
+            return
+        print(f"\n{Colors.HEADER}[*] Changes since {diff['since']}: {diff['changes']}{Colors.ENDC}")
+        colors = {'+': Colors.OKGREEN, '-': Colors.FAIL, '~': Colors.WARNING}
+        for line in diff_lines(diff):
+            print(f"    {colors[line[0]]}{line}{Colors.ENDC}")
+
     def generate_report(self, output_format='text'):
         """Generate reconnaissance report"""
         print(f"\n{Colors.HEADER}[*] Generating Report...{Colors.ENDC}")
-        
+
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         base_filename = f"reports/recon_{self.target}_{timestamp}"
-        
+
         # Ensure reports directory exists
         os.makedirs('reports', exist_ok=True)
-        
-        if output_format == 'json':
-            filename = f"{base_filename}.json"
-            with open(filename, 'w') as f:
-                json.dump(self.results, f, indent=4)
-            print(f"{Colors.OKGREEN}[+] JSON report saved: {filename}{Colors.ENDC}")
-        
-        elif output_format == 'html':
-            filename = f"{base_filename}.html"
-            html_content = self._generate_html_report()
-            with open(filename, 'w') as f:
-                f.write(html_content)
-            print(f"{Colors.OKGREEN}[+] HTML report saved: {filename}{Colors.ENDC}")
-        
-        else:  # text format
-            filename = f"{base_filename}.txt"
-            with open(filename, 'w') as f:
-                f.write(f"Reconnaissance Report\n")
-                f.write(f"Target: {self.target}\n")
-                f.write(f"Timestamp: {self.results['timestamp']}\n")
-                f.write("=" * 60 + "\n\n")
-                
-                # DNS Records
-                f.write("DNS RECORDS\n")
-                f.write("-" * 60 + "\n")
-                for record_type, records in self.results['dns_records'].items():
-                    f.write(f"{record_type}: {', '.join(records)}\n")
-                f.write("\n")
-                
-                # Subdomains
-                f.write("SUBDOMAINS\n")
-                f.write("-" * 60 + "\n")
-                for subdomain in self.results['subdomains']:
-                    f.write(f"{subdomain}\n")
-                f.write("\n")
-                
-                # Open Ports
-                f.write("OPEN PORTS\n")
-                f.write("-" * 60 + "\n")
-                for port in self.results['open_ports']:
-                    f.write(f"Port {port['port']} ({port['service']})\n")
-                f.write("\n")
-                
-                # Technologies
-                f.write("TECHNOLOGIES\n")
-                f.write("-" * 60 + "\n")
-                for tech in self.results['technologies']:
-                    f.write(f"{tech}\n")
-                
-            print(f"{Colors.OKGREEN}[+] Text report saved: {filename}{Colors.ENDC}")
-
-    def _generate_html_report(self):
-        """Generate HTML report"""
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Recon Report - {self.target}</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; background: #f4f4f4; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 20px; }}
-        h1 {{ color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }}
-        h2 {{ color: #4CAF50; margin-top: 30px; }}
-        .info {{ background: #e8f5e9; padding: 15px; border-left: 4px solid #4CAF50; margin: 10px 0; }}
-        .warning {{ background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 10px 0; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 15px 0; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        th {{ background: #4CAF50; color: white; }}
-        .port {{ display: inline-block; background: #4CAF50; color: white; padding: 5px 10px; margin: 5px; border-radius: 3px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Reconnaissance Report</h1>
-        <div class="info">
-            <strong>Target:</strong> {self.target}<br>
-            <strong>Scan Date:</strong> {self.results['timestamp']}<br>
-        </div>
-        
-        <h2>DNS Records</h2>
-        <table>
-            <tr><th>Record Type</th><th>Values</th></tr>
-"""
-        
-        for record_type, records in self.results['dns_records'].items():
-            html += f"<tr><td>{record_type}</td><td>{', '.join(records)}</td></tr>\n"
-        
-        html += """
-        </table>
-        
-        <h2>Subdomains</h2>
-        <div class="info">
-"""
-        for subdomain in self.results['subdomains']:
-            html += f"{subdomain}<br>\n"
-        
-        html += """
-        </div>
-        
-        <h2>Open Ports</h2>
-        <div>
-"""
-        for port in self.results['open_ports']:
-            html += f'<span class="port">{port["port"]} ({port["service"]})</span>\n'
-        
-        html += """
-        </div>
-        
-        <h2>Technologies</h2>
-        <div class="info">
-"""
-        for tech in self.results['technologies']:
-            html += f"{tech}<br>\n"
-        
-        html += """
-        </div>
-    </div>
-</body>
-</html>
-"""
-        return html
 
-    def run(self, enable_dns=True, enable_subdomains=True, enable_ports=True, 
-            enable_banners=True, enable_http=True, enable_tech=True, 
-            enable_whois=True, report_format='text'):
+        sink = self.sink
+        if sink is None:
+            # No live stream (library use): write one from the results
+            sink = ResultSink(f"{base_filename}.ndjson")
+            sink.emit_results(self.results)
+            sink.close()
+
+        if output_format not in ('json', 'html'):
+            output_format = 'text'
+        extension, label = {'json': ('json', 'JSON'), 'html': ('html', 'HTML'),
+                            'text': ('txt', 'Text')}[output_format]
+        filename = f"{base_filename}.{extension}"
+        ReportRenderer(sink.path).render(filename, output_format)
+        print(f"{Colors.OKGREEN}[+] {label} report saved: {filename}{Colors.ENDC}")
+        print(f"{Colors.OKBLUE}[*] Findings stream: {sink.path}{Colors.ENDC}")
+
+    def execute(self, enable_dns=True, enable_subdomains=True, enable_ports=True,
+                enable_banners=True, enable_http=True, enable_tech=True, enable_whois=True,
+                enable_certs=True):
+        """
+        Run the enabled stages and return the results, without the banner,
+        report or exit handling of ``run``
+
+        Records are compact while the stages run; the results handed back
+        hold plain dicts and lists, so ``json.dumps`` works on them as is.
+
+        Returns:
+            dict: ``self.results``
+        """
+        scheduler = StageScheduler()
+        finished = self.journal.state['stages'] if self.journal is not None else {}
+        if self.journal is not None and self.journal.resumed:
+            state = self.journal.state
+            print(f"{Colors.OKBLUE}[*] Resuming from {self.journal.path}: "
+                  f"{len(finished)} stages done ({', '.join(finished) or 'none'}), "
+                  f"{len(state['ports'])} ports probed, "
+                  f"{len(state['subdomains'])} subdomains found{Colors.ENDC}")
+
+        enabled = set()
+
+        def add(name, func, **kwargs):
+            enabled.add(name)
+            # Stages finished before an interruption are restored, not rerun
+            if name in finished:
+                return
+            if self.metrics.enabled or self.profiler is not None:
+                func = self._instrumented(name, func)
+            if self.journal is not None:
+                func = self._journalled(name, func)
+            scheduler.add(name, func, **kwargs)
+
+        if enable_dns:
+            add('dns', self.dns_lookup)
+        if enable_subdomains:
+            add('subdomains', self.subdomain_enumeration)
+        if enable_subdomains and self.permute_depth and not self.recheck_only:
+            add('permutations', self.subdomain_permutation, depends_on=['subdomains'],
+                condition=lambda: bool(self.results['subdomains']))
+        if enable_ports:
+            add('ports', self.port_scan,
+                depends_on=['subdomains', 'permutations'] if self.scan_subdomains else ())
+        if enable_banners:
+            add('banners', self.banner_grabbing, depends_on=['ports'],
+                condition=lambda: bool(self.results['open_ports']))
+        if enable_certs:
+            add('certs', self.certificate_harvest, depends_on=['ports', 'banners'],
+                condition=lambda: bool(self.results['open_ports'] or self.results['host_ports']))
+        if enable_http:
+            add('http', self.http_headers)
+        if enable_http and self.probe_subdomains:
+            add('http_hosts', self.subdomain_http_probe, depends_on=['subdomains', 'permutations'])
+        if enable_tech:
+            add('tech', self.technology_detection, depends_on=['http'])
+        if enable_whois:
+            add('whois', self.whois_lookup)
+
+        start = time.perf_counter()
+        self.results['stage_timings'] = scheduler.run()
+        self.results['stage_timings']['total'] = round(time.perf_counter() - start, 3)
+        self.results['cache_stats'] = self.cache.stats()
+        if self.baseline is not None:
+            self.results['diff'] = diff_results(
+                self.baseline, self.results,
+                [key for key, stage in DIFF_SECTIONS.items() if stage in enabled])
+            self._emit('diff', diff=self.results['diff'])
+        self.results['metrics'] = self.metrics.snapshot()
+        self._emit('summary', stage_timings=self.results['stage_timings'],
+                   cache_stats=self.results['cache_stats'], metrics=self.results['metrics'])
+        self.results = plain_results(self.results)
+        return self.results
+
+    def _instrumented(self, name, func):
+        def stage():
+            self.metrics.gauge('stages_running', 1)
+            try:
+                with self.metrics.timer('stage_seconds', stage=name):
+                    if self.profiler is not None:
+                        self.profiler.run(name, func)
+                    else:
+                        func()
+            finally:
+                self.metrics.gauge('stages_running', -1)
+        return stage
+
+    def _journalled(self, name, func):
+        def stage():
+            func()
+            self.journal.stage_done(name, self.results)
+        return stage
+
+    def run(self, enable_dns=True, enable_subdomains=True, enable_ports=True,
+            enable_banners=True, enable_http=True, enable_tech=True,
+            enable_whois=True, enable_certs=True, report_format='text'):
         """
         Run the complete reconnaissance
-        
+
         Args:
             enable_dns (bool): Enable DNS enumeration
             enable_subdomains (bool): Enable subdomain enumeration
@@ -479,47 +5022,640 @@ class ReconTool:
             enable_http (bool): Enable HTTP header retrieval
             enable_tech (bool): Enable technology detection
             enable_whois (bool): Enable WHOIS lookup
+            enable_certs (bool): Enable TLS certificate harvesting
             report_format (str): Report format (text, json, html)
         """
         self.print_banner()
-        
-        try:
-            if enable_dns:
-                self.dns_lookup()
-            
-            if enable_subdomains:
-                self.subdomain_enumeration()
-            
-            if enable_ports:
-                self.port_scan()
-            
-            if enable_banners and self.results['open_ports']:
-                self.banner_grabbing()
-            
-            if enable_http:
-                self.http_headers()
-            
-            if enable_tech:
-                self.technology_detection()
-            
-            if enable_whois:
-                self.whois_lookup()
-            
+
+        try:
+            self.execute(enable_dns, enable_subdomains, enable_ports, enable_banners,
+                         enable_http, enable_tech, enable_whois, enable_certs)
+            self._print_stage_timings()
+            self._print_diff()
+
             self.generate_report(report_format)
-            
+            if self.journal is not None:
+                self.journal.close(remove=True)
+
             print(f"\n{Colors.OKGREEN}{Colors.BOLD}[✓] Reconnaissance Complete!{Colors.ENDC}")
-            
+
         except KeyboardInterrupt:
             print(f"\n{Colors.WARNING}[!] Scan interrupted by user{Colors.ENDC}")
+            if self.journal is not None:
+                self.journal.close()
+                print(f"{Colors.WARNING}[!] Progress saved to {self.journal.path}; "
+                      f"rerun with --resume to continue{Colors.ENDC}")
             sys.exit(0)
         except Exception as e:
             print(f"\n{Colors.FAIL}[!] Error: {str(e)}{Colors.ENDC}")
             sys.exit(1)
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+            if self.sink is not None:
+                self.sink.close()
+            self.cache.close()
+            self.http.close()
+
+
+def _batch_worker(tasks, results, tool_options, stage_options, per_worker, cache_db, cache_size,
+                  metrics=False, baselines=None, whois_slots=None):
+    """Worker process body: run up to ``per_worker`` targets at once"""
+    sys.stdout = open(os.devnull, 'w')
+    cache = ResolutionCache(cache_db, cache_size)
+    whois = WhoisClient(cache, rate=tool_options.get('whois_rate', 1.0),
+                        servers=tool_options.get('whois_servers'), shared=whois_slots)
+
+    def loop():
+        while True:
+            target = tasks.get()
+            if target is None:
+                break
+            try:
+                recon = ReconTool(target, cache=cache, metrics=Metrics() if metrics else None,
+                                  baseline=(baselines or {}).get(target), whois=whois,
+                                  **tool_options)
+                try:
+                    result = recon.execute(**stage_options)
+                finally:
+                    recon.http.close()
+            except Exception as e:
+                result = {'target': target, 'error': str(e)}
+            results.put(result)
+
+    threads = [threading.Thread(target=loop) for _ in range(per_worker)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.close()
+    results.put(None)
+
+
+def share_budget(tool_options, scans, max_sockets):
+    """
+    Cap the per-scan socket limits in ``tool_options`` (in place) so that
+    ``scans`` concurrent scans stay within ``max_sockets`` between them;
+    a ``rate`` is treated as a global packet budget and split the same way.
+    """
+    per_scan = max(1, max_sockets // scans)
+    for option in ('max_inflight', 'dns_inflight', 'banner_workers'):
+        tool_options[option] = min(tool_options.get(option, per_scan), per_scan)
+    if tool_options.get('rate'):
+        tool_options['rate'] = tool_options['rate'] / scans
+
+
+class BatchRunner:
+    """
+    Scan many targets across a pool of worker processes.
+
+    Targets are streamed to the workers through a bounded queue; each
+    worker runs several targets concurrently on threads and shares one
+    resolution cache between them. A global socket budget is split evenly
+    over every concurrent target so the pool cannot oversubscribe sockets,
+    and the WHOIS rate limit of each server is shared by all the workers.
+    Results are appended to a single JSON array as each target completes.
+    """
+
+    def __init__(self, targets, workers=None, per_worker=4, max_sockets=4096,
+                 tool_options=None, stage_options=None, cache_db=None, cache_size=100000,
+                 metrics=False, baselines=None, results_db=None):
+        """
+        Args:
+            targets (iterable): Target domains or IPs, consumed lazily
+            workers (int): Number of worker processes (default: CPU count)
+            per_worker (int): Targets scanned concurrently inside each worker
+            max_sockets (int): Global budget of concurrent sockets
+            tool_options (dict): Keyword arguments for ReconTool
+            stage_options (dict): Keyword arguments for ReconTool.execute
+            cache_db (str): SQLite resolution cache shared by the workers
+            cache_size (int): Resolution cache size per worker
+            metrics (bool): Collect metrics for each target into its result
+            baselines (dict): Target -> earlier results to re-scan against
+                (see ``load_baseline``)
+            results_db (str): SQLite file that also receives every completed
+                target's findings (see ``ResultDatabase``)
+        """
+        self.targets = targets
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.per_worker = max(1, per_worker)
+        self.tool_options = dict(tool_options or {})
+        self.stage_options = dict(stage_options or {})
+        self.cache_db = cache_db
+        self.cache_size = cache_size
+        self.metrics = metrics
+        self.baselines = baselines
+        self.results_db = results_db
+
+        share_budget(self.tool_options, self.workers * self.per_worker, max_sockets)
+
+    def run(self, output):
+        """
+        Scan every target and write the merged results to ``output``.
+
+        Returns:
+            int: Number of targets completed
+        """
+        import multiprocessing
+
+        slots = self.workers * self.per_worker
+        tasks = multiprocessing.Queue(maxsize=slots * 2)
+        results = multiprocessing.Queue()
+        manager = multiprocessing.Manager()
+        whois_slots = (manager.dict(), manager.Lock())
+        processes = [
+            multiprocessing.Process(
+                target=_batch_worker, daemon=True,
+                args=(tasks, results, self.tool_options, self.stage_options,
+                      self.per_worker, self.cache_db, self.cache_size, self.metrics,
+                      self.baselines, whois_slots))
+            for _ in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        def feed():
+            for target in self.targets:
+                tasks.put(target)
+            for _ in range(slots):
+                tasks.put(None)
+
+        threading.Thread(target=feed, daemon=True).start()
+
+        completed = 0
+        finished = 0
+        database = ResultDatabase(self.results_db) if self.results_db else None
+        with open(output, 'w') as f:
+            f.write('[\n')
+            while finished < self.workers:
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in processes):
+                        break
+                    continue
+                if result is None:
+                    finished += 1
+                    continue
+                if completed:
+                    f.write(',\n')
+                json.dump(result, f, indent=4, default=json_default)
+                f.flush()
+                completed += 1
+                if 'error' in result:
+                    print(f"{Colors.FAIL}[!] {result['target']}: {result['error']}{Colors.ENDC}")
+                else:
+                    if database is not None:
+                        database.add_results(result)
+                    print(f"{Colors.OKGREEN}[+] {result['target']}: "
+                          f"{len(result['subdomains'])} subdomains, "
+                          f"{len(result['open_ports'])} open ports "
+                          f"({result['stage_timings'].get('total', 0):.1f}s){Colors.ENDC}")
+            f.write('\n]\n')
+        if database is not None:
+            database.close()
+
+        for process in processes:
+            process.join(timeout=1)
+        manager.shutdown()
+        return completed
+
+
+def read_targets(source):
+    """Yield targets from a file path or '-' for stdin, skipping blanks and comments"""
+    f = sys.stdin if source == '-' else open(source)
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class JobStream:
+    """
+    In-memory findings stream of one daemon job.
+
+    Stands in for a ``ResultSink``: findings are serialised to NDJSON
+    lines as they are emitted and kept, so any number of readers can
+    replay them with ``follow`` and keep reading until the job ends.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def emit(self, event, **fields):
+        """Append one finding"""
+        line = json.dumps({'event': event, **fields}, default=json_default)
+        with self._cond:
+            if self.closed:
+                return
+            self.lines.append(line)
+            self._cond.notify_all()
+
+    def emit_results(self, results):
+        """Append every finding held in a ``ReconTool.results`` dict"""
+        for event, fields in iter_findings(results):
+            self.emit(event, **fields)
+
+    def follow(self):
+        """Yield every line so far, then new ones as they come, until ``close``"""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.lines) and not self.closed:
+                    self._cond.wait()
+                lines = self.lines[index:]
+                closed = self.closed
+            index += len(lines)
+            yield from lines
+            if closed:
+                return
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class ScanDaemon:
+    """
+    Long-running scan service with a local JSON job API.
+
+    Jobs are queued per submitter (their ``queue`` field) and started
+    round-robin across the queues on ``jobs`` worker threads, so one
+    client's backlog cannot hold up another's. Every job runs on the same
+    warm state: the in-memory resolution cache, the compiled fingerprints,
+    one keep-alive HTTP session, the per-address RTT estimates and one
+    WHOIS client with its per-server rate limits. The
+    socket budget is split evenly over the job slots, as in batch mode.
+
+    Endpoints:
+        POST   /jobs              submit {"target": ..., options}; returns the job id
+        GET    /jobs              every known job and its status
+        GET    /jobs/<id>         status, plus the results once finished
+        GET    /jobs/<id>/events  NDJSON findings, followed until the job ends
+        DELETE /jobs/<id>         cancel a queued job
+        GET    /status            queued and running jobs, cache statistics
+
+    Job options are the ``run()`` stage flags (``enable_ports``, ...) and
+    the keys of ``JOB_OPTIONS``; anything not given falls back to the
+    daemon's defaults.
+    """
+
+    STAGE_OPTIONS = ('enable_dns', 'enable_subdomains', 'enable_ports', 'enable_banners',
+                     'enable_http', 'enable_tech', 'enable_whois', 'enable_certs')
+    JOB_OPTIONS = {'wordlist': str, 'timeout': float, 'probe_subdomains': bool,
+                   'scan_subdomains': bool, 'permute_depth': int, 'permute_limit': int,
+                   'certs_all_ports': bool}
+    # Finished jobs kept for GET /jobs/<id>
+    HISTORY = 1000
+
+    def __init__(self, address, jobs=4, max_sockets=4096, tool_options=None,
+                 stage_options=None, cache=None, results_db=None, max_queued=10000, log=None):
+        """
+        Args:
+            address (str): ``PORT`` or ``HOST:PORT`` for HTTP (host defaults
+                to 127.0.0.1), or a filesystem path for a Unix socket
+            jobs (int): Jobs run at once
+            max_sockets (int): Global budget of concurrent sockets
+            tool_options (dict): Default keyword arguments for ReconTool
+            stage_options (dict): Default keyword arguments for ReconTool.execute
+            cache (ResolutionCache): Cache shared by every job
+            results_db (str): SQLite file that also receives every finished
+                job's findings (see ``ResultDatabase``)
+            max_queued (int): Jobs waiting before submissions are refused
+            log (file): Where job starts and completions are reported
+                (default: stderr)
+        """
+        self.address = address
+        self.jobs = max(1, jobs)
+        self.tool_options = dict(tool_options or {})
+        self.stage_options = dict(stage_options or {})
+        share_budget(self.tool_options, self.jobs, max_sockets)
+        self.cache = cache or ResolutionCache()
+        self.fingerprints = self.tool_options.pop('fingerprints', None) or load_fingerprints()
+        self.rtts = {}
+        self.whois = WhoisClient(self.cache, rate=self.tool_options.get('whois_rate', 1.0),
+                                 servers=self.tool_options.get('whois_servers'))
+        self.http = HTTPClient(timeout=self.tool_options.get('timeout', 3),
+                               pool_size=self.tool_options.get('threads', 10))
+        self.database = ResultDatabase(results_db) if results_db else None
+        self.max_queued = max_queued
+        self.log = log or sys.stderr
+        self.registry = OrderedDict()
+        self.running = 0
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._finished = deque()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._db_lock = threading.Lock()
+        self._stopping = False
+        self._server = None
+        self._threads = []
+
+    def submit(self, spec):
+        """
+        Queue a scan job.
+
+        Args:
+            spec (dict): ``target`` plus optional stage flags, ``JOB_OPTIONS``
+                keys, ``ports`` (spec string or list), ``metrics`` (bool) and
+                ``queue`` (fairness group, default "default")
+
+        Returns:
+            dict: The job
+
+        Raises:
+            ValueError: Missing target or an unknown or malformed option
+            queue.Full: ``max_queued`` jobs are already waiting
+        """
+        if not isinstance(spec, dict) or not str(spec.get('target') or '').strip():
+            raise ValueError("'target' is required")
+        unknown = set(spec) - {'target', 'ports', 'metrics', 'queue'} \
+            - set(self.STAGE_OPTIONS) - set(self.JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"unknown options: {', '.join(sorted(unknown))}")
+        tool_options = dict(self.tool_options)
+        stage_options = dict(self.stage_options)
+        try:
+            for key, kind in self.JOB_OPTIONS.items():
+                if key in spec:
+                    tool_options[key] = kind(spec[key])
+            if 'ports' in spec:
+                ports = spec['ports']
+                tool_options['ports'] = PortSet.parse(
+                    ports if isinstance(ports, str) else ','.join(map(str, ports)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"bad option: {e}") from None
+        for key in self.STAGE_OPTIONS:
+            if key in spec:
+                stage_options[key] = bool(spec[key])
+
+        with self._cond:
+            if self._stopping:
+                raise queue.Full("the daemon is shutting down")
+            if self._queued >= self.max_queued:
+                raise queue.Full(f"{self._queued} jobs already queued")
+            job = {'id': str(next(self._ids)), 'target': spec['target'].strip(),
+                   'queue': str(spec.get('queue', 'default')), 'status': 'queued',
+                   'submitted': datetime.now().isoformat(), 'started': None, 'finished': None,
+                   'error': None, 'results': None, 'stream': JobStream(),
+                   'metrics': bool(spec.get('metrics')),
+                   'tool_options': tool_options, 'stage_options': stage_options}
+            self.registry[job['id']] = job
+            self._queues.setdefault(job['queue'], deque()).append(job)
+            self._queued += 1
+            self._cond.notify()
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job.
+
+        Returns:
+            bool: False if the job has already started
+        """
+        with self._cond:
+            job = self.registry[job_id]
+            if job['status'] != 'queued':
+                return False
+            jobs = self._queues[job['queue']]
+            jobs.remove(job)
+            if not jobs:
+                del self._queues[job['queue']]
+            self._queued -= 1
+            self._finish(job, 'cancelled')
+        job['stream'].close()
+        return True
+
+    @staticmethod
+    def describe(job, results=False):
+        """JSON view of a job, with its results if ``results`` is set"""
+        view = {key: job[key] for key in ('id', 'target', 'queue', 'status', 'submitted',
+                                          'started', 'finished', 'error')}
+        if results and job['results'] is not None:
+            view['results'] = job['results']
+        return view
+
+    def status(self):
+        with self._cond:
+            return {'queued': self._queued, 'running': self.running, 'slots': self.jobs,
+                    'jobs': len(self.registry), 'cache': self.cache.stats()}
+
+    def _next(self):
+        """Take the next job round-robin across queues; None once stopping"""
+        with self._cond:
+            while not self._queues and not self._stopping:
+                self._cond.wait()
+            if self._stopping:
+                return None
+            name, jobs = next(iter(self._queues.items()))
+            job = jobs.popleft()
+            # The queue goes to the back of the line
+            del self._queues[name]
+            if jobs:
+                self._queues[name] = jobs
+            self._queued -= 1
+            self.running += 1
+            job['status'] = 'running'
+            job['started'] = datetime.now().isoformat()
+            return job
+
+    def _finish(self, job, status):
+        """Mark ``job`` finished and forget the oldest finished jobs (lock held)"""
+        job['status'] = status
+        job['finished'] = datetime.now().isoformat()
+        self._finished.append(job['id'])
+        while len(self._finished) > self.HISTORY:
+            self.registry.pop(self._finished.popleft(), None)
+
+    def _work(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job):
+        start = time.perf_counter()
+        print(f"{Colors.OKBLUE}[*] Job {job['id']}: {job['target']} started{Colors.ENDC}",
+              file=self.log, flush=True)
+        stream = job['stream']
+        status = 'done'
+        try:
+            recon = ReconTool(job['target'], cache=self.cache, fingerprints=self.fingerprints,
+                              sink=stream, metrics=Metrics() if job['metrics'] else None,
+                              http_session=self.http.session, rtts=self.rtts,
+                              whois=self.whois, **job['tool_options'])
+            try:
+                job['results'] = recon.execute(**job['stage_options'])
+            finally:
+                recon.http.close()
+            if self.database is not None:
+                with self._db_lock:
+                    self.database.add_results(job['results'])
+        except Exception as e:
+            status = 'failed'
+            job['error'] = str(e)
+        with self._cond:
+            self.running -= 1
+            self._finish(job, status)
+        stream.close()
+        if status == 'done':
+            results = job['results']
+            print(f"{Colors.OKGREEN}[+] Job {job['id']}: {job['target']} done, "
+                  f"{len(results['subdomains'])} subdomains, "
+                  f"{len(results['open_ports'])} open ports "
+                  f"({time.perf_counter() - start:.1f}s){Colors.ENDC}", file=self.log, flush=True)
+        else:
+            print(f"{Colors.FAIL}[!] Job {job['id']}: {job['target']} failed: "
+                  f"{job['error']}{Colors.ENDC}", file=self.log, flush=True)
+
+    def start(self):
+        """Bind the API and start the job workers; returns self"""
+        import socketserver
+        import stat
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def send_json(self, status, body):
+                data = json.dumps(body, default=json_default).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def route(self):
+                """(job or None, trailing path part) for /jobs/<id>[/<part>]"""
+                parts = self.path.split('?')[0].strip('/').split('/')
+                if len(parts) < 2 or parts[0] != 'jobs':
+                    return None, None
+                with daemon._cond:
+                    job = daemon.registry.get(parts[1])
+                if job is None:
+                    self.send_json(404, {'error': f"no job {parts[1]}"})
+                return job, '/'.join(parts[2:])
+
+            def do_GET(self):
+                path = self.path.split('?')[0].rstrip('/')
+                if path == '/status':
+                    self.send_json(200, daemon.status())
+                    return
+                if path == '/jobs':
+                    with daemon._cond:
+                        jobs = [daemon.describe(job) for job in daemon.registry.values()]
+                    self.send_json(200, jobs)
+                    return
+                job, part = self.route()
+                if job is None:
+                    if part is None:
+                        self.send_json(404, {'error': 'not found'})
+                    return
+                if part == '':
+                    self.send_json(200, daemon.describe(job, results=True))
+                elif part == 'events':
+                    # No length up front: the connection closes with the stream
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-ndjson')
+                    self.end_headers()
+                    try:
+                        for line in job['stream'].follow():
+                            self.wfile.write(line.encode() + b'\n')
+                            self.wfile.flush()
+                    except OSError:
+                        pass
+                else:
+                    self.send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path.split('?')[0].rstrip('/') != '/jobs':
+                    self.send_json(404, {'error': 'not found'})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    job = daemon.submit(json.loads(self.rfile.read(length) or b'null'))
+                except ValueError as e:
+                    self.send_json(400, {'error': str(e)})
+                    return
+                except queue.Full as e:
+                    self.send_json(503, {'error': str(e)})
+                    return
+                self.send_json(202, daemon.describe(job))
+
+            def do_DELETE(self):
+                job, part = self.route()
+                if job is None:
+                    if part is None:
+                        self.send_json(404, {'error': 'not found'})
+                    return
+                if part or not daemon.cancel(job['id']):
+                    self.send_json(409, {'error': f"job {job['id']} is {job['status']}"})
+                    return
+                self.send_json(200, daemon.describe(job))
+
+            def log_message(self, *args):
+                pass
+
+        if os.sep in self.address:
+            class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+                daemon_threads = True
+
+            # A socket left behind by an earlier daemon would block the bind
+            with contextlib.suppress(FileNotFoundError):
+                if stat.S_ISSOCK(os.stat(self.address).st_mode):
+                    os.unlink(self.address)
+            self._server = UnixServer(self.address, Handler)
+        else:
+            host, _, port = self.address.rpartition(':')
+            self._server = ThreadingHTTPServer((host or '127.0.0.1', int(port)), Handler)
+            self._server.daemon_threads = True
+            self.address = f"{host or '127.0.0.1'}:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._threads = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(self.jobs)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop accepting jobs, cancel queued ones and release shared resources"""
+        with self._cond:
+            self._stopping = True
+            queued = [job for jobs in self._queues.values() for job in jobs]
+            self._queues.clear()
+            self._queued = 0
+            for job in queued:
+                self._finish(job, 'cancelled')
+            self._cond.notify_all()
+        for job in queued:
+            job['stream'].close()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if os.sep in self.address:
+                with contextlib.suppress(OSError):
+                    os.unlink(self.address)
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self.http.close()
+        self.cache.close()
+        if self.database is not None:
+            self.database.close()
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description='Recon Automation Tool - Comprehensive reconnaissance for cybersecurity professionals',
+        description='Recon Automation Tool - Comprehensive reconnaissance for cybersecurity '
+                    'professionals',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -527,56 +5663,281 @@ Examples:
   python3 recon.py -u example.com -p 1-1000 -t 20
   python3 recon.py -u example.com --no-subdomains -f json
   python3 recon.py -u example.com -w custom_wordlist.txt
+  python3 recon.py -T targets.txt --workers 8 --no-whois
+  python3 recon.py --daemon 8765 --daemon-jobs 16
         """
     )
-    
-    parser.add_argument('-u', '--url', required=True, help='Target domain or IP address')
-    parser.add_argument('-p', '--ports', help='Port range (e.g., 1-1000) or comma-separated ports (e.g., 80,443,8080)')
-    parser.add_argument('-t', '--threads', type=int, default=10, help='Number of threads (default: 10)')
+
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument('-u', '--url', help='Target domain or IP address')
+    target_group.add_argument('-T', '--targets',
+                              help="Batch mode: file with one target per line ('-' for stdin)")
+    target_group.add_argument('--daemon', metavar='ADDRESS',
+                              help='Daemon mode: serve the job API on [HOST:]PORT (localhost by '
+                                   'default) or on a Unix socket path')
+    parser.add_argument('-p', '--ports',
+                        help='Ports and port ranges, comma-separated (e.g., 1-1000 or '
+                             '22,80,8000-8100)')
+    parser.add_argument('-t', '--threads', type=int, default=10,
+                        help='Number of threads (default: 10)')
     parser.add_argument('-w', '--wordlist', help='Custom wordlist for subdomain enumeration')
-    parser.add_argument('--timeout', type=int, default=3, help='Connection timeout in seconds (default: 3)')
-    parser.add_argument('-f', '--format', choices=['text', 'json', 'html'], default='text', help='Report format')
-    
+    parser.add_argument('--timeout', type=int, default=3,
+                        help='Connection timeout in seconds (default: 3)')
+    parser.add_argument('--max-inflight', type=int, default=1000,
+                        help='Maximum concurrent connects during port scanning (default: 1000)')
+    parser.add_argument('--resolvers',
+                        help='Nameservers for subdomain brute force: comma-separated '
+                             'ip[:port] or a file')
+    parser.add_argument('--dns-inflight', type=int, default=500,
+                        help='Maximum concurrent DNS lookups during subdomain brute force '
+                             '(default: 500)')
+    parser.add_argument('--banner-workers', type=int, default=256,
+                        help='Maximum ports probed at once during banner grabbing (default: 256)')
+    parser.add_argument('--rate', type=float,
+                        help='Maximum packets (connects or DNS queries) per second '
+                             '(default: unlimited)')
+    parser.add_argument('--no-adaptive', action='store_true',
+                        help='Use fixed timeouts and concurrency instead of adapting to RTT '
+                             'and loss')
+    parser.add_argument('--cache-db',
+                        help='SQLite file that persists the resolution cache across runs')
+    parser.add_argument('--results-db', metavar='FILE',
+                        help='Also store findings in this SQLite database, indexed by host, '
+                             'port and technology')
+    parser.add_argument('--cache-size', type=int, default=100000,
+                        help='Maximum resolution cache entries (default: 100000)')
+    parser.add_argument('--probe-subdomains', action='store_true',
+                        help='Fetch HTTP/HTTPS from every discovered subdomain')
+    parser.add_argument('--scan-subdomains', action='store_true',
+                        help='Port scan every IPv4/IPv6 address of the target and its discovered '
+                             'subdomains (each address once)')
+    parser.add_argument('--permute', action='store_true',
+                        help='Also resolve permutations of the found subdomains (api-dev, '
+                             'staging2, eu.api, ...)')
+    parser.add_argument('--permute-depth', type=int, default=2,
+                        help='Permutation rounds, each mutating the names the previous one '
+                             'found (default: 2)')
+    parser.add_argument('--permute-limit', type=int, default=1000000,
+                        help='Maximum permutations resolved (default: 1000000)')
+    parser.add_argument('--certs-all-ports', action='store_true',
+                        help='Harvest certificates from every open port, not just those known '
+                             'to speak TLS by port or banner')
+    parser.add_argument('--whois-server', metavar='HOST[:PORT]',
+                        help='Send every WHOIS query to this server instead of the registry\'s')
+    parser.add_argument('--whois-rate', type=float, default=1.0,
+                        help='WHOIS queries per second allowed to each server (default: 1)')
+    parser.add_argument('--baseline', metavar='REPORT',
+                        help='Earlier JSON report (or batch report) to re-scan against: known '
+                             'subdomains and open ports are checked first, pages are fetched '
+                             'conditionally and the changes are reported')
+    parser.add_argument('--recheck-only', action='store_true',
+                        help='With --baseline: only re-check what the baseline found (no '
+                             'wordlist sweep, no other ports)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted scan of the same target from its '
+                             'checkpoint journal')
+    parser.add_argument('--journal',
+                        help='Checkpoint journal file (default: reports/recon_<target>.journal)')
+    parser.add_argument('--events',
+                        help='NDJSON findings stream '
+                             '(default: reports/recon_<target>_<timestamp>.ndjson)')
+    parser.add_argument('--fingerprints',
+                        help='Technology signature file (default: data/fingerprints.json)')
+    parser.add_argument('-f', '--format', choices=['text', 'json', 'html'], default='text',
+                        help='Report format')
+
+    # Instrumentation
+    parser.add_argument('--metrics', action='store_true',
+                        help='Collect latency histograms and counters and add them to the report')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Serve live Prometheus metrics on 127.0.0.1:PORT/metrics '
+                             '(implies --metrics)')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Write a cProfile dump per stage to DIR/<stage>.prof')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Report net memory allocated by each stage (tracemalloc)')
+
+    # Batch mode
+    parser.add_argument('--workers', type=int,
+                        help='Batch mode: worker processes (default: CPU count)')
+    parser.add_argument('--per-worker', type=int, default=4,
+                        help='Batch mode: targets scanned concurrently per worker (default: 4)')
+    parser.add_argument('--max-sockets', type=int, default=4096,
+                        help='Batch and daemon mode: global budget of concurrent sockets '
+                             '(default: 4096)')
+
+    # Daemon mode
+    parser.add_argument('--daemon-jobs', type=int, default=4,
+                        help='Daemon mode: jobs run at once (default: 4)')
+
     # Module toggles
     parser.add_argument('--no-dns', action='store_true', help='Disable DNS enumeration')
-    parser.add_argument('--no-subdomains', action='store_true', help='Disable subdomain enumeration')
+    parser.add_argument('--no-subdomains', action='store_true',
+                        help='Disable subdomain enumeration')
     parser.add_argument('--no-ports', action='store_true', help='Disable port scanning')
     parser.add_argument('--no-banners', action='store_true', help='Disable banner grabbing')
     parser.add_argument('--no-http', action='store_true', help='Disable HTTP header retrieval')
     parser.add_argument('--no-tech', action='store_true', help='Disable technology detection')
     parser.add_argument('--no-whois', action='store_true', help='Disable WHOIS lookup')
-    
+    parser.add_argument('--no-certs', action='store_true',
+                        help='Disable TLS certificate harvesting')
+
     args = parser.parse_args()
-    
+
     # Parse ports
     ports = None
     if args.ports:
-        if '-' in args.ports:
-            start, end = map(int, args.ports.split('-'))
-            ports = list(range(start, end + 1))
+        try:
+            ports = PortSet.parse(args.ports)
+        except ValueError as e:
+            parser.error(f"--ports: {e}")
+
+    resolvers = None
+    if args.resolvers:
+        if os.path.isfile(args.resolvers):
+            with open(args.resolvers) as f:
+                resolvers = [line.strip() for line in f
+                             if line.strip() and not line.startswith('#')]
         else:
-            ports = [int(p) for p in args.ports.split(',')]
-    
+            resolvers = [r for r in args.resolvers.split(',') if r.strip()]
+
+    if args.whois_rate <= 0:
+        parser.error("--whois-rate must be positive")
+
+    tool_options = {
+        'ports': ports,
+        'timeout': args.timeout,
+        'threads': args.threads,
+        'wordlist': args.wordlist,
+        'max_inflight': args.max_inflight,
+        'resolvers': resolvers,
+        'dns_inflight': args.dns_inflight,
+        'banner_workers': args.banner_workers,
+        'probe_subdomains': args.probe_subdomains,
+        'scan_subdomains': args.scan_subdomains,
+        'permute_depth': args.permute_depth if args.permute else 0,
+        'permute_limit': args.permute_limit,
+        'certs_all_ports': args.certs_all_ports,
+        'whois_rate': args.whois_rate,
+        'whois_servers': {'*': args.whois_server} if args.whois_server else None,
+        'rate': args.rate,
+        'adaptive': not args.no_adaptive,
+    }
+    stage_options = {
+        'enable_dns': not args.no_dns,
+        'enable_subdomains': not args.no_subdomains,
+        'enable_ports': not args.no_ports,
+        'enable_banners': not args.no_banners,
+        'enable_http': not args.no_http,
+        'enable_tech': not args.no_tech,
+        'enable_whois': not args.no_whois,
+        'enable_certs': not args.no_certs,
+    }
+
+    if args.fingerprints:
+        tool_options['fingerprints'] = load_fingerprints(args.fingerprints)
+
+    baselines = None
+    if args.baseline:
+        try:
+            baselines = load_baseline(args.baseline)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot load baseline: {e}")
+        if args.url and args.url not in baselines:
+            parser.error(f"{args.baseline} has no results for {args.url}")
+        if args.daemon:
+            parser.error("--baseline cannot be used with --daemon")
+    elif args.recheck_only:
+        parser.error("--recheck-only needs --baseline")
+    tool_options['recheck_only'] = args.recheck_only
+
+    if args.targets:
+        # Per-scan journals, streams and instrumentation have no batch equivalent
+        ignored = [flag for flag, value in (
+            ('--resume', args.resume), ('--journal', args.journal), ('--events', args.events),
+            ('--metrics-port', args.metrics_port is not None), ('--profile', args.profile),
+            ('--trace-memory', args.trace_memory)) if value]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be used with -T/--targets")
+        os.makedirs('reports', exist_ok=True)
+        output = f"reports/batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        runner = BatchRunner(read_targets(args.targets), workers=args.workers,
+                             per_worker=args.per_worker, max_sockets=args.max_sockets,
+                             tool_options=tool_options, stage_options=stage_options,
+                             cache_db=args.cache_db, cache_size=args.cache_size,
+                             metrics=args.metrics, baselines=baselines,
+                             results_db=args.results_db)
+        print(f"{Colors.OKBLUE}[*] Batch scan: {runner.workers} workers x "
+              f"{runner.per_worker} targets{Colors.ENDC}")
+        try:
+            completed = runner.run(output)
+        except KeyboardInterrupt:
+            print(f"\n{Colors.WARNING}[!] Batch interrupted; partial results in {output}"
+                  f"{Colors.ENDC}")
+            sys.exit(0)
+        print(f"{Colors.OKGREEN}[+] {completed} targets scanned, merged report saved: "
+              f"{output}{Colors.ENDC}")
+        return
+
+    if args.daemon:
+        daemon = ScanDaemon(args.daemon, jobs=args.daemon_jobs, max_sockets=args.max_sockets,
+                            tool_options=tool_options, stage_options=stage_options,
+                            cache=ResolutionCache(args.cache_db, args.cache_size),
+                            results_db=args.results_db)
+        try:
+            daemon.start()
+        except (OSError, ValueError) as e:
+            parser.error(f"--daemon: cannot listen on {args.daemon}: {e}")
+        where = (f"unix:{daemon.address}" if os.sep in daemon.address
+                 else f"http://{daemon.address}")
+        print(f"{Colors.OKBLUE}[*] Daemon listening on {where} ({daemon.jobs} jobs at once); "
+              f"submit with POST /jobs{Colors.ENDC}", flush=True)
+        # Scan output is noise with many jobs interleaved; jobs are logged to stderr
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"{Colors.WARNING}[!] Shutting down{Colors.ENDC}", file=sys.stderr)
+        finally:
+            daemon.stop()
+        return
+
+    journal = CheckpointJournal(args.journal or f"reports/recon_{args.url}.journal",
+                                args.url, resume=args.resume)
+
+    sink = ResultSink(args.events or
+                      f"reports/recon_{args.url}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson",
+                      database=ResultDatabase(args.results_db) if args.results_db else None)
+
+    metrics = Metrics() if args.metrics or args.metrics_port is not None else None
+    server = None
+    if args.metrics_port is not None:
+        server = MetricsServer(metrics, args.metrics_port).start()
+        print(f"{Colors.OKBLUE}[*] Metrics at http://{server.host}:{server.port}/metrics"
+              f"{Colors.ENDC}")
+    profiler = None
+    if args.profile or args.trace_memory:
+        profiler = StageProfiler(args.profile, trace_memory=args.trace_memory, metrics=metrics)
+
     # Initialize and run
     recon = ReconTool(
         target=args.url,
-        ports=ports,
-        timeout=args.timeout,
-        threads=args.threads,
-        wordlist=args.wordlist
-    )
-    
-    recon.run(
-        enable_dns=not args.no_dns,
-        enable_subdomains=not args.no_subdomains,
-        enable_ports=not args.no_ports,
-        enable_banners=not args.no_banners,
-        enable_http=not args.no_http,
-        enable_tech=not args.no_tech,
-        enable_whois=not args.no_whois,
-        report_format=args.format
+        cache=ResolutionCache(args.cache_db, args.cache_size),
+        journal=journal,
+        sink=sink,
+        metrics=metrics,
+        profiler=profiler,
+        baseline=baselines[args.url] if baselines else None,
+        **tool_options
     )
 
+    try:
+        recon.run(report_format=args.format, **stage_options)
+    finally:
+        if server is not None:
+            server.stop()
+
 
 if __name__ == '__main__':
     main()
@@ -170,7 +170,17 @@ echo ""
 read -p "$(echo -e ${YELLOW}"Do you want to install recon.py system-wide? (y/n): "${NC})" -n 1 -r
 echo
 if [[ $REPLY =~ ^[Yy]$ ]]; then
-    $SUDO cp recon.py /usr/local/bin/recon
+    $SUDO mkdir -p /usr/local/share/recon
+    $SUDO cp -r data/. /usr/local/share/recon/
+    # Install the module byte-compiled behind a small launcher: a script run
+    # directly is recompiled on every start, an imported module is not
+    $SUDO cp recon.py /usr/local/share/recon/recon.py
+    $SUDO python3 -m compileall -q /usr/local/share/recon/recon.py
+    printf '%s\n' '#!/usr/bin/env python3' \
+        'import sys' \
+        "sys.path.insert(0, '/usr/local/share/recon')" \
+        'from recon import main' \
+        'main()' | $SUDO tee /usr/local/bin/recon > /dev/null
     $SUDO chmod +x /usr/local/bin/recon
     echo -e "${GREEN}[+] Installed to /usr/local/bin/recon${NC}"
     echo -e "${GREEN}[+] You can now run: recon -u example.com${NC}"